@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark explode_concepts against the previous window-function version.
+
+The old implementation counted parts with a window over employee_id after
+the explode; the current one takes list.len() per record before it.
+
+Usage: python scripts/bench_explode_concepts.py [rows ...]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import numpy as np
+import polars as pl
+
+from meridiano_analysis.generators import REMUNERATION_CONCEPTS
+from meridiano_analysis.transformers import explode_concepts
+
+
+def explode_concepts_window(df: pl.LazyFrame) -> pl.LazyFrame:
+    """Previous implementation, kept here as the benchmark baseline."""
+    return (
+        df
+        .with_columns(pl.col("remuneration_concept").str.split("+").alias("concepts_list"))
+        .explode("concepts_list")
+        .with_columns(pl.col("concepts_list").str.strip_chars().alias("concept_clean"))
+        .with_columns(
+            pl.col("concepts_list").len().over(pl.col("employee_id")).alias("num_concepts")
+        )
+        .with_columns((pl.col("local_amount") / pl.col("num_concepts")).alias("local_amount"))
+        .drop(["concepts_list", "num_concepts", "remuneration_concept"])
+        .rename({"concept_clean": "remuneration_concept"})
+    )
+
+
+def make_fixture(rows: int, combined_share: float = 0.25, seed: int = 0) -> pl.DataFrame:
+    """Remuneration-like frame with ~1.7 records per employee and some combined concepts."""
+    rng = np.random.default_rng(seed)
+    concepts = np.array(list(REMUNERATION_CONCEPTS.keys()))
+    first = concepts[rng.integers(0, len(concepts), rows)]
+    second = concepts[rng.integers(0, len(concepts), rows)]
+    combined = rng.random(rows) < combined_share
+    employee_num = pl.Series((np.arange(rows) / 1.7).astype(np.int64))
+
+    return pl.DataFrame({
+        "employee_id": "EMP" + employee_num.cast(pl.Utf8).str.zfill(8),
+        "subsidiary_code": "ES-MAD",
+        "remuneration_concept": np.where(
+            combined, np.char.add(np.char.add(first, " + "), second), first
+        ),
+        "local_amount": rng.uniform(1_000, 50_000, rows),
+    })
+
+
+def best_of(fn, df: pl.DataFrame, repeats: int = 5) -> float:
+    """Best wall time over several collects."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(df.lazy()).collect()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'rows':>12} {'window (s)':>12} {'list.len (s)':>13} {'speedup':>8}")
+    for rows in sizes:
+        df = make_fixture(rows)
+        old = best_of(explode_concepts_window, df)
+        new = best_of(explode_concepts, df)
+        print(f"{rows:>12,} {old:>12.3f} {new:>13.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [400_000, 4_000_000])
@@ -10,10 +10,18 @@ __author__ = "tia-elena"
 
 from .config import settings
 from .pipeline import ETLPipeline, run_pipeline, PipelineResult
+from .incremental import IncrementalPipeline, IncrementalResult
+from .scenarios import ScenarioEngine
+from .simulation import FxRiskSimulator, FxRiskResult
 
 __all__ = [
     "settings",
     "ETLPipeline",
     "run_pipeline",
     "PipelineResult",
+    "IncrementalPipeline",
+    "IncrementalResult",
+    "ScenarioEngine",
+    "FxRiskSimulator",
+    "FxRiskResult",
 ]
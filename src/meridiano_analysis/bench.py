@@ -0,0 +1,466 @@
+"""
+Benchmark suite for the generators and the ETL.
+
+Builds generated fixture datasets at fixed row counts (10k .. 10M), times
+every public building block of the ETL on them (transformers, funding
+calculator, validators, exporters, the full pipeline run) and appends the
+results to a JSON history file. Two recorded runs (e.g. two commits) can be
+compared to flag slowdowns above a relative threshold.
+"""
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from .calculators import FundingRatioCalculator
+from .config import settings
+from .dimension_cache import DimensionCache
+from .exporters import DataExporterFactory
+from .generators import (
+    SUBSIDIARIES,
+    generate_dimension_tables,
+    generate_employees_vectorized,
+    generate_remuneration_vectorized,
+    write_dataset,
+)
+from .generators.dimensions import generate_pool_hierarchy
+from .loaders import DataLoaderFactory
+from .pipeline import ETLPipeline
+from .scenarios import ScenarioEngine
+from .simulation import FxRiskSimulator, covariance_from_history
+from .transformers import (
+    apply_funding_ratio,
+    enrich_with_employees,
+    enrich_with_fx,
+    enrich_with_fx_asof,
+    enrich_with_mapping,
+    explode_concepts,
+    normalize_currency,
+)
+from .validation import validate_fx_rates, validate_remuneration_input
+
+
+logger = logging.getLogger(__name__)
+
+HISTORY_VERSION = 1
+# Bumped when the fixture layout changes (e.g. new dimension tables), so
+# existing fixtures are regenerated
+FIXTURE_VERSION = 2
+
+BENCH_SIZES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+DEFAULT_SIZES = ["10k", "100k", "1m"]
+
+# Average remuneration records generated per employee (default config)
+RECORDS_PER_EMPLOYEE = 1.685
+
+# What-if scenarios evaluated per scenario_evaluate call
+SCENARIOS = 1_000
+# FX shock vectors drawn per fx_risk_simulate call
+SIMULATION_DRAWS = 10_000
+
+
+@dataclass
+class BenchResult:
+    """Timings of one benchmark at one fixture size."""
+
+    benchmark: str
+    size: str
+    rows: int
+    min_seconds: float
+    median_seconds: float
+    repeats: int
+
+
+@dataclass
+class Comparison:
+    """Change of one benchmark between a baseline and a current run."""
+
+    benchmark: str
+    size: str
+    baseline_seconds: float
+    current_seconds: float
+    ratio: float
+    regressed: bool
+
+
+def parse_size(size: str) -> tuple[str, int]:
+    """Resolve a size label ("100k", "1m") or a plain row count to (label, rows)."""
+    label = size.lower()
+    if label in BENCH_SIZES:
+        return label, BENCH_SIZES[label]
+    try:
+        rows = int(label)
+    except ValueError:
+        raise ValueError(
+            f"Unknown benchmark size '{size}', expected one of "
+            f"{', '.join(BENCH_SIZES)} or a row count"
+        ) from None
+    if rows < 1:
+        raise ValueError(f"Benchmark size must be >= 1 row, got {rows}")
+    return label, rows
+
+
+def fixture_subsidiaries(rows: int) -> tuple[dict[str, dict], float]:
+    """
+    Subsidiary config whose generated dataset has about `rows` records.
+
+    Returns:
+        Tuple of (scaled subsidiary config, headcount scale factor).
+    """
+    total_employees = sum(info["employees"] for info in SUBSIDIARIES.values())
+    factor = rows / RECORDS_PER_EMPLOYEE / total_employees
+    return {
+        code: {**info, "employees": max(1, round(info["employees"] * factor))}
+        for code, info in SUBSIDIARIES.items()
+    }, factor
+
+
+def build_fixture(rows: int, fixture_dir: Path, seed: int = 42) -> Path:
+    """
+    Generate (or reuse) a fixture data directory with about `rows` records.
+
+    The directory has the same input/ and dim/ layout as settings.DATA_DIR.
+    A fixture.json marker records the requested size and seed, so fixtures
+    are only regenerated when those change.
+    """
+    marker = fixture_dir / "fixture.json"
+    subsidiaries, factor = fixture_subsidiaries(rows)
+    spec = {
+        "rows": rows, "seed": seed, "subsidiaries": subsidiaries, "version": FIXTURE_VERSION,
+    }
+    if marker.exists():
+        recorded = json.loads(marker.read_text())
+        if all(recorded.get(key) == value for key, value in spec.items()):
+            return fixture_dir
+
+    if fixture_dir.exists():
+        shutil.rmtree(fixture_dir)
+    logger.info(f"Generating {rows:,}-row fixture in {fixture_dir}...")
+    summary = write_dataset(
+        fixture_dir / "input" / "remuneration.parquet",
+        fixture_dir / "dim" / "employees.parquet",
+        seed=seed,
+        chunk_size=settings.CHUNK_SIZE,
+        subsidiaries=subsidiaries,
+    )
+    generate_dimension_tables(fixture_dir, scale=factor)
+    marker.write_text(json.dumps({**spec, "records": summary.records}))
+    return fixture_dir
+
+
+def fixture_pipeline(fixture_dir: Path, output_dir: Path) -> ETLPipeline:
+    """Pipeline reading a fixture directory and writing into output_dir."""
+    pipeline = ETLPipeline(
+        input_path=fixture_dir / "input" / "remuneration.parquet",
+        fx_path=fixture_dir / "dim" / "fx_rates.parquet",
+        currency_aliases_path=fixture_dir / "dim" / "currency_aliases.parquet",
+        mapping_path=fixture_dir / "dim" / "mapping.parquet",
+        pool_path=fixture_dir / "dim" / "bonus_pool.parquet",
+        output_path=output_dir / "processed.parquet",
+        audit_path=output_dir / "audit.parquet",
+        quarantine_path=output_dir / "quarantine.parquet",
+        concept_aliases_path=output_dir / "concept_aliases.parquet",
+        fx_history_path=fixture_dir / "dim" / "fx_history.parquet",
+        fx_as_of=True,
+        pool_hierarchy_path=fixture_dir / "dim" / "pool_hierarchy.parquet",
+        dimension_cache=DimensionCache(output_dir / "dimension_cache"),
+        validate=False,
+    )
+    pipeline.employees_path = fixture_dir / "dim" / "employees.parquet"
+    return pipeline
+
+
+def fixture_records(fixture_dir: Path) -> int:
+    """Number of remuneration records actually generated for a fixture."""
+    return json.loads((fixture_dir / "fixture.json").read_text())["records"]
+
+
+def fixture_benchmarks(fixture_dir: Path, output_dir: Path) -> dict[str, Callable[[], object]]:
+    """
+    Benchmarks over one fixture, each timing a single component.
+
+    Every component gets its input materialized up front, so its timing
+    covers only its own work (transformers are timed up to collect()).
+    """
+    subsidiaries = json.loads((fixture_dir / "fixture.json").read_text())["subsidiaries"]
+    pipeline = fixture_pipeline(fixture_dir, output_dir)
+    df_employees, df_fx, df_mapping, df_pool = pipeline._load_dimensions()
+    df_employees, df_fx, df_mapping, df_pool = pl.collect_all(
+        [df_employees, df_fx, df_mapping, df_pool]
+    )
+
+    aliases = pipeline._load_currency_aliases()
+
+    raw = DataLoaderFactory.load(pipeline.input_path).collect()
+    normalized = normalize_currency(raw.lazy(), aliases).collect()
+    joined = enrich_with_employees(normalized.lazy(), df_employees.lazy()).collect()
+    exploded = explode_concepts(joined.lazy()).collect()
+    with_fx = enrich_with_fx(exploded.lazy(), df_fx.lazy()).collect()
+    fx_history = pipeline._load_fx_history().collect()
+    enriched = enrich_with_mapping(
+        with_fx.lazy(), df_mapping.lazy(), unmapped_value=settings.UNMAPPED_CATEGORY
+    ).collect()
+    calculator = FundingRatioCalculator(df_pool.lazy(), cap=settings.FUNDING_RATIO_CAP)
+    pool_calc = calculator.calculate(enriched.lazy()).collect()
+    calculator_hierarchy = FundingRatioCalculator(
+        df_pool.lazy(), cap=settings.FUNDING_RATIO_CAP, hierarchy=generate_pool_hierarchy().lazy()
+    )
+    calculator_redistribute = FundingRatioCalculator(
+        df_pool.lazy(), cap=settings.FUNDING_RATIO_CAP, redistribute=True
+    )
+    scenario_engine = ScenarioEngine(
+        enriched.lazy(), df_pool.lazy(), cap=settings.FUNDING_RATIO_CAP
+    )
+    scenario_engine.demand  # aggregated once, outside the timing
+    scenarios = pl.DataFrame({
+        "scenario": [f"pool-{i}" for i in range(SCENARIOS)],
+        "kind": "pool",
+        "key": df_pool["subsidiary_code"].gather(
+            pl.int_range(SCENARIOS, eager=True) % df_pool.height
+        ),
+        "factor": pl.int_range(SCENARIOS, eager=True) / SCENARIOS + 0.5,
+    })
+    bonus_cap = pipeline._bonus_cap_calculator()
+    simulator = FxRiskSimulator.from_engine(scenario_engine)
+    fx_covariance = covariance_from_history(fx_history, horizon_days=90)
+    output = apply_funding_ratio(
+        enriched.lazy(), pool_calc.lazy(), default_ratio=settings.DEFAULT_FUNDING_RATIO
+    ).collect()
+
+    # The same facts with the pipeline's Enum dtypes, for the *_enum variants
+    enums = pipeline.column_enums()
+    enriched_enum = enums.cast(enriched.lazy()).collect()
+    calculator_enum = FundingRatioCalculator(
+        enums.cast(df_pool.lazy()), cap=settings.FUNDING_RATIO_CAP
+    )
+    pool_calc_enum = calculator_enum.calculate(enriched_enum.lazy()).collect()
+    logger.info(
+        f"Enriched facts: {enriched.estimated_size('mb'):,.1f} MB with string columns, "
+        f"{enriched_enum.estimated_size('mb'):,.1f} MB with Enums"
+    )
+
+    return {
+        "generate_vectorized": lambda: generate_remuneration_vectorized(
+            generate_employees_vectorized(subsidiaries=subsidiaries),
+            subsidiaries=subsidiaries,
+        ),
+        "normalize_currency": lambda: normalize_currency(raw.lazy(), aliases).collect(),
+        "explode_concepts": lambda: explode_concepts(joined.lazy()).collect(),
+        "enrich_with_fx": lambda: enrich_with_fx(exploded.lazy(), df_fx.lazy()).collect(),
+        "enrich_with_fx_broadcast": lambda: enrich_with_fx(exploded.lazy(), df_fx).collect(),
+        "enrich_with_fx_asof": lambda: enrich_with_fx_asof(
+            exploded.lazy(), fx_history.lazy()
+        ).collect(),
+        "enrich_with_mapping": lambda: enrich_with_mapping(
+            with_fx.lazy(), df_mapping.lazy(), unmapped_value=settings.UNMAPPED_CATEGORY
+        ).collect(),
+        "enrich_with_mapping_broadcast": lambda: enrich_with_mapping(
+            with_fx.lazy(), df_mapping, unmapped_value=settings.UNMAPPED_CATEGORY
+        ).collect(),
+        "funding_ratio_calculate": lambda: calculator.calculate(enriched.lazy()).collect(),
+        "funding_ratio_calculate_enum": lambda: calculator_enum.calculate(
+            enriched_enum.lazy()
+        ).collect(),
+        "funding_ratio_calculate_hierarchy": lambda: calculator_hierarchy.calculate(
+            enriched.lazy()
+        ).collect(),
+        "funding_ratio_calculate_redistribute": lambda: calculator_redistribute.calculate(
+            enriched.lazy()
+        ).collect(),
+        "apply_funding_ratio": lambda: apply_funding_ratio(
+            enriched.lazy(), pool_calc.lazy(), default_ratio=settings.DEFAULT_FUNDING_RATIO
+        ).collect(),
+        "apply_funding_ratio_enum": lambda: apply_funding_ratio(
+            enriched_enum.lazy(), pool_calc_enum.lazy(),
+            default_ratio=settings.DEFAULT_FUNDING_RATIO,
+        ).collect(),
+        "apply_funding_ratio_broadcast": lambda: apply_funding_ratio(
+            enriched.lazy(), pool_calc, default_ratio=settings.DEFAULT_FUNDING_RATIO
+        ).collect(),
+        "scenario_evaluate": lambda: scenario_engine.evaluate(scenarios),
+        "bonus_cap_enforce": lambda: bonus_cap.apply(
+            output.lazy(), bonus_cap.calculate(output.lazy())
+        ).collect(),
+        "fx_risk_simulate": lambda: simulator.simulate(fx_covariance, draws=SIMULATION_DRAWS),
+        "validate_remuneration_input": lambda: validate_remuneration_input(raw),
+        "validate_fx_rates": lambda: validate_fx_rates(df_fx),
+        "export_parquet": lambda: DataExporterFactory.export(
+            output, output_dir / "bench_export.parquet"
+        ),
+        "export_csv": lambda: DataExporterFactory.export(output, output_dir / "bench_export.csv"),
+        "pipeline_run": pipeline.run,
+    }
+
+
+def time_call(fn: Callable[[], object], repeats: int) -> tuple[float, float]:
+    """Run fn `repeats` times. Returns (min, median) wall time in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def run_benchmarks(
+    sizes: list[str] | None = None,
+    repeats: int = 3,
+    only: list[str] | None = None,
+    bench_dir: Path | None = None,
+    seed: int = 42,
+) -> list[BenchResult]:
+    """
+    Build the fixtures and time every benchmark on each of them.
+
+    Args:
+        sizes: Size labels or row counts (default: 10k, 100k, 1m)
+        repeats: Timed repetitions per benchmark
+        only: Restrict to these benchmark names
+        bench_dir: Directory for fixtures and scratch outputs
+        seed: Generator seed for the fixtures
+
+    Returns:
+        One BenchResult per (size, benchmark).
+    """
+    bench_dir = bench_dir or settings.bench_path
+    results = []
+    for size in sizes or DEFAULT_SIZES:
+        label, rows = parse_size(size)
+        fixture_dir = build_fixture(rows, bench_dir / "fixtures" / label, seed=seed)
+        output_dir = bench_dir / "output" / label
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        benchmarks = fixture_benchmarks(fixture_dir, output_dir)
+        unknown = set(only or []) - set(benchmarks)
+        if unknown:
+            raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+        for name, fn in benchmarks.items():
+            if only and name not in only:
+                continue
+            min_s, median_s = time_call(fn, repeats)
+            logger.info(f"Bench {label:>5} {name:<30} {min_s:8.3f}s (median {median_s:.3f}s)")
+            results.append(BenchResult(
+                name, label, fixture_records(fixture_dir), min_s, median_s, repeats
+            ))
+    return results
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, with a '-dirty' suffix for local changes."""
+    repo = Path(__file__).parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repo, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def load_history(path: Path) -> list[dict]:
+    """Recorded runs of a history file, oldest first."""
+    if not path.exists():
+        return []
+    history = json.loads(path.read_text())
+    if history.get("version") != HISTORY_VERSION:
+        raise ValueError(f"Unsupported benchmark history version in {path}")
+    return history["runs"]
+
+
+def record_run(results: list[BenchResult], path: Path, commit: str | None = None) -> dict:
+    """Append a run to the JSON history file and return it."""
+    run = {
+        "commit": commit or git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "polars_version": pl.__version__,
+        "python_version": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [asdict(r) for r in results],
+    }
+    runs = load_history(path) + [run]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": HISTORY_VERSION, "runs": runs}, indent=2))
+    return run
+
+
+def find_run(runs: list[dict], commit: str) -> dict:
+    """Latest recorded run whose commit starts with the given prefix."""
+    for run in reversed(runs):
+        if run["commit"].startswith(commit):
+            return run
+    raise ValueError(f"No benchmark run recorded for commit '{commit}'")
+
+
+def compare_runs(
+    baseline: dict,
+    current: dict,
+    threshold: float = 0.10,
+    min_delta: float = 0.005,
+) -> list[Comparison]:
+    """
+    Compare the benchmarks two runs have in common.
+
+    Uses the best (min) time of each benchmark, which is the least noisy
+    statistic. A benchmark regressed if it got slower by more than threshold
+    (0.10 = 10%) and by more than min_delta seconds, so that jitter on
+    sub-millisecond timings is not reported.
+    """
+    base = {(r["benchmark"], r["size"]): r["min_seconds"] for r in baseline["results"]}
+    comparisons = []
+    for r in current["results"]:
+        key = (r["benchmark"], r["size"])
+        if key not in base:
+            continue
+        ratio = r["min_seconds"] / base[key] if base[key] > 0 else float("inf")
+        comparisons.append(Comparison(
+            benchmark=r["benchmark"],
+            size=r["size"],
+            baseline_seconds=base[key],
+            current_seconds=r["min_seconds"],
+            ratio=ratio,
+            regressed=ratio > 1 + threshold and r["min_seconds"] - base[key] > min_delta,
+        ))
+    return comparisons
+
+
+def format_results(results: list[BenchResult]) -> str:
+    """Render benchmark results as a text table."""
+    lines = [f"{'size':>6} {'benchmark':<30} {'rows':>12} {'min (s)':>9} {'median (s)':>11}"]
+    for r in results:
+        lines.append(
+            f"{r.size:>6} {r.benchmark:<30} {r.rows:>12,} "
+            f"{r.min_seconds:>9.3f} {r.median_seconds:>11.3f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: list[Comparison]) -> str:
+    """Render a run comparison as a text table, marking regressions."""
+    lines = [f"{'size':>6} {'benchmark':<30} {'base (s)':>9} {'now (s)':>9} {'change':>8}"]
+    for c in comparisons:
+        flag = "  SLOWER" if c.regressed else ""
+        lines.append(
+            f"{c.size:>6} {c.benchmark:<30} {c.baseline_seconds:>9.3f} "
+            f"{c.current_seconds:>9.3f} {c.ratio - 1:>+8.1%}{flag}"
+        )
+    return "\n".join(lines)
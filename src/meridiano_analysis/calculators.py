@@ -5,6 +5,22 @@ Encapsulates the funding ratio calculation logic following the Single Responsibi
 """
 import polars as pl
 
+from .transformers import EMPLOYEE_KEY
+
+
+# Pool hierarchy levels, top-down; the last level's nodes are subsidiary codes
+HIERARCHY_LEVELS = ["group", "region", "country", "subsidiary"]
+
+
+def funding_ratio(pool: pl.Expr, needed: pl.Expr, cap: float = 1.0) -> pl.Expr:
+    """min(pool / demand, cap), or 1.0 (capped) when there is no demand."""
+    return (
+        pl.when(needed > 0)
+        .then(pool / needed)
+        .otherwise(1.0)
+        .clip(upper_bound=cap)
+    )
+
 
 class FundingRatioCalculator:
     """
@@ -13,18 +29,51 @@ class FundingRatioCalculator:
     The funding ratio is: min(pool / demand, 1.0)
     - If demand < pool: ratio = 1.0 (full payout)
     - If demand > pool: ratio < 1.0 (proportional reduction)
+    
+    With a pool hierarchy, every node (group, region, country, subsidiary)
+    gets its own ratio, and a subsidiary pays out at the smallest ratio on
+    its path from the root.
+    
+    With redistribution, the pool that overfunded subsidiaries cannot pay
+    out (above cap x demand) is handed to the underfunded ones in
+    proportion to their weighted shortfall, each up to receiver_cap x
+    demand (water-filling, see redistribute).
     """
     
-    def __init__(self, pool_df: pl.LazyFrame, cap: float = 1.0):
+    def __init__(
+        self,
+        pool_df: pl.LazyFrame,
+        cap: float = 1.0,
+        hierarchy: pl.LazyFrame | None = None,
+        levels: list[str] | None = None,
+        redistribute: bool = False,
+        weights: dict[str, float] | None = None,
+        receiver_cap: float | None = None,
+    ):
         """
         Initialize with bonus pool data.
         
         Args:
             pool_df: DataFrame with subsidiary_code and pool_amount_eur
             cap: Maximum funding ratio (default 1.0)
+            hierarchy: Optional pool hierarchy with level, node, parent and
+                pool_amount_eur (null = no pool at that node). Its leaf nodes
+                are subsidiary codes; their pools come from pool_df.
+            levels: Hierarchy levels, top-down (default HIERARCHY_LEVELS)
+            redistribute: Hand the surplus of overfunded subsidiaries to the
+                underfunded ones (default False)
+            weights: Subsidiary code -> weight of its shortfall in the
+                redistribution (default 1.0)
+            receiver_cap: Highest funding ratio the redistribution lifts a
+                subsidiary to (default cap)
         """
         self.pool = pool_df
         self.cap = cap
+        self.hierarchy = hierarchy
+        self.levels = levels or HIERARCHY_LEVELS
+        self.redistribute_surplus = redistribute
+        self.weights = weights or {}
+        self.receiver_cap = cap if receiver_cap is None else min(receiver_cap, cap)
     
     def calculate(self, demand_df: pl.LazyFrame) -> pl.LazyFrame:
         """
@@ -34,28 +83,378 @@ class FundingRatioCalculator:
             demand_df: LazyFrame with 'subsidiary_code' and 'theoretical_eur' columns
             
         Returns:
-            LazyFrame with subsidiary_code, pool_amount_eur, total_needed_eur, funding_ratio
+            LazyFrame with subsidiary_code, pool_amount_eur, total_needed_eur,
+            funding_ratio (plus the columns of redistribute, if enabled);
+            with a hierarchy, one row per node instead (see calculate_hierarchy)
         """
         subsidiary_needs = (
             demand_df
             .group_by("subsidiary_code")
             .agg(pl.col("theoretical_eur").sum().alias("total_needed_eur"))
         )
+        if self.hierarchy is not None:
+            return self.calculate_hierarchy(subsidiary_needs)
         
-        pool_calc = (
-            self.pool
-            .join(subsidiary_needs, on="subsidiary_code", how="left")
+        pool_calc = self.pool.join(subsidiary_needs, on="subsidiary_code", how="left")
+        if self.redistribute_surplus:
+            return self.redistribute(pool_calc).with_columns(
+                self._ratio("funded_pool_eur").alias("funding_ratio")
+            )
+        
+        return pool_calc.with_columns(self._ratio().alias("funding_ratio"))
+    
+    def redistribute(self, pool_calc: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Hand the surplus of overfunded subsidiaries to the underfunded ones.
+        
+        The surplus is the pool above cap x demand. Receiver i gets
+        min(limit_i, level x weight_i x shortfall_i), where limit_i is what
+        lifts it to receiver_cap x demand and the water level is the one
+        that distributes the whole surplus (or fills every limit). Sorting
+        the receivers by the level at which they fill up (limit / weighted
+        shortfall) turns the search for the level into cumulative sums:
+        O(n log n) over the per-subsidiary table, with no iteration. Donors
+        give up the distributed amount in proportion to their surplus.
+        
+        Args:
+            pool_calc: subsidiary_code, pool_amount_eur and total_needed_eur
+            
+        Returns:
+            pool_calc with surplus_eur, shortfall_eur, redistributed_eur
+            (received, negative when donated) and funded_pool_eur (pool plus
+            redistributed), in the input order.
+        """
+        pool = pl.col("pool_amount_eur").fill_null(0.0)
+        needed = pl.col("total_needed_eur").fill_null(0.0)
+        weight = pl.col("subsidiary_code").cast(pl.String).replace_strict(
+            self.weights, default=1.0, return_dtype=pl.Float64
+        )
+        limit, wanted = pl.col("limit"), pl.col("wanted")
+        surplus = pl.col("surplus_eur").sum()
+        # Amount placed once the water reaches each receiver's fill level
+        # (every earlier receiver full, the rest at level x wanted)
+        placed_before = limit.cum_sum() - limit
+        wanted_from = wanted.sum() - wanted.cum_sum() + wanted
+        placed = placed_before + limit + pl.col("fill_level") * (wanted_from - wanted)
+        level = (
+            ((surplus - placed_before) / wanted_from)
+            .filter(placed >= surplus)
+            .first()
+        )
+        return (
+            pool_calc
+            .with_row_index("_order")
             .with_columns(
-                pl.when(pl.col("total_needed_eur") > 0)
-                .then(pl.col("pool_amount_eur") / pl.col("total_needed_eur"))
-                .otherwise(1.0)
-                .alias("funding_ratio")
+                (pool - self.cap * needed).clip(lower_bound=0.0).alias("surplus_eur"),
+                (self.cap * needed - pool).clip(lower_bound=0.0).alias("shortfall_eur"),
+                (self.receiver_cap * needed - pool).clip(lower_bound=0.0).alias("limit"),
+            )
+            # Subsidiaries already at receiver_cap take nothing, so they must
+            # not dilute the water level either
+            .with_columns(
+                pl.when(limit > 0)
+                .then(weight * pl.col("shortfall_eur"))
+                .otherwise(0.0)
+                .alias("wanted")
+            )
+            .with_columns(pl.when(wanted > 0).then(limit / wanted).alias("fill_level"))
+            .sort("fill_level", nulls_last=True)
+            .with_columns(
+                pl.when(pl.col("fill_level").is_not_null())
+                .then(pl.min_horizontal(limit, level * wanted).fill_null(limit))
+                .otherwise(0.0)
+                .alias("received")
             )
             .with_columns(
-                pl.col("funding_ratio")
-                .clip(upper_bound=self.cap)
+                (
+                    pl.col("received")
+                    - pl.col("surplus_eur")
+                    * pl.col("received").sum()
+                    / pl.max_horizontal(surplus, 1e-12)
+                ).alias("redistributed_eur")
+            )
+            .with_columns((pool + pl.col("redistributed_eur")).alias("funded_pool_eur"))
+            .sort("_order")
+            .drop("_order", "limit", "wanted", "fill_level", "received")
+        )
+    
+    def calculate_hierarchy(self, subsidiary_needs: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Roll demand up the pool hierarchy and resolve the ratios top-down.
+        
+        Every subsidiary is expanded to one row per node on its path, so the
+        demand of all levels comes out of a single group_by (grouping sets
+        over the small per-subsidiary table; the facts are scanned once, by
+        calculate). A node's effective ratio is the running minimum of the
+        node ratios from the root down to it. Subsidiaries of the pool table
+        missing from the hierarchy's leaf level join it as parentless leaves,
+        so they keep their flat pool ratio.
+        
+        Args:
+            subsidiary_needs: subsidiary_code and total_needed_eur
+            
+        Returns:
+            LazyFrame with one row per node: level, node, parent,
+            pool_amount_eur, total_needed_eur, node_ratio, the effective
+            funding_ratio and subsidiary_code (the node on leaf rows, in the
+            pool table's dtype; null above), top-down.
+        """
+        leaf = self.levels[-1]
+        depth = pl.col("level").replace_strict(
+            self.levels, range(len(self.levels)), return_dtype=pl.UInt32
+        )
+        hierarchy = self._with_orphan_leaves()
+        paths = self._paths(hierarchy).unpivot(
+            index="subsidiary_code", on=self.levels, variable_name="level", value_name="node"
+        )
+        
+        demand = (
+            paths
+            .join(
+                subsidiary_needs.with_columns(pl.col("subsidiary_code").cast(pl.String)),
+                on="subsidiary_code",
+                how="left",
+            )
+            .group_by("level", "node")
+            .agg(pl.col("total_needed_eur").sum())
+        )
+        leaf_pools = self.pool.select(
+            pl.lit(leaf).alias("level"),
+            pl.col("subsidiary_code").cast(pl.String).alias("node"),
+            pl.col("pool_amount_eur").alias("leaf_pool"),
+        )
+        ratio = self._ratio()
+        if self.redistribute_surplus:
+            # Redistribute between the subsidiaries, then cascade the funded pools
+            leaf_pools = self.redistribute(
+                self.pool.join(subsidiary_needs, on="subsidiary_code", how="left")
+            ).select(
+                pl.lit(leaf).alias("level"),
+                pl.col("subsidiary_code").cast(pl.String).alias("node"),
+                pl.col("pool_amount_eur").alias("leaf_pool"),
+                "surplus_eur",
+                "shortfall_eur",
+                "redistributed_eur",
+                "funded_pool_eur",
+            )
+            ratio = self._ratio("funded_pool_eur")
+        nodes = (
+            hierarchy
+            .filter(pl.col("level").is_in(self.levels))
+            .join(leaf_pools, on=["level", "node"], how="left")
+            .with_columns(pl.coalesce("leaf_pool", "pool_amount_eur").alias("pool_amount_eur"))
+            .drop("leaf_pool")
+            .join(demand, on=["level", "node"], how="left")
+        )
+        if self.redistribute_surplus:
+            nodes = nodes.with_columns(
+                pl.coalesce("funded_pool_eur", "pool_amount_eur").alias("funded_pool_eur")
+            )
+        nodes = nodes.with_columns(
+            pl.when(pl.col("pool_amount_eur").is_null())
+            .then(pl.lit(self.cap, dtype=pl.Float64))
+            .otherwise(ratio)
+            .alias("node_ratio")
+        )
+        effective = (
+            paths
+            .join(nodes.select("level", "node", "node_ratio"), on=["level", "node"], how="left")
+            .with_columns(depth.alias("depth"))
+            .sort("subsidiary_code", "depth")
+            .with_columns(
+                pl.col("node_ratio").fill_null(self.cap).cum_min().over("subsidiary_code")
                 .alias("funding_ratio")
             )
+            .group_by("level", "node")
+            .agg(pl.col("funding_ratio").first())
+        )
+        dtype = self.pool.collect_schema()["subsidiary_code"]
+        return (
+            nodes
+            .join(effective, on=["level", "node"], how="left")
+            .with_columns(
+                pl.col("funding_ratio").fill_null(pl.col("node_ratio")),
+                # Leaf rows keep the flat audit's key for its readers
+                pl.when(pl.col("level") == leaf)
+                .then(pl.col("node"))
+                .cast(dtype, strict=False)
+                .alias("subsidiary_code"),
+            )
+            .sort(depth, "node")
         )
+    
+    def ratios(self, pool_calc: pl.LazyFrame | pl.DataFrame) -> pl.LazyFrame | pl.DataFrame:
+        """
+        The (subsidiary_code, funding_ratio) table to apply to the facts.
         
-        return pool_calc
+        Without a hierarchy this is pool_calc itself; with one, its leaf rows.
+        """
+        if self.hierarchy is None:
+            return pool_calc
+        return pool_calc.select("subsidiary_code", "funding_ratio").drop_nulls("subsidiary_code")
+    
+    def _with_orphan_leaves(self) -> pl.LazyFrame:
+        """The hierarchy plus a parentless leaf per pool subsidiary it lacks."""
+        leaf = self.levels[-1]
+        hierarchy = self.hierarchy.select(
+            pl.col("level", "node", "parent").cast(pl.String),
+            pl.col("pool_amount_eur").cast(pl.Float64),
+        )
+        orphans = (
+            self.pool
+            .select(pl.col("subsidiary_code").cast(pl.String).alias("node"))
+            .join(
+                hierarchy.filter(pl.col("level") == leaf).select("node"),
+                on="node",
+                how="anti",
+            )
+            .select(
+                pl.lit(leaf).alias("level"),
+                "node",
+                pl.lit(None, dtype=pl.String).alias("parent"),
+                pl.lit(None, dtype=pl.Float64).alias("pool_amount_eur"),
+            )
+        )
+        return pl.concat([hierarchy, orphans])
+    
+    def _paths(self, hierarchy: pl.LazyFrame) -> pl.LazyFrame:
+        """One row per subsidiary with its ancestor node at every level (wide)."""
+        def level(name: str) -> pl.LazyFrame:
+            return hierarchy.filter(pl.col("level") == name)
+        
+        leaf, *upper = self.levels[::-1]
+        paths = level(leaf).select(
+            pl.col("node").alias("subsidiary_code"),
+            pl.col("node").alias(leaf),
+            *([pl.col("parent").alias(upper[0])] if upper else []),
+        )
+        for child, parent in zip(upper, upper[1:]):
+            paths = paths.join(
+                level(child).select(pl.col("node").alias(child), pl.col("parent").alias(parent)),
+                on=child,
+                how="left",
+            )
+        return paths.select("subsidiary_code", *self.levels)
+    
+    def _ratio(self, pool: str = "pool_amount_eur") -> pl.Expr:
+        """Funding ratio of the pool column against total_needed_eur."""
+        return funding_ratio(pl.col(pool), pl.col("total_needed_eur"), self.cap)
+
+
+class BonusCapCalculator:
+    """
+    Checks (and optionally enforces) the CRD IV/V bonus cap per employee.
+    
+    Variable pay (final_payout_eur) may not exceed max_ratio x fixed pay
+    (base_salary_eur): 100%, or 200% where shareholders approved it. The
+    payouts are summed per employee (and payment year, when the facts are
+    dated) in one group_by, the salaries joined on, and the excess over the
+    cap computed per employee; enforcing scales every row of a breaching
+    employee by the same factor, via one join back onto the facts.
+    """
+    
+    def __init__(
+        self,
+        salaries: pl.LazyFrame,
+        max_ratio: float = 1.0,
+        ratio_overrides: dict[str, float] | None = None,
+        mrt_only: bool = True,
+    ):
+        """
+        Initialize with the fixed pay of each employee.
+        
+        Args:
+            salaries: employee_key, base_salary_eur and is_mrt
+            max_ratio: Maximum variable-to-fixed ratio (default 1.0)
+            ratio_overrides: Subsidiary code -> maximum ratio (e.g. 2.0
+                where shareholders approved the higher cap)
+            mrt_only: Only cap material risk takers (default True)
+        """
+        self.salaries = salaries
+        self.max_ratio = max_ratio
+        self.ratio_overrides = ratio_overrides or {}
+        self.mrt_only = mrt_only
+    
+    def calculate(self, df: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Variable-to-fixed ratio of every employee (and payment year).
+        
+        Args:
+            df: Facts with employee_key, employee_id, subsidiary_code and
+                final_payout_eur (and optionally payment_date)
+            
+        Returns:
+            LazyFrame with the keys, employee_id, subsidiary_code,
+            base_salary_eur, is_mrt, variable_eur, variable_ratio, max_ratio,
+            excess_eur and cap_factor (1.0 unless the cap is breached).
+            Employees without a salary are never capped.
+        """
+        limit = pl.col("max_ratio") * pl.col("base_salary_eur")
+        capped = pl.col("is_mrt") if self.mrt_only else pl.lit(True)
+        max_ratio = pl.col("subsidiary_code").cast(pl.String).replace_strict(
+            self.ratio_overrides, default=self.max_ratio, return_dtype=pl.Float64
+        )
+        return (
+            self._with_period(df)
+            .group_by(self._keys(df))
+            .agg(
+                pl.col("employee_id").first(),
+                pl.col("subsidiary_code").first(),
+                pl.col("final_payout_eur").sum().alias("variable_eur"),
+            )
+            .join(
+                self.salaries.select(EMPLOYEE_KEY, "base_salary_eur", "is_mrt"),
+                on=EMPLOYEE_KEY,
+                how="left",
+            )
+            .with_columns(
+                pl.when(pl.col("base_salary_eur") > 0)
+                .then(pl.col("variable_eur") / pl.col("base_salary_eur"))
+                .alias("variable_ratio"),
+                max_ratio.alias("max_ratio"),
+            )
+            .with_columns(
+                pl.when(capped.fill_null(False))
+                .then((pl.col("variable_eur") - limit).clip(lower_bound=0.0))
+                .otherwise(0.0)
+                .fill_null(0.0)
+                .alias("excess_eur")
+            )
+            .with_columns(
+                pl.when(pl.col("excess_eur") > 0)
+                .then(limit / pl.col("variable_eur"))
+                .otherwise(1.0)
+                .alias("cap_factor")
+            )
+        )
+    
+    @staticmethod
+    def breaches(caps: pl.LazyFrame) -> pl.LazyFrame:
+        """Employees over their cap, largest excess first."""
+        return caps.filter(pl.col("excess_eur") > 0).sort("excess_eur", descending=True)
+    
+    def apply(self, df: pl.LazyFrame, caps: pl.LazyFrame | pl.DataFrame) -> pl.LazyFrame:
+        """Scale the payouts of breaching employees down to their cap."""
+        keys = self._keys(df)
+        return (
+            self._with_period(df)
+            .join(caps.lazy().select(*keys, "cap_factor"), on=keys, how="left")
+            .with_columns(
+                pl.col("final_payout_eur") * pl.col("cap_factor").fill_null(1.0)
+            )
+            .drop("cap_factor", *(keys[1:]))
+        )
+    
+    @staticmethod
+    def _keys(df: pl.LazyFrame) -> list[str]:
+        """employee_key, plus payment_year when the facts are dated."""
+        if "payment_date" in df.collect_schema().names():
+            return [EMPLOYEE_KEY, "payment_year"]
+        return [EMPLOYEE_KEY]
+    
+    @staticmethod
+    def _with_period(df: pl.LazyFrame) -> pl.LazyFrame:
+        """df with payment_year, when the facts are dated."""
+        if "payment_date" in df.collect_schema().names():
+            return df.with_columns(pl.col("payment_date").dt.year().alias("payment_year"))
+        return df
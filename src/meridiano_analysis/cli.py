@@ -1,58 +1,221 @@
 """
 CLI entry points for tia-elena.
 """
-import sys
+import argparse
+import os
 from pathlib import Path
 
 
-def generate():
+def generate(
+    engine: str = "vectorized",
+    scale: int = 1,
+    workers: int = 1,
+    pool_hierarchy: bool = False,
+):
     """Generate synthetic data."""
-    from meridiano_analysis.generators import generate_employees, generate_remuneration, generate_dimension_tables
+    from meridiano_analysis.generators import (
+        generate_employees,
+        generate_remuneration,
+        generate_dimension_tables,
+        write_dataset,
+    )
+    from meridiano_analysis.generators.dataset import remove_dataset
     from meridiano_analysis.config import settings
-    
+
     print("=" * 60)
     print("Banco Meridiano: Data Generation")
     print("=" * 60)
-    
+
     # Ensure directories
     (settings.DATA_DIR / "input").mkdir(parents=True, exist_ok=True)
     (settings.DATA_DIR / "dim").mkdir(parents=True, exist_ok=True)
     (settings.DATA_DIR / "output").mkdir(parents=True, exist_ok=True)
-    
+
+    employees_path = settings.DATA_DIR / "dim" / "employees.parquet"
+
     # Generate
-    print("Generating employees...")
-    employees = generate_employees()
-    print(f"  ✓ {len(employees):,} employees")
-    
-    print("Generating remuneration records...")
-    remuneration = generate_remuneration(employees)
-    remuneration.write_parquet(settings.input_path)
-    print(f"  ✓ {len(remuneration):,} records")
-    
+    if engine == "legacy":
+        print("Generating employees (legacy engine)...")
+        employees = generate_employees()
+        print(f"  ✓ {len(employees):,} employees")
+
+        print("Generating remuneration records...")
+        remuneration = generate_remuneration(employees)
+        # Single files, as before datasets: replace a previous vectorized run's
+        # dataset directories
+        remove_dataset(settings.input_path)
+        remove_dataset(employees_path)
+        remuneration.write_parquet(settings.input_path)
+        employees.write_parquet(employees_path)
+        print(f"  ✓ {len(remuneration):,} records")
+    else:
+        print(
+            "Generating employees and remuneration "
+            f"(vectorized engine, scale x{scale}, {workers} worker(s))..."
+        )
+        summary = write_dataset(
+            settings.input_path,
+            employees_path,
+            scale=scale,
+            chunk_size=settings.CHUNK_SIZE,
+            workers=workers,
+        )
+        print(f"  ✓ {summary.employees:,} employees")
+        print(f"  ✓ {summary.records:,} records in {summary.parts} parts")
+
     print("Generating dimension tables...")
-    employees.write_parquet(settings.DATA_DIR / "dim" / "employees.parquet")
-    generate_dimension_tables(settings.DATA_DIR)
+    generate_dimension_tables(settings.DATA_DIR, scale=scale, pool_hierarchy=pool_hierarchy)
     print("  ✓ Done")
-    
+
     print("=" * 60)
 
 
-def etl():
+def etl(
+    explain: bool = False,
+    streaming: bool = False,
+    incremental: bool = False,
+    profile: bool = False,
+):
     """Run ETL pipeline."""
-    from meridiano_analysis import run_pipeline
-    
+    from meridiano_analysis import run_pipeline, IncrementalPipeline
+    from meridiano_analysis.config import settings
+    from meridiano_analysis.incremental import partition_input
+
     print("=" * 60)
     print("tia-elena: ETL Pipeline")
     print("=" * 60)
-    
-    result = run_pipeline()
-    
+
+    if incremental:
+        if not settings.partitioned_input_path.exists():
+            print(f"Partitioning {settings.input_path} by subsidiary...")
+            partition_input(settings.input_path, settings.partitioned_input_path)
+        result = IncrementalPipeline().run()
+        print(f"\n✓ Partitions processed: {len(result.partitions_processed)}")
+        print(f"✓ Partitions reused: {len(result.partitions_reused)}")
+    else:
+        result = run_pipeline(explain=explain, streaming=streaming, profile=profile)
+
     print(f"\n✓ Rows: {result.rows_processed:,}")
     print(f"✓ Time: {result.execution_time_seconds:.2f}s")
     print(f"✓ Output: {result.output_path}")
+    if profile:
+        print(f"✓ Profile: {settings.profile_path}")
     print("=" * 60)
 
 
+def scenarios(path: Path, detail: str | None = None):
+    """Evaluate what-if pool/FX scenarios against the current input."""
+    import polars as pl
+    from meridiano_analysis import ETLPipeline, ScenarioEngine
+    from meridiano_analysis.config import settings
+    from meridiano_analysis.exporters import DataExporterFactory
+    from meridiano_analysis.loaders import DataLoaderFactory
+
+    print("=" * 60)
+    print("tia-elena: What-if Scenarios")
+    print("=" * 60)
+
+    shocks = DataLoaderFactory.load(path).collect()
+    engine = ScenarioEngine.from_pipeline(ETLPipeline(validate=False))
+    evaluated = engine.evaluate(shocks)
+    DataExporterFactory.export(evaluated, settings.scenarios_path)
+
+    with pl.Config(tbl_rows=-1, float_precision=0, thousands_separator=","):
+        print(engine.totals(evaluated))
+    print(f"\n✓ Scenarios: {evaluated['scenario'].n_unique():,}")
+    print(f"✓ Output: {settings.scenarios_path}")
+    if detail is not None:
+        detail_path = settings.scenarios_path.with_name(f"scenario_{detail}.parquet")
+        DataExporterFactory.sink(engine.payout_detail(shocks, detail), detail_path)
+        print(f"✓ Detail: {detail_path}")
+    print("=" * 60)
+
+
+def fx_risk(draws: int = 10_000, seed: int = 2024, horizon_days: int = 90):
+    """Simulate correlated FX shocks and report payout percentile bands."""
+    import polars as pl
+    from meridiano_analysis import ETLPipeline, ScenarioEngine
+    from meridiano_analysis.config import settings
+    from meridiano_analysis.exporters import DataExporterFactory
+    from meridiano_analysis.loaders import DataLoaderFactory
+    from meridiano_analysis.simulation import FxRiskSimulator, covariance_from_history
+
+    print("=" * 60)
+    print("tia-elena: FX Risk Simulation")
+    print("=" * 60)
+
+    covariance = covariance_from_history(
+        DataLoaderFactory.load(settings.fx_history_path), horizon_days=horizon_days
+    )
+    engine = ScenarioEngine.from_pipeline(ETLPipeline(validate=False))
+    result = FxRiskSimulator.from_engine(engine).simulate(covariance, draws=draws, seed=seed)
+    DataExporterFactory.export(result.bands, settings.fx_risk_path)
+
+    with pl.Config(float_precision=0, thousands_separator=","):
+        print(result.totals)
+    print(f"\n✓ Draws: {draws:,} ({horizon_days}-day FX moves, seed {seed})")
+    print(f"✓ Output: {settings.fx_risk_path}")
+    print("=" * 60)
+
+
+def bench(
+    sizes: list[str] | None = None,
+    repeats: int = 3,
+    only: list[str] | None = None,
+    record: bool = True,
+    compare: str | None = None,
+    threshold: float = 0.10,
+) -> int:
+    """Run the benchmark suite. Returns 1 when a comparison flags a slowdown."""
+    from meridiano_analysis.bench import (
+        run_benchmarks,
+        record_run,
+        load_history,
+        find_run,
+        compare_runs,
+        format_results,
+        format_comparison,
+    )
+    from meridiano_analysis.config import settings
+
+    print("=" * 60)
+    print("tia-elena: Benchmarks")
+    print("=" * 60)
+
+    history_path = settings.bench_history_path
+    runs = load_history(history_path)
+    baseline = None
+    if compare is not None:
+        if not runs:
+            print(f"No recorded runs in {history_path} to compare against")
+            return 1
+        baseline = runs[-1] if compare == "last" else find_run(runs, compare)
+
+    results = run_benchmarks(sizes=sizes, repeats=repeats, only=only)
+    print(format_results(results))
+
+    if record:
+        current = record_run(results, history_path)
+        print(f"\n✓ Recorded run {current['commit']} in {history_path}")
+    else:
+        from dataclasses import asdict
+        current = {"commit": "current", "results": [asdict(r) for r in results]}
+
+    regressed = False
+    if baseline is not None:
+        comparisons = compare_runs(baseline, current, threshold=threshold)
+        print(f"\nComparison with {baseline['commit']} ({baseline['timestamp']}):")
+        print(format_comparison(comparisons))
+        slower = [c for c in comparisons if c.regressed]
+        regressed = bool(slower)
+        if slower:
+            print(f"\n✗ {len(slower)} benchmark(s) slower by more than {threshold:.0%}")
+        else:
+            print(f"\n✓ No slowdowns above {threshold:.0%}")
+    print("=" * 60)
+    return 1 if regressed else 0
+
+
 def dashboard():
     """Launch Streamlit dashboard."""
     import subprocess
@@ -60,25 +223,155 @@ def dashboard():
     subprocess.run(["streamlit", "run", str(app_path)])
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for all sub-commands."""
+    parser = argparse.ArgumentParser(prog="meridiano-analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="Generate synthetic data")
+    gen.add_argument(
+        "--engine", choices=["vectorized", "legacy"], default="vectorized",
+        help="Generation engine (default: vectorized)",
+    )
+    gen.add_argument(
+        "--scale", type=int, default=1,
+        help="Multiply every subsidiary headcount by N (vectorized engine only)",
+    )
+    gen.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for the vectorized engine (0 = one per CPU core)",
+    )
+    gen.add_argument(
+        "--pool-hierarchy", action="store_true",
+        help="Also write group/region/country pools (funding ratios cascade top-down)",
+    )
+
+    etl_cmd = commands.add_parser("etl", help="Run ETL pipeline")
+    etl_cmd.add_argument(
+        "--explain", action="store_true",
+        help="Log the optimized query plan before running it",
+    )
+    etl_cmd.add_argument(
+        "--streaming", action="store_true",
+        help="Run on the streaming engine and sink the output to disk (larger-than-memory)",
+    )
+    etl_cmd.add_argument(
+        "--incremental", action="store_true",
+        help="Only re-process subsidiary partitions whose input changed",
+    )
+    etl_cmd.add_argument(
+        "--profile", action="store_true",
+        help="Run stage by stage and write per-stage timing/memory metrics as JSON",
+    )
+
+    bench_cmd = commands.add_parser("bench", help="Run the benchmark suite")
+    bench_cmd.add_argument(
+        "--sizes", nargs="+", default=None, metavar="SIZE",
+        help="Fixture sizes: 10k, 100k, 1m, 10m or a row count (default: 10k 100k 1m)",
+    )
+    bench_cmd.add_argument(
+        "--repeats", type=int, default=3,
+        help="Timed repetitions per benchmark; the best time is recorded (default: 3)",
+    )
+    bench_cmd.add_argument(
+        "--only", nargs="+", default=None, metavar="BENCHMARK",
+        help="Only run these benchmarks (e.g. explode_concepts pipeline_run)",
+    )
+    bench_cmd.add_argument(
+        "--compare", nargs="?", const="last", default=None, metavar="COMMIT",
+        help="Compare against the last recorded run, or the latest run of COMMIT",
+    )
+    bench_cmd.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="Relative slowdown flagged by --compare (default: 0.10 = 10%%)",
+    )
+    bench_cmd.add_argument(
+        "--no-record", action="store_true",
+        help="Do not append this run to the history file",
+    )
+
+    scenarios_cmd = commands.add_parser(
+        "scenarios", help="Evaluate what-if pool/FX scenarios in one batch"
+    )
+    scenarios_cmd.add_argument(
+        "path", type=Path,
+        help="Scenario shocks (Parquet or CSV with scenario, kind, key, factor)",
+    )
+    scenarios_cmd.add_argument(
+        "--detail", default=None, metavar="SCENARIO",
+        help="Also write the per-fact payouts of this scenario",
+    )
+
+    fx_risk_cmd = commands.add_parser(
+        "fx-risk", help="Monte Carlo simulation of FX risk on the payouts"
+    )
+    fx_risk_cmd.add_argument(
+        "--draws", type=int, default=10_000,
+        help="Correlated FX shock vectors to draw (default: 10000)",
+    )
+    fx_risk_cmd.add_argument(
+        "--seed", type=int, default=2024,
+        help="Random seed (default: 2024)",
+    )
+    fx_risk_cmd.add_argument(
+        "--horizon-days", type=int, default=90,
+        help="FX horizon; the daily covariance of the FX history is scaled to it (default: 90)",
+    )
+
+    commands.add_parser("dashboard", help="Launch Streamlit dashboard")
+    return parser
+
+
+def main(argv: list[str] | None = None):
     """Main CLI entry point."""
-    if len(sys.argv) < 2:
-        print("Usage: meridiano-analysis <command>")
-        print("Commands: generate, etl, dashboard")
-        sys.exit(1)
-    
-    command = sys.argv[1]
-    
-    if command == "generate":
-        generate()
-    elif command == "etl":
-        etl()
-    elif command == "dashboard":
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        if args.scale < 1:
+            parser.error("--scale must be >= 1")
+        if args.workers < 0:
+            parser.error("--workers must be >= 0")
+        if args.engine == "legacy" and (args.scale != 1 or args.workers > 1):
+            parser.error("--scale and --workers are only supported by the vectorized engine")
+        workers = args.workers or os.cpu_count() or 1
+        generate(
+            engine=args.engine, scale=args.scale, workers=workers,
+            pool_hierarchy=args.pool_hierarchy,
+        )
+    elif args.command == "etl":
+        modes = [args.incremental, args.streaming, args.profile]
+        if sum(modes) > 1:
+            parser.error("--incremental, --streaming and --profile are mutually exclusive")
+        if args.explain and (args.incremental or args.profile):
+            parser.error("--explain only applies to the default and --streaming modes")
+        etl(
+            explain=args.explain,
+            streaming=args.streaming,
+            incremental=args.incremental,
+            profile=args.profile,
+        )
+    elif args.command == "bench":
+        if args.repeats < 1:
+            parser.error("--repeats must be >= 1")
+        status = bench(
+            sizes=args.sizes,
+            repeats=args.repeats,
+            only=args.only,
+            record=not args.no_record,
+            compare=args.compare,
+            threshold=args.threshold,
+        )
+        if status:
+            raise SystemExit(status)
+    elif args.command == "scenarios":
+        scenarios(args.path, detail=args.detail)
+    elif args.command == "fx-risk":
+        if args.draws < 1 or args.horizon_days < 1:
+            parser.error("--draws and --horizon-days must be >= 1")
+        fx_risk(draws=args.draws, seed=args.seed, horizon_days=args.horizon_days)
+    elif args.command == "dashboard":
         dashboard()
-    else:
-        print(f"Unknown command: {command}")
-        print("Commands: generate, etl, dashboard")
-        sys.exit(1)
 
 
 if __name__ == "__main__":
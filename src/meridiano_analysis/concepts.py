@@ -0,0 +1,200 @@
+"""
+Concept-name resolution for the category mapping.
+
+Most concept garbage (case, separators, trailing period tokens) is removed by
+the vectorized ``canonical_concept`` expression used in the mapping join.
+What is left (typos such as ``BONU_ANUAL_CASH`` or ``DEFERIDO_3Y_CASH``) is
+resolved here: the distinct canonical names that still match nothing are
+collected once, looked up in a character n-gram index over ``concept_raw``
+and confirmed by edit distance. Resolutions are appended to a persistent
+alias table, so later runs map them with the plain join and fuzzy matching
+only ever sees new distinct strings, never rows.
+"""
+import logging
+from collections import Counter
+from pathlib import Path
+
+import polars as pl
+
+from .transformers import canonical_concept
+
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+CANDIDATES = 5
+MAX_DISTANCE_RATIO = 0.2
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> set[str]:
+    """Character n-grams of a string padded with one space on each side."""
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+class ConceptIndex:
+    """
+    Fuzzy lookup of canonical concept names.
+
+    An inverted n-gram index picks the few concepts sharing the most n-grams
+    with a query; only those are scored by edit distance.
+    """
+
+    def __init__(
+        self,
+        concepts: list[str],
+        max_distance_ratio: float = MAX_DISTANCE_RATIO,
+        candidates: int = CANDIDATES,
+    ):
+        """
+        Build the index.
+
+        Args:
+            concepts: Canonical concept names to match against
+            max_distance_ratio: Largest accepted edit distance, as a share of
+                the concept length (at least 1 edit is always allowed)
+            candidates: Concepts per query scored by edit distance
+        """
+        self.concepts = sorted(set(concepts))
+        self.max_distance_ratio = max_distance_ratio
+        self.candidates = candidates
+        self.postings: dict[str, list[int]] = {}
+        for i, concept in enumerate(self.concepts):
+            for gram in ngrams(concept):
+                self.postings.setdefault(gram, []).append(i)
+
+    def match(self, text: str) -> tuple[str, int] | None:
+        """
+        Closest concept to text as (concept, edit distance).
+
+        Returns None when nothing is within the distance limit or the two
+        closest concepts are equally close.
+        """
+        shared = Counter(i for gram in ngrams(text) for i in self.postings.get(gram, []))
+        scored = sorted(
+            (edit_distance(text, self.concepts[i]), self.concepts[i])
+            for i, _ in shared.most_common(self.candidates)
+        )
+        if not scored:
+            return None
+        distance, concept = scored[0]
+        limit = max(1, int(len(concept) * self.max_distance_ratio))
+        if distance > limit or (len(scored) > 1 and scored[1][0] == distance):
+            return None
+        return concept, distance
+
+
+class ConceptResolver:
+    """
+    Extends the concept mapping with fuzzy-resolved aliases.
+
+    The alias table (alias -> concept_raw, with the edit distance) lives in
+    a Parquet file and only grows when new distinct names are resolved.
+    """
+
+    def __init__(self, mapping: pl.LazyFrame, cache_path: Path):
+        """
+        Initialize with the concept mapping and the alias table location.
+
+        Args:
+            mapping: Mapping with concept_raw -> category_normalized
+            cache_path: Parquet file of previously resolved aliases
+        """
+        self.mapping = mapping
+        self.cache_path = cache_path
+
+    def load_aliases(self) -> pl.DataFrame:
+        """Previously resolved aliases (empty when there is no alias table yet)."""
+        if not self.cache_path.exists():
+            return pl.DataFrame(schema={
+                "alias": pl.String, "concept_raw": pl.String, "distance": pl.UInt32,
+            })
+        return pl.read_parquet(self.cache_path)
+
+    def unmatched(self, df: pl.LazyFrame, aliases: pl.DataFrame) -> list[str]:
+        """Distinct canonical concept names of df found neither in the mapping nor aliases."""
+        known = pl.concat([
+            self.mapping.select(canonical_concept("concept_raw").alias("key")),
+            aliases.lazy().select(pl.col("alias").alias("key")),
+        ])
+        return (
+            df
+            .select(pl.col("remuneration_concept").str.split("+").explode().alias("concept"))
+            .select(canonical_concept("concept").alias("key"))
+            .drop_nulls()
+            .unique()
+            .join(known, on="key", how="anti")
+            .sort("key")
+            .collect()["key"]
+            .to_list()
+        )
+
+    def update(self, df: pl.LazyFrame) -> pl.DataFrame:
+        """
+        Fuzzy-resolve the new unmatched concepts of df into the alias table.
+
+        Scans df for its distinct concept names; newly resolved aliases are
+        written back to the alias table. Returns the (updated) alias table.
+        """
+        aliases = self.load_aliases()
+        unmatched = self.unmatched(df, aliases)
+        if not unmatched:
+            return aliases
+        mapping_keys = self.mapping.select(
+            pl.col("concept_raw"), canonical_concept("concept_raw").alias("key")
+        ).collect()
+        raw_by_key = dict(zip(mapping_keys["key"], mapping_keys["concept_raw"]))
+        index = ConceptIndex(list(raw_by_key))
+        resolved = []
+        for name in unmatched:
+            match = index.match(name)
+            if match is not None:
+                resolved.append((name, raw_by_key[match[0]], match[1]))
+        logger.info(
+            f"Concepts: fuzzy-resolved {len(resolved)} of {len(unmatched)} "
+            f"unmatched distinct names"
+        )
+        if resolved:
+            aliases = pl.concat([aliases, pl.DataFrame(
+                resolved, schema=aliases.schema, orient="row"
+            )])
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            aliases.write_parquet(self.cache_path)
+        return aliases
+
+    def extended_mapping(self, aliases: pl.DataFrame | None = None) -> pl.LazyFrame:
+        """
+        The mapping plus one entry per alias whose target is still in the mapping.
+
+        Reads the alias table as it stands unless aliases are given; never
+        resolves anything, so it is safe to use while building plans.
+        """
+        if aliases is None:
+            aliases = self.load_aliases()
+        alias_mapping = (
+            aliases.lazy()
+            .join(self.mapping, on="concept_raw", how="inner")
+            .select(pl.col("alias").alias("concept_raw"), "category_normalized")
+        )
+        return pl.concat([self.mapping.select("concept_raw", "category_normalized"), alias_mapping])
+
+    def resolve(self, df: pl.LazyFrame) -> pl.LazyFrame:
+        """Resolve the new unmatched concepts of df and return the extended mapping."""
+        return self.extended_mapping(self.update(df))
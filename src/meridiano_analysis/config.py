@@ -26,19 +26,75 @@ class Settings(BaseSettings):
     DIM_FX_RATES: str = "dim/fx_rates.parquet"
     DIM_MAPPING: str = "dim/mapping.parquet"
     DIM_BONUS_POOL: str = "dim/bonus_pool.parquet"
+    DIM_CURRENCY_ALIASES: str = "dim/currency_aliases.parquet"
+    # Daily FX rates (currency, valid_from, rate); used only in FX as-of mode (FX_AS_OF)
+    DIM_FX_HISTORY: str = "dim/fx_history.parquet"
+    # Pools above the subsidiaries (level, node, parent, pool); optional
+    DIM_POOL_HIERARCHY: str = "dim/pool_hierarchy.parquet"
+    
+    # Concept aliases resolved by fuzzy matching (grows across runs)
+    CONCEPT_ALIASES: str = "cache/concept_aliases.parquet"
+    # Prepared dimension tables (Arrow IPC), keyed by source file fingerprint
+    DIMENSION_CACHE: str = "cache/dimensions"
     
     # Output files
     OUTPUT_PROCESSED: str = "output/processed_remuneration.parquet"
     OUTPUT_AUDIT: str = "output/audit_pool_adjustment.parquet"
     OUTPUT_CSV_EXPORT: str = "output/processed_remuneration.csv"
+    OUTPUT_QUARANTINE: str = "output/quarantine.parquet"
+    
+    # Incremental mode (hive-style partitions: subsidiary_code=<code>/)
+    INPUT_PARTITIONED: str = "input/remuneration_by_subsidiary"
+    OUTPUT_PARTITIONED: str = "output/processed_by_subsidiary"
+    OUTPUT_AUDIT_PARTITIONED: str = "output/audit_by_subsidiary"
+    OUTPUT_QUARANTINE_PARTITIONED: str = "output/quarantine_by_subsidiary"
+    INCREMENTAL_MANIFEST: str = "output/incremental_manifest.json"
+    
+    # Profiling report (ETLPipeline(profile=True))
+    OUTPUT_PROFILE: str = "output/pipeline_profile.json"
+    
+    # What-if scenarios: per (scenario, subsidiary) results
+    OUTPUT_SCENARIOS: str = "output/scenarios.parquet"
+    # FX-risk simulation: percentile bands per subsidiary
+    OUTPUT_FX_RISK: str = "output/fx_risk.parquet"
+    # Employees over the CRD variable-to-fixed bonus cap
+    OUTPUT_BONUS_CAP: str = "output/bonus_cap_breaches.parquet"
+    
+    # Benchmarks (fixtures, scratch outputs and the JSON history)
+    BENCH_DIR: str = "bench"
+    BENCH_HISTORY: str = "bench/history.json"
     
     # Business rules
     FUNDING_RATIO_CAP: float = 1.0
     DEFAULT_FUNDING_RATIO: float = 1.0
     UNMAPPED_CATEGORY: str = "UNMAPPED"
+    # Convert dated facts at the DIM_FX_HISTORY rate of their payment date
+    # (sorts the facts by date); off = one rate per currency from DIM_FX_RATES
+    FX_AS_OF: bool = False
+    # Hand the pool above demand of overfunded subsidiaries to the underfunded
+    # ones, in proportion to their (weighted) shortfall
+    REDISTRIBUTE_SURPLUS: bool = False
+    # Subsidiary code -> weight of its shortfall (default 1.0)
+    REDISTRIBUTION_WEIGHTS: dict[str, float] = Field(default_factory=dict)
+    # Highest funding ratio a redistribution lifts a subsidiary to (None = FUNDING_RATIO_CAP)
+    REDISTRIBUTION_RECEIVER_CAP: float | None = None
+    # CRD IV/V bonus cap: variable pay of MRTs up to BONUS_CAP_RATIO x base salary
+    BONUS_CAP_CHECK: bool = False
+    # Scale the payouts of breaching employees down to the cap (implies the check)
+    BONUS_CAP_ENFORCE: bool = False
+    BONUS_CAP_RATIO: float = 1.0
+    # Subsidiary code -> cap where shareholders approved a higher one (up to 2.0)
+    BONUS_CAP_RATIO_OVERRIDES: dict[str, float] = Field(default_factory=dict)
+    # Cap material risk takers only (False = every employee)
+    BONUS_CAP_MRT_ONLY: bool = True
     
     # Performance
     CHUNK_SIZE: int = 100_000
+    # Dimensions up to this many rows are applied as lookup expressions
+    # instead of joins (0 = always join)
+    BROADCAST_MAX_ROWS: int = 10_000
+    # Prepared dimension tables kept in memory (and on disk) before LRU eviction
+    DIMENSION_CACHE_ENTRIES: int = 16
     
     @property
     def input_path(self) -> Path:
@@ -56,6 +112,26 @@ class Settings(BaseSettings):
     def bonus_pool_path(self) -> Path:
         return self.DATA_DIR / self.DIM_BONUS_POOL
     
+    @property
+    def currency_aliases_path(self) -> Path:
+        return self.DATA_DIR / self.DIM_CURRENCY_ALIASES
+    
+    @property
+    def fx_history_path(self) -> Path:
+        return self.DATA_DIR / self.DIM_FX_HISTORY
+    
+    @property
+    def pool_hierarchy_path(self) -> Path:
+        return self.DATA_DIR / self.DIM_POOL_HIERARCHY
+    
+    @property
+    def concept_aliases_path(self) -> Path:
+        return self.DATA_DIR / self.CONCEPT_ALIASES
+    
+    @property
+    def dimension_cache_path(self) -> Path:
+        return self.DATA_DIR / self.DIMENSION_CACHE
+    
     @property
     def output_path(self) -> Path:
         return self.DATA_DIR / self.OUTPUT_PROCESSED
@@ -63,6 +139,54 @@ class Settings(BaseSettings):
     @property
     def audit_path(self) -> Path:
         return self.DATA_DIR / self.OUTPUT_AUDIT
+    
+    @property
+    def quarantine_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_QUARANTINE
+    
+    @property
+    def partitioned_input_path(self) -> Path:
+        return self.DATA_DIR / self.INPUT_PARTITIONED
+    
+    @property
+    def partitioned_output_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_PARTITIONED
+    
+    @property
+    def partitioned_audit_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_AUDIT_PARTITIONED
+    
+    @property
+    def partitioned_quarantine_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_QUARANTINE_PARTITIONED
+    
+    @property
+    def manifest_path(self) -> Path:
+        return self.DATA_DIR / self.INCREMENTAL_MANIFEST
+    
+    @property
+    def profile_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_PROFILE
+    
+    @property
+    def scenarios_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_SCENARIOS
+    
+    @property
+    def fx_risk_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_FX_RISK
+    
+    @property
+    def bonus_cap_path(self) -> Path:
+        return self.DATA_DIR / self.OUTPUT_BONUS_CAP
+    
+    @property
+    def bench_path(self) -> Path:
+        return self.DATA_DIR / self.BENCH_DIR
+    
+    @property
+    def bench_history_path(self) -> Path:
+        return self.DATA_DIR / self.BENCH_HISTORY
 
 
 # Singleton instance
@@ -22,17 +22,27 @@ from meridiano_analysis.dashboard.charts import create_pool_impact_chart, create
 from meridiano_analysis.dashboard.data import load_processed_data, load_audit_data
 
 
-def get_region(sub_code: str) -> str:
-    """Get region from subsidiary code."""
-    mapping = {
-        "ES": "🇪🇸 España", "PT": "🇵🇹 Europa", "DE": "🇩🇪 Europa", "PL": "🇵🇱 Europa",
-        "UK": "🇬🇧 Europa", "US": "🇺🇸 Norteamérica",
-        "BR": "🇧🇷 LATAM", "MX": "🇲🇽 LATAM", "AR": "🇦🇷 LATAM", "CL": "🇨🇱 LATAM",
-        "CO": "🇨🇴 LATAM", "PE": "🇵🇪 LATAM", "UY": "🇺🇾 LATAM",
-        "CN": "🇨🇳 Asia", "SG": "🇸🇬 Asia", "JP": "🇯🇵 Asia",
-    }
-    country = sub_code.split("-")[0] if "-" in sub_code else sub_code
-    return mapping.get(country, "🌍 Otros")
+REGION_BY_COUNTRY = {
+    "ES": "🇪🇸 España", "PT": "🇵🇹 Europa", "DE": "🇩🇪 Europa", "PL": "🇵🇱 Europa",
+    "UK": "🇬🇧 Europa", "US": "🇺🇸 Norteamérica",
+    "BR": "🇧🇷 LATAM", "MX": "🇲🇽 LATAM", "AR": "🇦🇷 LATAM", "CL": "🇨🇱 LATAM",
+    "CO": "🇨🇴 LATAM", "PE": "🇵🇪 LATAM", "UY": "🇺🇾 LATAM",
+    "CN": "🇨🇳 Asia", "SG": "🇸🇬 Asia", "JP": "🇯🇵 Asia",
+}
+OTHER_REGION = "🌍 Otros"
+
+
+def region_expr() -> pl.Expr:
+    """Region of each row from its subsidiary code prefix, as an Enum column."""
+    regions = pl.Enum(list(dict.fromkeys([*REGION_BY_COUNTRY.values(), OTHER_REGION])))
+    return (
+        pl.col("subsidiary_code")
+        .cast(pl.String)
+        .str.split("-")
+        .list.first()
+        .replace_strict(REGION_BY_COUNTRY, default=OTHER_REGION, return_dtype=regions)
+        .alias("region")
+    )
 
 
 def format_eur(value: float) -> str:
@@ -61,9 +71,7 @@ def main():
             df = load_processed_data()
             audit = load_audit_data()
         
-        df = df.with_columns(
-            pl.col("subsidiary_code").map_elements(get_region, return_dtype=pl.Utf8).alias("region")
-        )
+        df = df.with_columns(region_expr())
         
         # Sidebar
         st.sidebar.markdown("### 🎯 Filtros")
@@ -116,8 +124,12 @@ def main():
             # Pool Coverage
             if audit is not None:
                 st.subheader("📊 Cobertura de Pool")
-                audit_viz = audit.with_columns(
-                    pl.col("subsidiary_code").replace(SUBSIDIARY_NAMES).alias("filial")
+                # With a pool hierarchy only the leaf rows have a subsidiary_code
+                audit_viz = audit.drop_nulls("subsidiary_code").with_columns(
+                    pl.col("subsidiary_code")
+                    .cast(pl.String)
+                    .replace(SUBSIDIARY_NAMES)
+                    .alias("filial")
                 ).sort("funding_ratio")
                 
                 colors = ["#C41E3A" if r < 1.0 else "#00A86B" for r in audit_viz["funding_ratio"].to_list()]
@@ -0,0 +1,144 @@
+"""
+Cache of prepared dimension tables.
+
+Every run deduplicates, casts and sorts the same dimension tables, and the
+employee master (the large one) rarely changes. ``DimensionCache`` keeps the
+prepared tables in process memory and as Arrow IPC files on disk, keyed by
+the source (path, size, mtime and content hash of its files) plus a variant
+string naming the preparation. Repeated runs in one process reuse the in-memory
+frames; new processes read the IPC files instead of re-preparing. Both tiers
+evict the least recently used entries beyond ``max_entries``.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from .loaders import DataLoaderFactory, dataset_files, fingerprint
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 16
+
+
+class DimensionCache:
+    """
+    Prepared dimension tables, in memory and as Arrow IPC files.
+
+    Use ``DimensionCache.shared(cache_dir)`` to share one instance (and its
+    memory tier) between the pipelines of a process.
+    """
+
+    _shared: dict[Path, "DimensionCache"] = {}
+
+    def __init__(self, cache_dir: Path | None = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory of the IPC files (None keeps the memory tier only)
+            max_entries: Entries kept per tier before evicting the least recently used
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.memory: OrderedDict[str, pl.DataFrame] = OrderedDict()
+        # (path, size and mtime of each file) -> content hash, so unchanged
+        # sources are hashed once per process
+        self.digests: dict[tuple, str] = {}
+        self.hits = {"memory": 0, "disk": 0, "miss": 0}
+
+    @classmethod
+    def shared(cls, cache_dir: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> "DimensionCache":
+        """The process-wide cache of cache_dir."""
+        key = cache_dir.resolve()
+        if key not in cls._shared:
+            cls._shared[key] = cls(cache_dir, max_entries=max_entries)
+        return cls._shared[key]
+
+    def key(self, source: Path, variant: str = "") -> str:
+        """Cache key of a source (file or dataset directory) and preparation variant."""
+        path = source.resolve()
+        if not path.exists():
+            raise FileNotFoundError(f"Dimension table not found: {path}")
+        stats = [(str(f), f.stat().st_size, f.stat().st_mtime_ns) for f in dataset_files(path)]
+        file_key = (str(path), *stats)
+        if file_key not in self.digests:
+            self.digests[file_key] = fingerprint([path])
+        payload = [CACHE_VERSION, stats, self.digests[file_key], variant]
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+    def load(
+        self,
+        source: Path,
+        prepare: Callable[[pl.LazyFrame], pl.LazyFrame],
+        variant: str = "",
+    ) -> pl.LazyFrame:
+        """
+        The prepared table of source, from memory, disk or prepare (in that order).
+
+        Args:
+            source: Dimension file as given (Parquet or CSV)
+            prepare: Transform from the scanned source to the table to cache
+            variant: Identifies prepare (and anything it depends on, such as
+                the Enum categories); different variants are cached separately
+        """
+        key = self.key(source, variant)
+        path = self._ipc_path(source, key)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self._touch(path)
+            self.hits["memory"] += 1
+            return self.memory[key].lazy()
+
+        if path is not None and path.exists():
+            df = pl.read_ipc(path)
+            self._touch(path)
+            self.hits["disk"] += 1
+        else:
+            df = prepare(DataLoaderFactory.load(source)).collect()
+            self.hits["miss"] += 1
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                df.write_ipc(path)
+                self._touch(path)
+                self._evict_files()
+            logger.info(f"Dimension cache: prepared {source.name} ({df.height} rows)")
+
+        self.memory[key] = df
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+        return df.lazy()
+
+    def clear(self) -> None:
+        """Drop both tiers."""
+        self.memory.clear()
+        self.digests.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.arrow"):
+                path.unlink()
+
+    def _ipc_path(self, source: Path, key: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{source.stem}-{key[:16]}.arrow"
+
+    @staticmethod
+    def _touch(path: Path | None) -> None:
+        """Mark an IPC file as recently used (its mtime orders the disk eviction)."""
+        if path is not None and path.exists():
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))
+
+    def _evict_files(self) -> None:
+        """Remove the least recently used IPC files beyond max_entries."""
+        files = sorted(self.cache_dir.glob("*.arrow"), key=lambda p: p.stat().st_mtime_ns)
+        for path in files[:max(0, len(files) - self.max_entries)]:
+            path.unlink()
@@ -0,0 +1,112 @@
+"""
+Enum dtypes for the low-cardinality columns.
+
+``subsidiary_code``, ``local_currency``, ``job_level`` and
+``category_normalized`` have a few dozen distinct values at most. As
+``pl.Enum`` they are stored as small integer codes, so the joins, the
+funding group-by, the Parquet output and the dashboard filters compare
+integers instead of hashing strings. The categories come from the generator
+config plus the dimension tables of the run, so every frame of a run shares
+exactly the same Enum types (a requirement for joining them). Subsidiary
+codes that only appear in the facts are appended, so no fact loses its key.
+
+``remuneration_concept`` stays a string: it is free text from the source
+systems (see ``concepts.py``) and has no closed set of values.
+"""
+import hashlib
+from dataclasses import dataclass, fields
+from typing import Iterable
+
+import polars as pl
+
+from .generators.config import FX_RATES, JOB_LEVELS, REMUNERATION_CONCEPTS, SUBSIDIARIES
+
+
+def enum_of(*sources: Iterable[str | None]) -> pl.Enum:
+    """Enum over the distinct non-null values of the sources, in first-seen order."""
+    return pl.Enum(list(dict.fromkeys(v for source in sources for v in source if v is not None)))
+
+
+@dataclass(frozen=True)
+class ColumnEnums:
+    """The Enum dtype of each low-cardinality column for one pipeline run."""
+
+    subsidiary_code: pl.Enum
+    local_currency: pl.Enum
+    job_level: pl.Enum
+    category_normalized: pl.Enum
+
+    @classmethod
+    def from_dimensions(
+        cls,
+        employees: pl.LazyFrame,
+        fx_rates: pl.LazyFrame,
+        currency_aliases: pl.LazyFrame,
+        mapping: pl.LazyFrame,
+        pool: pl.LazyFrame,
+        unmapped_value: str,
+        facts: pl.LazyFrame | None = None,
+    ) -> "ColumnEnums":
+        """
+        Build the Enums from the generator config and the dimension tables (one collect).
+
+        With facts, their subsidiary codes missing from config and dimensions
+        are appended to the subsidiary Enum (a scan of that one column).
+        """
+        subs_facts = facts if facts is not None else pl.LazyFrame(
+            schema={"subsidiary_code": pl.String}
+        )
+        subs_emp, subs_pool, subs_fact, levels, fx, alias_targets, categories = pl.collect_all([
+            employees.select(pl.col("subsidiary_code").unique(maintain_order=True)),
+            pool.select(pl.col("subsidiary_code").unique(maintain_order=True)),
+            subs_facts.select(pl.col("subsidiary_code").cast(pl.String).unique().sort()),
+            employees.select(pl.col("job_level").unique(maintain_order=True)),
+            fx_rates.select(pl.col("currency").unique(maintain_order=True)),
+            currency_aliases.select(pl.col("currency").unique(maintain_order=True)),
+            mapping.select(pl.col("category_normalized").unique(maintain_order=True)),
+        ])
+        return cls(
+            subsidiary_code=enum_of(
+                SUBSIDIARIES,
+                subs_pool.to_series(),
+                subs_emp.to_series(),
+                subs_fact.to_series(),
+            ),
+            local_currency=enum_of(FX_RATES, fx.to_series(), alias_targets.to_series()),
+            job_level=enum_of(JOB_LEVELS, levels.to_series()),
+            category_normalized=enum_of(
+                (info["category"] for info in REMUNERATION_CONCEPTS.values()),
+                categories.to_series(),
+                [unmapped_value],
+            ),
+        )
+
+    def digest(self) -> str:
+        """Hash of every Enum's categories (identifies frames cast with these Enums)."""
+        digest = hashlib.sha256()
+        for f in fields(self):
+            digest.update(f.name.encode())
+            for category in getattr(self, f.name).categories:
+                digest.update(b"\0" + category.encode())
+        return digest.hexdigest()
+    
+    def cast(self, df: pl.LazyFrame, columns: dict[str, str] | None = None) -> pl.LazyFrame:
+        """
+        Cast the low-cardinality columns present in df to their Enums.
+
+        Args:
+            df: Frame to cast
+            columns: Frame column -> Enum name, for columns named differently
+                from their Enum (e.g. the FX table's 'currency')
+
+        Unknown subsidiaries and job levels raise when the plan runs; currency
+        codes outside the Enum (unresolved, with no FX rate either way) become
+        null.
+        """
+        names = df.collect_schema().names()
+        targets = {name: name for name in names if name in self.__dataclass_fields__}
+        targets.update({col: enum for col, enum in (columns or {}).items() if col in names})
+        return df.with_columns(
+            pl.col(col).cast(getattr(self, enum), strict=enum != "local_currency")
+            for col, enum in targets.items()
+        )
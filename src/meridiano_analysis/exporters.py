@@ -2,6 +2,8 @@
 Data exporters following the Protocol pattern.
 
 Provides a consistent interface for writing data to different formats.
+Exporters can either write a materialized DataFrame or sink a LazyFrame
+through the streaming engine without materializing it.
 """
 from typing import Protocol, runtime_checkable
 from pathlib import Path
@@ -15,6 +17,10 @@ class DataExporter(Protocol):
     def export(self, df: pl.DataFrame, path: Path) -> None:
         """Export DataFrame to the given path."""
         ...
+    
+    def sink(self, lf: pl.LazyFrame, path: Path) -> None:
+        """Stream LazyFrame results to the given path."""
+        ...
 
 
 class ParquetExporter:
@@ -27,6 +33,11 @@ class ParquetExporter:
         """Write DataFrame to Parquet file."""
         path.parent.mkdir(parents=True, exist_ok=True)
         df.write_parquet(path, compression=self.compression)
+    
+    def sink(self, lf: pl.LazyFrame, path: Path) -> None:
+        """Stream LazyFrame results to a Parquet file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lf.sink_parquet(path, compression=self.compression)
 
 
 class CsvExporter:
@@ -36,6 +47,11 @@ class CsvExporter:
         """Write DataFrame to CSV file."""
         path.parent.mkdir(parents=True, exist_ok=True)
         df.write_csv(path)
+    
+    def sink(self, lf: pl.LazyFrame, path: Path) -> None:
+        """Stream LazyFrame results to a CSV file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lf.sink_csv(path)
 
 
 class DataExporterFactory:
@@ -58,3 +74,9 @@ class DataExporterFactory:
         """Convenience method to export data in one call."""
         exporter = DataExporterFactory.create(path)
         exporter.export(df, path)
+    
+    @staticmethod
+    def sink(lf: pl.LazyFrame, path: Path) -> None:
+        """Convenience method to stream a LazyFrame to a file in one call."""
+        exporter = DataExporterFactory.create(path)
+        exporter.sink(lf, path)
@@ -0,0 +1,36 @@
+"""
+Time-varying FX rates.
+
+The FX history (currency, valid_from, fx_rate_to_eur) holds one row per
+currency and rate change. Facts carrying a payment date are converted at the
+rate valid on that date with a sorted as-of join (see
+``transformers.enrich_with_fx_asof``), which needs the history sorted by
+``valid_from``. The pipeline prepares it once per history file through the
+dimension cache (see ``dimension_cache.py``) and scans the cached copy with
+a sortedness hint, so runs do not re-sort it.
+"""
+import polars as pl
+
+
+FX_HISTORY_KEYS = ["currency", "valid_from"]
+
+
+def prepare_fx_history(history: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Deduplicate and sort an FX history for the as-of join.
+
+    The last row of a (currency, valid_from) pair wins, so corrections can
+    be appended to the source. Days repeating the previous rate of their
+    currency are dropped: the as-of join carries that rate forward anyway.
+    The result is sorted by valid_from (and currency within a day).
+    """
+    rate = pl.col("fx_rate_to_eur")
+    return (
+        history
+        .select(*FX_HISTORY_KEYS, "fx_rate_to_eur")
+        .drop_nulls()
+        .unique(subset=FX_HISTORY_KEYS, keep="last", maintain_order=True)
+        .sort(FX_HISTORY_KEYS)
+        .filter((rate != rate.shift(1).over("currency")).fill_null(True))
+        .sort(["valid_from", "currency"])
+    )
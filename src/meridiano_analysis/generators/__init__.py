@@ -7,6 +7,8 @@ from .config import SUBSIDIARIES, REMUNERATION_CONCEPTS, JOB_LEVELS, FX_RATES
 from .employees import generate_employees
 from .remuneration import generate_remuneration
 from .dimensions import generate_dimension_tables
+from .vectorized import generate_employees_vectorized, generate_remuneration_vectorized
+from .dataset import write_dataset, scale_subsidiaries
 
 __all__ = [
     "SUBSIDIARIES",
@@ -16,4 +18,8 @@ __all__ = [
     "generate_employees",
     "generate_remuneration",
     "generate_dimension_tables",
+    "generate_employees_vectorized",
+    "generate_remuneration_vectorized",
+    "write_dataset",
+    "scale_subsidiaries",
 ]
@@ -3,6 +3,7 @@ Bank configuration for data generation.
 
 Contains all the constants and configuration for realistic bank data.
 """
+from datetime import date
 
 NUM_EMPLOYEES = 200_000
 
@@ -73,8 +74,32 @@ FX_RATES = {
     "PLN": 0.23, "CNY": 0.13, "SGD": 0.69, "JPY": 0.0063,
 }
 
+# Daily volatility of the log FX rate (random-walk history); others use the default
+FX_DAILY_VOLATILITY = {
+    "EUR": 0.0, "ARS": 0.02, "BRL": 0.01, "COP": 0.008, "CLP": 0.007, "MXN": 0.007,
+}
+DEFAULT_FX_DAILY_VOLATILITY = 0.004
+# Daily drift of the log FX rate (ARS devalues steadily against the EUR)
+FX_DAILY_DRIFT = {"ARS": -0.002}
+
+# Payment dates of the generated remuneration (and span of the FX history)
+PAYMENT_PERIOD_START = date(2022, 1, 1)
+PAYMENT_PERIOD_DAYS = 3 * 365 + 1
+
 FUNDING_FACTORS = {
     "ES": 0.95, "UK": 0.98, "US": 1.0, "DE": 0.95, "PT": 0.92,
     "BR": 0.80, "MX": 0.85, "AR": 0.60, "CL": 0.90, "CO": 0.85,
     "PE": 0.80, "UY": 0.90, "PL": 0.75, "CN": 0.70, "SG": 0.95, "JP": 0.90
 }
+
+# Pool hierarchy above the subsidiaries: group -> region -> country -> subsidiary
+GROUP_NAME = "MERIDIANO"
+REGION_BY_COUNTRY = {
+    "ES": "EUROPE", "PT": "EUROPE", "DE": "EUROPE", "UK": "EUROPE", "PL": "EUROPE",
+    "BR": "LATAM", "MX": "LATAM", "AR": "LATAM", "CL": "LATAM", "CO": "LATAM",
+    "PE": "LATAM", "UY": "LATAM",
+    "US": "NORTH_AMERICA",
+    "CN": "ASIA", "SG": "ASIA", "JP": "ASIA",
+}
+REGION_FUNDING_FACTORS = {"EUROPE": 0.93, "LATAM": 0.78, "NORTH_AMERICA": 1.0, "ASIA": 0.85}
+GROUP_FUNDING_FACTOR = 0.88
@@ -0,0 +1,188 @@
+"""
+Chunked dataset generation with streaming Parquet output.
+
+Generates the data subsidiary by subsidiary, in fixed-size chunks of employees,
+and writes each chunk as its own part file of a Parquet dataset directory.
+Peak memory is bounded by the chunk size, whatever the scale factor.
+
+Chunks are independent (each derives its own child seed from the root seed
+and its chunk index), so they can also be generated across a process pool
+with output identical for any worker count.
+"""
+import multiprocessing
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import polars as pl
+
+from .config import SUBSIDIARIES
+from .vectorized import generate_employees_vectorized, generate_remuneration_vectorized
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    """A fixed-size slice of one subsidiary's employees."""
+
+    index: int
+    subsidiary_code: str
+    id_offset: int
+    employees: int
+
+
+@dataclass
+class DatasetSummary:
+    """Row and part counts of a generated dataset."""
+
+    employees: int
+    records: int
+    parts: int
+
+
+def scale_subsidiaries(
+    scale: int = 1,
+    subsidiaries: dict[str, dict] | None = None,
+) -> dict[str, dict]:
+    """Return a copy of the subsidiary config with headcounts multiplied by scale."""
+    if scale < 1:
+        raise ValueError(f"Scale must be >= 1, got {scale}")
+    subsidiaries = subsidiaries if subsidiaries is not None else SUBSIDIARIES
+    return {
+        code: {**info, "employees": info["employees"] * scale}
+        for code, info in subsidiaries.items()
+    }
+
+
+def iter_chunks(
+    subsidiaries: dict[str, dict],
+    chunk_size: int,
+) -> Iterator[ChunkSpec]:
+    """Split every subsidiary into chunks of at most chunk_size employees."""
+    index = 0
+    id_offset = 0
+    for code, info in subsidiaries.items():
+        for start in range(0, info["employees"], chunk_size):
+            size = min(chunk_size, info["employees"] - start)
+            yield ChunkSpec(index, code, id_offset, size)
+            index += 1
+            id_offset += size
+
+
+def generate_chunk(
+    spec: ChunkSpec,
+    subsidiaries: dict[str, dict],
+    seed: int = 42,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Generate employees and remuneration for one chunk.
+
+    The random stream is derived from (seed, chunk index) only, so a chunk
+    is reproducible independently of the others.
+    """
+    employee_seed, remuneration_seed = np.random.SeedSequence(
+        seed, spawn_key=(spec.index,)
+    ).spawn(2)
+    chunk_config = {
+        spec.subsidiary_code: {**subsidiaries[spec.subsidiary_code], "employees": spec.employees}
+    }
+
+    employees = generate_employees_vectorized(
+        seed=employee_seed, subsidiaries=chunk_config, id_offset=spec.id_offset
+    )
+    remuneration = generate_remuneration_vectorized(
+        employees, seed=remuneration_seed, subsidiaries=chunk_config
+    )
+    return employees, remuneration
+
+
+def part_path(dataset_dir: Path, spec: ChunkSpec) -> Path:
+    """Path of the part file for a chunk inside a dataset directory."""
+    return dataset_dir / f"part-{spec.index:05d}-{spec.subsidiary_code}.parquet"
+
+
+def remove_dataset(path: Path) -> None:
+    """Remove a previous single-file or directory dataset at path, if any."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def prepare_dataset_dir(path: Path) -> None:
+    """Create an empty dataset directory, replacing any previous file or dataset."""
+    remove_dataset(path)
+    path.mkdir(parents=True)
+
+
+def write_chunk(
+    spec: ChunkSpec,
+    subsidiaries: dict[str, dict],
+    remuneration_dir: Path,
+    employees_dir: Path,
+    seed: int = 42,
+) -> tuple[int, int]:
+    """Generate one chunk and write its part files. Returns (employees, records)."""
+    employees, remuneration = generate_chunk(spec, subsidiaries, seed)
+    employees.write_parquet(part_path(employees_dir, spec))
+    remuneration.write_parquet(part_path(remuneration_dir, spec))
+    return employees.height, remuneration.height
+
+
+def write_dataset(
+    remuneration_path: Path,
+    employees_path: Path,
+    scale: int = 1,
+    seed: int = 42,
+    chunk_size: int = 100_000,
+    workers: int = 1,
+    subsidiaries: dict[str, dict] | None = None,
+) -> DatasetSummary:
+    """
+    Generate the full dataset chunk by chunk into Parquet dataset directories.
+
+    Args:
+        remuneration_path: Dataset directory for remuneration part files
+        employees_path: Dataset directory for employee master part files
+        scale: Multiplier applied to every subsidiary headcount
+        seed: Root seed; each chunk derives its own child seed
+        chunk_size: Maximum employees generated and held in memory at once
+            (per worker)
+        workers: Number of worker processes; 1 generates in-process
+        subsidiaries: Subsidiary config to generate instead of the scaled
+            default one (scale is then ignored)
+    """
+    if workers < 1:
+        raise ValueError(f"Workers must be >= 1, got {workers}")
+
+    if subsidiaries is None:
+        subsidiaries = scale_subsidiaries(scale)
+    specs = list(iter_chunks(subsidiaries, chunk_size))
+    prepare_dataset_dir(remuneration_path)
+    prepare_dataset_dir(employees_path)
+
+    if workers == 1:
+        counts = [
+            write_chunk(spec, subsidiaries, remuneration_path, employees_path, seed)
+            for spec in specs
+        ]
+    else:
+        # 'spawn' avoids forking a process that already runs Polars' thread pool
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            counts = list(pool.map(
+                write_chunk,
+                specs,
+                [subsidiaries] * len(specs),
+                [remuneration_path] * len(specs),
+                [employees_path] * len(specs),
+                [seed] * len(specs),
+            ))
+
+    return DatasetSummary(
+        employees=sum(n_employees for n_employees, _ in counts),
+        records=sum(n_records for _, n_records in counts),
+        parts=len(specs),
+    )
@@ -3,9 +3,25 @@ Dimension tables generator.
 """
 import polars as pl
 import numpy as np
+from datetime import date
 from pathlib import Path
 
-from .config import REMUNERATION_CONCEPTS, SUBSIDIARIES, FX_RATES, FUNDING_FACTORS
+from .config import (
+    REMUNERATION_CONCEPTS,
+    SUBSIDIARIES,
+    FX_RATES,
+    FUNDING_FACTORS,
+    FX_DAILY_VOLATILITY,
+    DEFAULT_FX_DAILY_VOLATILITY,
+    FX_DAILY_DRIFT,
+    PAYMENT_PERIOD_START,
+    PAYMENT_PERIOD_DAYS,
+    GROUP_NAME,
+    REGION_BY_COUNTRY,
+    REGION_FUNDING_FACTORS,
+    GROUP_FUNDING_FACTOR,
+)
+from .garbage import CURRENCY_VARIANTS
 
 
 def generate_fx_rates() -> pl.DataFrame:
@@ -16,6 +32,54 @@ def generate_fx_rates() -> pl.DataFrame:
     })
 
 
+def generate_fx_history(
+    start: date = PAYMENT_PERIOD_START,
+    days: int = PAYMENT_PERIOD_DAYS,
+    seed: int = 789,
+) -> pl.DataFrame:
+    """
+    Generate a daily FX rate history (currency, valid_from, fx_rate_to_eur).
+    
+    Each currency follows a random walk in log space starting at its
+    FX_RATES value, with its own daily volatility and drift. The rows are
+    in generation order (by currency, then date), not sorted by date.
+    """
+    rng = np.random.default_rng(seed)
+    currencies = list(FX_RATES)
+    volatility = np.array([
+        FX_DAILY_VOLATILITY.get(c, DEFAULT_FX_DAILY_VOLATILITY) for c in currencies
+    ])
+    drift = np.array([FX_DAILY_DRIFT.get(c, 0.0) for c in currencies])
+    
+    steps = rng.normal(drift[:, None], volatility[:, None], (len(currencies), days))
+    steps[:, 0] = 0.0
+    log_rates = np.log(list(FX_RATES.values()))[:, None] + np.cumsum(steps, axis=1)
+    valid_from = np.datetime64(start, "D") + np.arange(days).astype("timedelta64[D]")
+    
+    return pl.DataFrame({
+        "currency": np.repeat(currencies, days),
+        "valid_from": np.tile(valid_from, len(currencies)),
+        "fx_rate_to_eur": np.exp(log_rates).ravel(),
+    })
+
+
+def generate_currency_aliases() -> pl.DataFrame:
+    """
+    Generate the currency alias dimension table.
+    
+    Maps every stripped, upper-cased spelling seen in the source systems
+    (names, symbols, ISO codes themselves) to its ISO code.
+    """
+    aliases = {code: code for code in FX_RATES}
+    for code, variants in CURRENCY_VARIANTS.items():
+        for variant in variants:
+            aliases[variant.strip().upper()] = code
+    return pl.DataFrame({
+        "alias": list(aliases.keys()),
+        "currency": list(aliases.values()),
+    })
+
+
 def generate_mapping() -> pl.DataFrame:
     """Generate concept mapping dimension table."""
     mapping_data = []
@@ -28,8 +92,8 @@ def generate_mapping() -> pl.DataFrame:
     return pl.DataFrame(mapping_data)
 
 
-def generate_bonus_pool(seed: int = 456) -> pl.DataFrame:
-    """Generate bonus pool allocations dimension table."""
+def generate_bonus_pool(seed: int = 456, scale: float = 1) -> pl.DataFrame:
+    """Generate bonus pool allocations dimension table, sized to scaled headcounts."""
     np.random.seed(seed)
     
     pools = []
@@ -37,7 +101,7 @@ def generate_bonus_pool(seed: int = 456) -> pl.DataFrame:
         country = sub_code.split("-")[0]
         factor = FUNDING_FACTORS.get(country, 0.85)
         
-        theoretical = sub_info["employees"] * 50000 * 0.15
+        theoretical = sub_info["employees"] * scale * 50000 * 0.15
         pool = theoretical * factor * np.random.uniform(0.9, 1.1)
         
         pools.append({
@@ -48,11 +112,62 @@ def generate_bonus_pool(seed: int = 456) -> pl.DataFrame:
     return pl.DataFrame(pools)
 
 
-def generate_dimension_tables(data_dir: Path) -> None:
-    """Generate and save all dimension tables."""
+def generate_pool_hierarchy(seed: int = 457, scale: float = 1) -> pl.DataFrame:
+    """
+    Generate the pool hierarchy dimension table (level, node, parent, pool_amount_eur).
+    
+    One row per node of group -> region -> country -> subsidiary, top-down.
+    Region and group pools are a share of their theoretical demand, country
+    pools close to the sum of their subsidiaries' pools. Subsidiary rows
+    carry no pool: theirs comes from the bonus pool table.
+    """
+    rng = np.random.default_rng(seed)
+    theoretical = {
+        code: info["employees"] * scale * 50000 * 0.15 for code, info in SUBSIDIARIES.items()
+    }
+    country_of = {code: code.split("-")[0] for code in SUBSIDIARIES}
+    countries = list(dict.fromkeys(country_of.values()))
+    regions = list(dict.fromkeys(REGION_BY_COUNTRY[c] for c in countries))
+    
+    def demand(countries_in: set[str]) -> float:
+        return sum(v for code, v in theoretical.items() if country_of[code] in countries_in)
+    
+    rows = [("group", GROUP_NAME, None, round(demand(set(countries)) * GROUP_FUNDING_FACTOR, 2))]
+    for region in regions:
+        members = {c for c in countries if REGION_BY_COUNTRY[c] == region}
+        pool = demand(members) * REGION_FUNDING_FACTORS.get(region, 0.85)
+        rows.append(("region", region, GROUP_NAME, round(pool, 2)))
+    for country in countries:
+        factor = FUNDING_FACTORS.get(country, 0.85) * rng.uniform(0.95, 1.05)
+        pool = demand({country}) * factor
+        rows.append(("country", country, REGION_BY_COUNTRY[country], round(pool, 2)))
+    rows.extend(("subsidiary", code, country_of[code], None) for code in SUBSIDIARIES)
+    
+    return pl.DataFrame(
+        rows,
+        schema={
+            "level": pl.String,
+            "node": pl.String,
+            "parent": pl.String,
+            "pool_amount_eur": pl.Float64,
+        },
+        orient="row",
+    )
+
+
+def generate_dimension_tables(
+    data_dir: Path,
+    scale: float = 1,
+    pool_hierarchy: bool = False,
+) -> None:
+    """Generate and save all dimension tables (the pool hierarchy only on request)."""
     dim_dir = data_dir / "dim"
     dim_dir.mkdir(parents=True, exist_ok=True)
     
     generate_fx_rates().write_parquet(dim_dir / "fx_rates.parquet")
+    generate_fx_history().write_parquet(dim_dir / "fx_history.parquet")
+    generate_currency_aliases().write_parquet(dim_dir / "currency_aliases.parquet")
     generate_mapping().write_parquet(dim_dir / "mapping.parquet")
-    generate_bonus_pool().write_parquet(dim_dir / "bonus_pool.parquet")
+    generate_bonus_pool(scale=scale).write_parquet(dim_dir / "bonus_pool.parquet")
+    if pool_hierarchy:
+        generate_pool_hierarchy(scale=scale).write_parquet(dim_dir / "pool_hierarchy.parquet")
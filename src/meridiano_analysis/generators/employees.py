@@ -27,6 +27,7 @@ def generate_employees(seed: int = 42) -> pl.DataFrame:
             
             employees.append({
                 "employee_id": f"EMP{emp_id:08d}",
+                "employee_key": emp_id,
                 "subsidiary_code": sub_code,
                 "job_level": level,
                 "is_mrt": level_info["mrt_eligible"] and random.random() < 0.3,
@@ -35,4 +36,4 @@ def generate_employees(seed: int = 42) -> pl.DataFrame:
             })
             emp_id += 1
     
-    return pl.DataFrame(employees)
+    return pl.DataFrame(employees).with_columns(pl.col("employee_key").cast(pl.UInt32))
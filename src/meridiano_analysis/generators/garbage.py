@@ -2,21 +2,44 @@
 Garbage data generators.
 
 Simulates real-world data quality issues from different subsidiaries.
+
+The scalar ``add_garbage_*`` functions corrupt one value at a time and back the
+legacy generator. The ``corrupt_*`` kernels apply the same corruptions, with
+the same probabilities, to whole columns at once for the vectorized generator.
 """
 import random
 import string
 
+import numpy as np
+import polars as pl
+
+
+CURRENCY_VARIANTS = {
+    "EUR": ["EUR", "Euro", "EURO", "€", " EUR", "EUR ", "eur", "Eur"],
+    "USD": ["USD", "US$", "Dollar", "DOLLAR", "$", "usd", "Usd", " USD"],
+    "GBP": ["GBP", "£", "Pound", "POUND", "gbp", "Gbp", "GBP "],
+    "BRL": ["BRL", "R$", "Real", "REAL", "brl", "Brl", "BRL "],
+    "MXN": ["MXN", "MX$", "Peso", "PESO", "mxn", "Mxn", "MXN "],
+}
+
+CONCEPT_SUFFIXES = ["", " 2024", " Q4", " FY23"]
+NUM_CONCEPT_GARBAGE_TYPES = 9
+NUM_AMOUNT_GARBAGE_TYPES = 6
+
+AMOUNT_GARBAGE_PROBABILITY = 0.3
+EMPLOYEE_ID_GARBAGE_PROBABILITY = 0.3
+
+EMPLOYEE_ID_GARBAGE_BY_REGION = {
+    "BR": lambda e: e.replace("-", ""),
+    "AR": lambda e: "ARG" + e[-8:],
+    "MX": lambda e: e.upper().replace("EMP", "MX-EMP"),
+    "CN": lambda e: e + "-" + "".join(random.choices(string.ascii_uppercase, k=2)),
+}
+
 
 def add_garbage_currency(currency: str) -> str:
     """Introduce currency format garbage."""
-    variants = {
-        "EUR": ["EUR", "Euro", "EURO", "€", " EUR", "EUR ", "eur", "Eur"],
-        "USD": ["USD", "US$", "Dollar", "DOLLAR", "$", "usd", "Usd", " USD"],
-        "GBP": ["GBP", "£", "Pound", "POUND", "gbp", "Gbp", "GBP "],
-        "BRL": ["BRL", "R$", "Real", "REAL", "brl", "Brl", "BRL "],
-        "MXN": ["MXN", "MX$", "Peso", "PESO", "mxn", "Mxn", "MXN "],
-    }
-    return random.choice(variants.get(currency, [currency]))
+    return random.choice(CURRENCY_VARIANTS.get(currency, [currency]))
 
 
 def add_garbage_concept(concept: str) -> str:
@@ -27,7 +50,7 @@ def add_garbage_concept(concept: str) -> str:
         lambda c: c.replace("_", "-"),
         lambda c: " " + c,
         lambda c: c + " ",
-        lambda c: c + random.choice(["", " 2024", " Q4", " FY23"]),
+        lambda c: c + random.choice(CONCEPT_SUFFIXES),
         lambda c: c.replace("BONUS", "BONU"),
         lambda c: c.replace("DIFERIDO", "DEFERIDO"),
         lambda c: c.replace("Ñ", "N").replace("ñ", "n"),
@@ -45,18 +68,140 @@ def add_garbage_amount(amount: float) -> float:
         lambda a: round(a, 0),
         lambda a: a * 12 if random.random() < 0.05 else a,
     ]
-    return garbage_types[0](amount) if random.random() > 0.3 else random.choice(garbage_types)(amount)
+    if random.random() > AMOUNT_GARBAGE_PROBABILITY:
+        return garbage_types[0](amount)
+    return random.choice(garbage_types)(amount)
 
 
 def add_garbage_employee_id(emp_id: str, subsidiary: str) -> str:
     """Introduce employee ID garbage based on subsidiary legacy systems."""
-    garbage_by_region = {
-        "BR": lambda e: e.replace("-", ""),
-        "AR": lambda e: "ARG" + e[-8:],
-        "MX": lambda e: e.upper().replace("EMP", "MX-EMP"),
-        "CN": lambda e: e + "-" + "".join(random.choices(string.ascii_uppercase, k=2)),
-    }
     country = subsidiary.split("-")[0]
-    if country in garbage_by_region and random.random() < 0.3:
-        return garbage_by_region[country](emp_id)
+    garbage = EMPLOYEE_ID_GARBAGE_BY_REGION.get(country)
+    if garbage is not None and random.random() < EMPLOYEE_ID_GARBAGE_PROBABILITY:
+        return garbage(emp_id)
     return emp_id
+
+
+def corrupt_currency(currency: pl.Series, rng: np.random.Generator) -> pl.Series:
+    """Replace each currency with a random variant through one flat lookup table."""
+    flat_variants = [v for variants in CURRENCY_VARIANTS.values() for v in variants]
+    offsets, counts, start = {}, {}, 0
+    for code, variants in CURRENCY_VARIANTS.items():
+        offsets[code], counts[code] = start, len(variants)
+        start += len(variants)
+
+    offset = currency.replace_strict(offsets, default=-1, return_dtype=pl.Int64).to_numpy()
+    count = currency.replace_strict(counts, default=1, return_dtype=pl.Int64).to_numpy()
+    pick = offset + (rng.random(len(currency)) * count).astype(np.int64)
+    known = offset >= 0
+
+    return pl.DataFrame({
+        "currency": currency,
+        "variant": pl.Series(flat_variants).gather(np.where(known, pick, 0)),
+        "known": known,
+    }).select(
+        pl.when(pl.col("known"))
+        .then(pl.col("variant"))
+        .otherwise(pl.col("currency"))
+        .alias(currency.name)
+    ).to_series()
+
+
+def corrupt_concept(concept: pl.Series, rng: np.random.Generator) -> pl.Series:
+    """Apply one randomly chosen string corruption per concept as Polars expressions."""
+    n = len(concept)
+    c = pl.col("concept")
+    kind = pl.col("kind")
+
+    return pl.DataFrame({
+        "concept": concept,
+        "kind": rng.integers(0, NUM_CONCEPT_GARBAGE_TYPES, n),
+        "suffix": pl.Series(CONCEPT_SUFFIXES).gather(rng.integers(0, len(CONCEPT_SUFFIXES), n)),
+    }).select(
+        pl.when(kind == 0).then(c.str.to_lowercase())
+        .when(kind == 1).then(c.str.replace_all("_", " ", literal=True))
+        .when(kind == 2).then(c.str.replace_all("_", "-", literal=True))
+        .when(kind == 3).then(pl.lit(" ") + c)
+        .when(kind == 4).then(c + pl.lit(" "))
+        .when(kind == 5).then(c + pl.col("suffix"))
+        .when(kind == 6).then(c.str.replace_all("BONUS", "BONU", literal=True))
+        .when(kind == 7).then(c.str.replace_all("DIFERIDO", "DEFERIDO", literal=True))
+        .otherwise(
+            c.str.replace_all("Ñ", "N", literal=True).str.replace_all("ñ", "n", literal=True)
+        )
+        .alias(concept.name)
+    ).to_series()
+
+
+def corrupt_amount(amount: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Apply amount corruptions with masked array arithmetic."""
+    n = len(amount)
+    corrupt = rng.random(n) < AMOUNT_GARBAGE_PROBABILITY
+    kind = rng.integers(0, NUM_AMOUNT_GARBAGE_TYPES, n)
+    u = rng.random(n)
+
+    corrupted = np.select(
+        [
+            kind == 1,
+            kind == 2,
+            (kind == 3) & (u < 0.1),
+            kind == 4,
+            (kind == 5) & (u < 0.05),
+        ],
+        [amount * 1000, amount / 1000, -np.abs(amount), np.round(amount), amount * 12],
+        default=amount,
+    )
+    return np.where(corrupt, corrupted, amount)
+
+
+def corrupt_employee_id(
+    employee_id: pl.Series,
+    subsidiary_code: pl.Series,
+    rng: np.random.Generator,
+) -> pl.Series:
+    """Apply the per-region legacy ID formats as Polars expressions."""
+    n = len(employee_id)
+    letters = np.array(list(string.ascii_uppercase))[rng.integers(0, 26, (n, 2))]
+    e = pl.col("employee_id")
+    country = pl.col("subsidiary_code").str.split("-").list.first()
+    apply = pl.col("apply")
+
+    return pl.DataFrame({
+        "employee_id": employee_id,
+        "subsidiary_code": subsidiary_code,
+        "apply": rng.random(n) < EMPLOYEE_ID_GARBAGE_PROBABILITY,
+        "letters": pl.Series(letters[:, 0]) + pl.Series(letters[:, 1]),
+    }).select(
+        pl.when(apply & (country == "BR")).then(e.str.replace_all("-", "", literal=True))
+        .when(apply & (country == "AR")).then(pl.lit("ARG") + e.str.slice(-8))
+        .when(apply & (country == "MX")).then(
+            e.str.to_uppercase().str.replace_all("EMP", "MX-EMP", literal=True)
+        )
+        .when(apply & (country == "CN")).then(e + pl.lit("-") + pl.col("letters"))
+        .otherwise(e)
+        .alias(employee_id.name)
+    ).to_series()
+
+
+def apply_garbage(
+    df: pl.DataFrame,
+    is_garbage: np.ndarray,
+    rng: np.random.Generator,
+) -> pl.DataFrame:
+    """Corrupt the flagged rows of a remuneration frame with the vectorized kernels."""
+    rows = np.flatnonzero(is_garbage)
+    if len(rows) == 0:
+        return df
+
+    dirty = df[rows]
+    dirty = dirty.with_columns(
+        corrupt_employee_id(dirty["employee_id"], dirty["subsidiary_code"], rng),
+        corrupt_currency(dirty["local_currency"], rng),
+        corrupt_concept(dirty["remuneration_concept"], rng),
+        pl.Series("local_amount", corrupt_amount(dirty["local_amount"].to_numpy(), rng)),
+    )
+    return df.with_columns(
+        df[c].clone().scatter(rows, dirty[c]) for c in (
+            "employee_id", "local_currency", "remuneration_concept", "local_amount"
+        )
+    )
@@ -4,8 +4,11 @@ Remuneration data generator.
 import polars as pl
 import numpy as np
 import random
+from datetime import timedelta
 
-from .config import SUBSIDIARIES, REMUNERATION_CONCEPTS, FX_RATES
+from .config import (
+    SUBSIDIARIES, REMUNERATION_CONCEPTS, FX_RATES, PAYMENT_PERIOD_START, PAYMENT_PERIOD_DAYS
+)
 from .garbage import (
     add_garbage_currency,
     add_garbage_concept,
@@ -18,6 +21,9 @@ def generate_remuneration(employees_df: pl.DataFrame, seed: int = 123) -> pl.Dat
     """Generate remuneration with realistic distribution and garbage data."""
     np.random.seed(seed)
     random.seed(seed)
+    # Own stream for payment dates, so the other columns keep the values the
+    # seed produced before payment dates existed
+    payment_days = random.Random(seed)
     
     records = []
     employees = employees_df.to_dicts()
@@ -64,6 +70,9 @@ def generate_remuneration(employees_df: pl.DataFrame, seed: int = 123) -> pl.Dat
                 "is_mrt": emp["is_mrt"],
                 "is_deferred": concept_info.get("is_deferred", False),
                 "is_equity": concept_info.get("is_equity", False),
+                "payment_date": PAYMENT_PERIOD_START + timedelta(
+                    days=payment_days.randrange(PAYMENT_PERIOD_DAYS)
+                ),
             }
             records.append(record)
     
@@ -0,0 +1,144 @@
+"""
+Vectorized (columnar) data generators.
+
+Draws every random quantity as a whole NumPy array with ``np.random.Generator``
+and builds the Polars frames directly from those arrays. Produces the same
+schema and distributions as the legacy row-by-row generators in a fraction
+of the time.
+"""
+import numpy as np
+import polars as pl
+
+from .config import (
+    SUBSIDIARIES,
+    REMUNERATION_CONCEPTS,
+    JOB_LEVELS,
+    FX_RATES,
+    PAYMENT_PERIOD_START,
+    PAYMENT_PERIOD_DAYS,
+)
+from .garbage import apply_garbage
+
+# Cumulative probabilities for the number of concepts per employee
+NUM_CONCEPTS_CDF_MRT = np.array([0.3, 0.7, 0.9, 1.0])
+NUM_CONCEPTS_CDF_STANDARD = np.array([0.5, 0.85, 1.0])
+
+
+def _format_employee_ids(ids: np.ndarray) -> pl.Series:
+    """Format integer IDs as 'EMP########' strings."""
+    return ("EMP" + pl.Series(ids).cast(pl.Utf8).str.zfill(8)).alias("employee_id")
+
+
+def generate_employees_vectorized(
+    seed: int | np.random.SeedSequence = 42,
+    subsidiaries: dict[str, dict] | None = None,
+    id_offset: int = 0,
+) -> pl.DataFrame:
+    """
+    Generate employee master data as whole columns.
+
+    Args:
+        seed: Seed (or SeedSequence) for the random generator
+        subsidiaries: Subsidiary config, defaults to SUBSIDIARIES
+        id_offset: First numeric employee ID, used when generating in chunks
+    """
+    subsidiaries = subsidiaries if subsidiaries is not None else SUBSIDIARIES
+    rng = np.random.default_rng(seed)
+
+    sub_codes = list(subsidiaries.keys())
+    headcounts = np.array([info["employees"] for info in subsidiaries.values()], dtype=np.int64)
+    sub_idx = np.repeat(np.arange(len(sub_codes)), headcounts)
+    n = len(sub_idx)
+
+    level_names = list(JOB_LEVELS.keys())
+    level_p = np.array([JOB_LEVELS[l]["pct"] for l in level_names])
+    level_min = np.array([JOB_LEVELS[l]["min"] for l in level_names], dtype=np.float64)
+    level_max = np.array([JOB_LEVELS[l]["max"] for l in level_names], dtype=np.float64)
+    level_mrt = np.array([JOB_LEVELS[l]["mrt_eligible"] for l in level_names])
+
+    level_idx = rng.choice(len(level_names), size=n, p=level_p / level_p.sum())
+    base = rng.uniform(level_min[level_idx], level_max[level_idx])
+    is_mrt = level_mrt[level_idx] & (rng.random(n) < 0.3)
+
+    currencies = [info["currency"] for info in subsidiaries.values()]
+
+    ids = np.arange(id_offset, id_offset + n)
+    return pl.DataFrame([
+        _format_employee_ids(ids),
+        pl.Series("employee_key", ids, dtype=pl.UInt32),
+        pl.Series("subsidiary_code", sub_codes).gather(sub_idx),
+        pl.Series("job_level", level_names).gather(level_idx),
+        pl.Series("is_mrt", is_mrt),
+        pl.Series("base_salary_eur", np.round(base, 2)),
+        pl.Series("local_currency", currencies).gather(sub_idx),
+    ])
+
+
+def _draw_num_concepts(rng: np.random.Generator, is_mrt: np.ndarray) -> np.ndarray:
+    """Draw the number of concepts per employee (1-4 for MRTs, 1-3 otherwise)."""
+    u = rng.random(len(is_mrt))
+    return np.where(
+        is_mrt,
+        np.searchsorted(NUM_CONCEPTS_CDF_MRT, u, side="right") + 1,
+        np.searchsorted(NUM_CONCEPTS_CDF_STANDARD, u, side="right") + 1,
+    )
+
+
+def generate_remuneration_vectorized(
+    employees_df: pl.DataFrame,
+    seed: int | np.random.SeedSequence = 123,
+    subsidiaries: dict[str, dict] | None = None,
+) -> pl.DataFrame:
+    """Generate remuneration records as whole columns, with garbage data."""
+    subsidiaries = subsidiaries if subsidiaries is not None else SUBSIDIARIES
+    rng = np.random.default_rng(seed)
+
+    var_concepts = {k: v for k, v in REMUNERATION_CONCEPTS.items() if v.get("is_variable", False)}
+    concept_list = list(var_concepts.keys())
+    concept_weights = np.array([var_concepts[c]["weight"] for c in concept_list])
+    concept_pct = np.array([var_concepts[c]["avg_pct"] for c in concept_list])
+    concept_deferred = np.array([var_concepts[c].get("is_deferred", False) for c in concept_list])
+    concept_equity = np.array([var_concepts[c].get("is_equity", False) for c in concept_list])
+
+    is_mrt = employees_df["is_mrt"].to_numpy()
+    base = employees_df["base_salary_eur"].to_numpy()
+    fx = employees_df["local_currency"].replace_strict(FX_RATES, return_dtype=pl.Float64).to_numpy()
+    garbage_rates = {k: v["garbage_rate"] for k, v in subsidiaries.items()}
+    garbage_rate = (
+        employees_df["subsidiary_code"]
+        .replace_strict(garbage_rates, return_dtype=pl.Float64)
+        .to_numpy()
+    )
+
+    # One row per (employee, concept)
+    emp_idx = np.repeat(np.arange(employees_df.height), _draw_num_concepts(rng, is_mrt))
+    m = len(emp_idx)
+
+    concept_idx = rng.choice(len(concept_list), size=m, p=concept_weights / concept_weights.sum())
+    variation = rng.uniform(0.6, 1.4, m)
+    pct = concept_pct[concept_idx]
+    amount_eur = base[emp_idx] * np.abs(pct) * variation * np.sign(pct)
+    local_fx = fx[emp_idx]
+    local_amount = np.where(local_fx > 0, amount_eur / local_fx, amount_eur)
+
+    is_garbage = rng.random(m) < garbage_rate[emp_idx]
+    payment_day = rng.integers(0, PAYMENT_PERIOD_DAYS, m)
+
+    df = pl.DataFrame([
+        employees_df["employee_id"].gather(emp_idx),
+        employees_df["subsidiary_code"].gather(emp_idx),
+        employees_df["local_currency"].gather(emp_idx),
+        pl.Series("remuneration_concept", concept_list).gather(concept_idx),
+        pl.Series("local_amount", local_amount),
+        pl.Series("bonus_target_pct", np.round(np.abs(pct), 2)),
+        pl.Series("is_mrt", is_mrt[emp_idx]),
+        pl.Series("is_deferred", concept_deferred[concept_idx]),
+        pl.Series("is_equity", concept_equity[concept_idx]),
+        pl.Series(
+            "payment_date",
+            np.datetime64(PAYMENT_PERIOD_START, "D") + payment_day.astype("timedelta64[D]"),
+        ),
+    ])
+
+    df = apply_garbage(df, is_garbage, rng)
+    return df.with_columns(pl.col("local_amount").round(2))
@@ -0,0 +1,333 @@
+"""
+Incremental ETL over subsidiary partitions.
+
+The input is laid out as hive-style partitions, one directory per subsidiary
+(``subsidiary_code=ES-MAD/``, optionally with nested levels such as
+``period=2024-12/``). A JSON manifest records a content hash per partition and
+fingerprints of the dimension tables (plus the concept alias table) and of
+the settings that change results; when either fingerprint changes, every
+partition is re-processed. Otherwise each run only re-processes partitions
+whose content changed; because the funding ratio is subsidiary-local, their
+ratios can be recomputed without touching the other subsidiaries, and the
+output and audit partitions of unchanged subsidiaries are reused as-is. The
+partitions are then merged into the pipeline's output and audit files, which
+the dashboard reads. Pool hierarchies and surplus redistribution couple the
+subsidiaries' ratios, so runs with either are rejected.
+"""
+import hashlib
+import json
+import logging
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import polars as pl
+
+from .config import settings
+from .dtypes import ColumnEnums
+from .exporters import DataExporterFactory
+from .loaders import DataLoaderFactory, dataset_files, fingerprint
+from .pipeline import ETLPipeline, PipelineResult
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEY = "subsidiary_code"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class IncrementalResult(PipelineResult):
+    """Result of an incremental ETL run."""
+
+    partitions_processed: list[str] = field(default_factory=list)
+    partitions_reused: list[str] = field(default_factory=list)
+    partitions_removed: list[str] = field(default_factory=list)
+
+
+def partition_dir(root: Path, code: str) -> Path:
+    """Directory of one subsidiary partition under a partitioned root."""
+    return root / f"{PARTITION_KEY}={code}"
+
+
+def discover_partitions(root: Path) -> dict[str, Path]:
+    """Map subsidiary code -> partition directory for a partitioned input."""
+    if not root.is_dir():
+        raise FileNotFoundError(f"Partitioned input not found: {root}")
+    prefix = f"{PARTITION_KEY}="
+    return {
+        d.name[len(prefix):]: d
+        for d in sorted(root.iterdir())
+        if d.is_dir() and d.name.startswith(prefix)
+    }
+
+
+def partition_input(source: Path, target: Path) -> list[str]:
+    """
+    Split a remuneration input (file or dataset) into subsidiary partitions.
+
+    Returns:
+        The subsidiary codes written.
+    """
+    df = DataLoaderFactory.load(source).collect()
+    if target.exists():
+        shutil.rmtree(target)
+
+    codes = []
+    for (code,), part in df.partition_by(PARTITION_KEY, as_dict=True).items():
+        out_dir = partition_dir(target, code)
+        out_dir.mkdir(parents=True)
+        part.write_parquet(out_dir / "part-00000.parquet")
+        codes.append(code)
+    return sorted(codes)
+
+
+class IncrementalPipeline:
+    """
+    Runs the ETL only for new or changed subsidiary partitions.
+
+    Wraps an ETLPipeline (for dimension paths and the plan itself) and
+    manages partitioned outputs plus the processing manifest.
+    """
+
+    def __init__(
+        self,
+        pipeline: ETLPipeline | None = None,
+        input_dir: Path | None = None,
+        output_dir: Path | None = None,
+        audit_dir: Path | None = None,
+        manifest_path: Path | None = None,
+        quarantine_dir: Path | None = None,
+    ):
+        """Initialize with an optional pipeline and custom partition paths."""
+        self.pipeline = pipeline or ETLPipeline(validate=False)
+        self.input_dir = input_dir or settings.partitioned_input_path
+        self.output_dir = output_dir or settings.partitioned_output_path
+        self.audit_dir = audit_dir or settings.partitioned_audit_path
+        self.manifest_path = manifest_path or settings.manifest_path
+        self.quarantine_dir = quarantine_dir or settings.partitioned_quarantine_path
+
+    def run(self) -> IncrementalResult:
+        """
+        Process changed partitions and refresh the consolidated audit.
+
+        Returns:
+            IncrementalResult with the processed, reused and removed partitions.
+        """
+        start_time = time.time()
+        logger.info("Starting incremental ETL Pipeline")
+        if self.pipeline.pool_hierarchy_path.exists():
+            raise ValueError(
+                "A pool hierarchy couples the funding ratios of all subsidiaries, "
+                "so partitions cannot be processed independently; run the full pipeline"
+            )
+        if self.pipeline.redistribute_surplus:
+            raise ValueError(
+                "Surplus redistribution couples the funding ratios of all subsidiaries, "
+                "so partitions cannot be processed independently; run the full pipeline"
+            )
+
+        manifest = self._load_manifest()
+        partitions = discover_partitions(self.input_dir)
+        hashes = {code: fingerprint([path]) for code, path in partitions.items()}
+        dims_hash = fingerprint(self._dimension_paths())
+        # One set of Enums over every partition, so all partition outputs share
+        # their dtypes; new subsidiary codes change them and force a rebuild
+        enums = self.pipeline.column_enums(self._scan(partitions.values()))
+
+        settings_hash = self._settings_fingerprint()
+
+        full_rebuild = (
+            manifest.get("dimensions") != dims_hash
+            or manifest.get("enums") != enums.digest()
+            or manifest.get("settings") != settings_hash
+        )
+        if full_rebuild and manifest.get("partitions"):
+            logger.info(
+                "Dimension tables, categories or settings changed: re-processing every partition"
+            )
+
+        previous = manifest.get("partitions", {})
+        dirty = [
+            code for code in partitions
+            if full_rebuild
+            or previous.get(code, {}).get("input_hash") != hashes[code]
+            or not partition_dir(self.output_dir, code).exists()
+        ]
+        reused = [code for code in partitions if code not in dirty]
+        removed = [code for code in previous if code not in partitions]
+
+        for code in removed:
+            logger.info(f"Removing output for deleted partition {code}")
+            shutil.rmtree(partition_dir(self.output_dir, code), ignore_errors=True)
+            (self.audit_dir / f"{code}.parquet").unlink(missing_ok=True)
+            (self.quarantine_dir / f"{code}.parquet").unlink(missing_ok=True)
+
+        rows_by_code = self._process(dirty, partitions, enums) if dirty else {}
+        logger.info(f"Processed {len(dirty)} partition(s), reused {len(reused)}")
+
+        # Merge the partitions into the consolidated output (streamed) and
+        # audit and quarantine (small), so readers of the full run's files
+        # see this run too
+        DataExporterFactory.sink(
+            self._scan(partition_dir(self.output_dir, code) for code in partitions),
+            self.pipeline.output_path,
+        )
+        audit_files = [self.audit_dir / f"{code}.parquet" for code in partitions]
+        pl.read_parquet(audit_files).write_parquet(self.pipeline.audit_path)
+        rows_quarantined = 0
+        if self.pipeline.quarantine:
+            quarantine_files = [self.quarantine_dir / f"{code}.parquet" for code in partitions]
+            quarantine = pl.read_parquet(quarantine_files)
+            quarantine.write_parquet(self.pipeline.quarantine_path)
+            rows_quarantined = quarantine.height
+
+        self._save_manifest({
+            "version": MANIFEST_VERSION,
+            # After processing: the run may have added concept aliases
+            "dimensions": fingerprint(self._dimension_paths()),
+            "enums": enums.digest(),
+            "settings": settings_hash,
+            "partitions": {
+                code: {
+                    "input_hash": hashes[code],
+                    "rows": rows_by_code.get(code, previous.get(code, {}).get("rows", 0)),
+                }
+                for code in partitions
+            },
+        })
+
+        elapsed = time.time() - start_time
+        logger.info(f"Incremental pipeline completed in {elapsed:.2f} seconds")
+
+        return IncrementalResult(
+            output_path=self.output_dir,
+            audit_path=self.pipeline.audit_path,
+            rows_processed=sum(rows_by_code.values()),
+            execution_time_seconds=elapsed,
+            validation_warnings=[],
+            quarantine_path=self.pipeline.quarantine_path if self.pipeline.quarantine else None,
+            rows_quarantined=rows_quarantined,
+            partitions_processed=dirty,
+            partitions_reused=reused,
+            partitions_removed=removed,
+        )
+
+    @staticmethod
+    def _scan(paths) -> pl.LazyFrame:
+        """Scan the files of some partitions as one frame."""
+        files = [f for path in paths for f in dataset_files(path)]
+        return pl.scan_parquet(files, hive_partitioning=False)
+
+    def _process(
+        self,
+        codes: list[str],
+        partitions: dict[str, Path],
+        enums: ColumnEnums,
+    ) -> dict[str, int]:
+        """Run one plan over the changed partitions and write their outputs."""
+        df_main = self._scan(partitions[code] for code in codes)
+
+        self.pipeline.resolve_concepts(df_main)
+        # The bonus cap is employee-local, so enforcing it per partition is
+        # exact; the breach report is only written by full runs
+        df_output, pool_calc, df_rejected, _ = self.pipeline.build_plan_with_quarantine(
+            df_main=df_main, enums=enums
+        )
+        pool_calc = pool_calc.filter(pl.col(PARTITION_KEY).is_in(codes))
+        # Rows keyed to another subsidiary than their directory would land in
+        # the wrong output partition (and leave theirs empty)
+        mismatched = [
+            self._scan([partitions[code]])
+            .filter(pl.col(PARTITION_KEY).cast(pl.String).ne_missing(code))
+            .select(pl.lit(code).alias("partition"), pl.len().alias("rows"))
+            for code in codes
+        ]
+        plans = [df_output, pool_calc] + ([df_rejected] if df_rejected is not None else [])
+        *collected, mismatched = pl.collect_all(plans + [pl.concat(mismatched)])
+        mismatched = mismatched.filter(pl.col("rows") > 0)
+        if not mismatched.is_empty():
+            raise ValueError(
+                f"Rows with a {PARTITION_KEY} other than their partition directory: "
+                f"{dict(mismatched.iter_rows())}; the column must match the partition directory"
+            )
+        output, audit, *rejected = collected
+
+        self.audit_dir.mkdir(parents=True, exist_ok=True)
+        outputs = {key[0]: part for key, part in output.partition_by(
+            PARTITION_KEY, as_dict=True
+        ).items()}
+        audits = {key[0]: part for key, part in audit.partition_by(
+            PARTITION_KEY, as_dict=True
+        ).items()}
+        if rejected:
+            self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+            quarantined = {key[0]: part for key, part in rejected[0].partition_by(
+                PARTITION_KEY, as_dict=True
+            ).items()}
+
+        rows = {}
+        for code in codes:
+            part = outputs.get(code, output.clear())
+            out_dir = partition_dir(self.output_dir, code)
+            if out_dir.exists():
+                shutil.rmtree(out_dir)
+            out_dir.mkdir(parents=True)
+            part.write_parquet(out_dir / "part-00000.parquet")
+            audits.get(code, audit.clear()).write_parquet(self.audit_dir / f"{code}.parquet")
+            if rejected:
+                quarantined.get(code, rejected[0].clear()).write_parquet(
+                    self.quarantine_dir / f"{code}.parquet"
+                )
+            rows[code] = part.height
+        return rows
+
+    def _dimension_paths(self) -> list[Path]:
+        """Dimension inputs whose changes invalidate every partition."""
+        p = self.pipeline
+        paths = [
+            p.employees_path, p.fx_path, p.currency_aliases_path, p.mapping_path, p.pool_path
+        ]
+        optional = [p.concept_aliases_path, p.pool_hierarchy_path]
+        if p.fx_as_of:
+            optional.append(p.fx_history_path)
+        return paths + [path for path in optional if path.exists()]
+
+    def _settings_fingerprint(self) -> str:
+        """Hash of the settings and pipeline options that change the output."""
+        p = self.pipeline
+        values = {
+            name: getattr(settings, name)
+            for name in [
+                "FUNDING_RATIO_CAP",
+                "DEFAULT_FUNDING_RATIO",
+                "UNMAPPED_CATEGORY",
+                "REDISTRIBUTION_WEIGHTS",
+                "REDISTRIBUTION_RECEIVER_CAP",
+                "BONUS_CAP_RATIO",
+                "BONUS_CAP_RATIO_OVERRIDES",
+                "BONUS_CAP_MRT_ONLY",
+            ]
+        }
+        values.update(
+            redistribute_surplus=p.redistribute_surplus,
+            bonus_cap=p.bonus_cap,
+            enforce_bonus_cap=p.enforce_bonus_cap,
+            fx_as_of=p.fx_as_of,
+            quarantine=p.quarantine,
+        )
+        payload = json.dumps(values, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        manifest = json.loads(self.manifest_path.read_text())
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def _save_manifest(self, manifest: dict) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
@@ -6,6 +6,7 @@ Uses Polars LazyFrames for optimal memory usage and query optimization.
 """
 from typing import Protocol, runtime_checkable
 from pathlib import Path
+import hashlib
 import polars as pl
 
 
@@ -38,7 +39,7 @@ class CsvLoader:
         """Scan a CSV file into a LazyFrame."""
         if not path.exists():
             raise FileNotFoundError(f"CSV file not found: {path}")
-        return pl.scan_csv(path, dtypes=self.dtypes)
+        return pl.scan_csv(path, schema_overrides=self.dtypes)
 
 
 class DataLoaderFactory:
@@ -61,3 +62,27 @@ class DataLoaderFactory:
         """Convenience method to load data in one call."""
         loader = DataLoaderFactory.create(path, dtypes)
         return loader.load(path)
+
+
+def dataset_files(path: Path) -> list[Path]:
+    """All Parquet files of a dataset directory (or a single file), in stable order."""
+    if path.is_file():
+        return [path]
+    return sorted(path.rglob("*.parquet"))
+
+
+def fingerprint(paths: list[Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash (SHA-256) of a set of files or dataset directories.
+    
+    Relative file names are hashed along with the bytes, so renames and
+    added or removed part files change the fingerprint too.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        for file in dataset_files(path):
+            digest.update(str(file.relative_to(path.parent)).encode())
+            with open(file, "rb") as f:
+                while block := f.read(chunk_size):
+                    digest.update(block)
+    return digest.hexdigest()
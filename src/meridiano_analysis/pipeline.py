@@ -6,22 +6,51 @@ Coordinates the full ETL process using dependency injection for flexibility and
 import time
 import logging
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable
 
 import polars as pl
 
 from .config import settings
 from .loaders import DataLoaderFactory
 from .transformers import (
+    normalize_currency,
+    count_unresolved_currencies,
+    enrich_with_employees,
+    employee_dimension,
+    employee_match_rates,
+    prepare_dimension,
+    EMPLOYEE_KEY,
+    broadcastable,
     explode_concepts,
     enrich_with_fx,
+    enrich_with_fx_asof,
+    FX_DATE_COLUMN,
     enrich_with_mapping,
     apply_funding_ratio,
     select_output_columns,
 )
-from .calculators import FundingRatioCalculator
+from .calculators import BonusCapCalculator, FundingRatioCalculator
+from .concepts import ConceptResolver
+from .dimension_cache import DimensionCache
+from .dtypes import ColumnEnums
+from .fx import prepare_fx_history
 from .exporters import DataExporterFactory
-from .validation import validate_remuneration_input, validate_fx_rates
+from .schemas import (
+    ValidationResult, ConceptMapping, BonusPool, CurrencyAlias, FxHistoryRate, PoolNode,
+    ProcessedRecord,
+)
+from .schema_compiler import validate_frame
+from .validation import (
+    validate_remuneration_input,
+    validate_fx_rates,
+    missing_required_columns,
+    remuneration_checks,
+    remuneration_validation_plan,
+    summarize_remuneration_validation,
+)
+from .quarantine import split_quarantine
+from .profiling import StageMetrics, StageProfiler, write_profile_report
 
 
 logging.basicConfig(
@@ -40,6 +69,15 @@ class PipelineResult:
     rows_processed: int
     execution_time_seconds: float
     validation_warnings: list[str]
+    stage_metrics: list[StageMetrics] = field(default_factory=list)
+    validation_by_subsidiary: pl.DataFrame | None = None
+    quarantine_path: Path | None = None
+    rows_quarantined: int = 0
+    rows_unresolved_currency: int = 0
+    employee_match_rate_raw: float | None = None
+    employee_match_rate: float | None = None
+    bonus_cap_path: Path | None = None
+    rows_over_bonus_cap: int = 0
 
 
 class ETLPipeline:
@@ -56,9 +94,26 @@ class ETLPipeline:
         fx_path: Path | None = None,
         mapping_path: Path | None = None,
         pool_path: Path | None = None,
+        currency_aliases_path: Path | None = None,
+        concept_aliases_path: Path | None = None,
+        fx_history_path: Path | None = None,
+        fx_as_of: bool | None = None,
+        pool_hierarchy_path: Path | None = None,
         output_path: Path | None = None,
         audit_path: Path | None = None,
         validate: bool = True,
+        explain: bool = False,
+        streaming: bool = False,
+        profile: bool = False,
+        profile_path: Path | None = None,
+        quarantine: bool = True,
+        quarantine_path: Path | None = None,
+        broadcast_max_rows: int | None = None,
+        dimension_cache: DimensionCache | None = None,
+        redistribute_surplus: bool | None = None,
+        bonus_cap: bool | None = None,
+        enforce_bonus_cap: bool | None = None,
+        bonus_cap_path: Path | None = None,
     ):
         """Initialize with optional custom paths."""
         self.input_path = input_path or settings.input_path
@@ -66,9 +121,36 @@ class ETLPipeline:
         self.fx_path = fx_path or settings.fx_rates_path
         self.mapping_path = mapping_path or settings.mapping_path
         self.pool_path = pool_path or settings.bonus_pool_path
+        self.currency_aliases_path = currency_aliases_path or settings.currency_aliases_path
+        self.concept_aliases_path = concept_aliases_path or settings.concept_aliases_path
+        self.fx_history_path = fx_history_path or settings.fx_history_path
+        self.fx_as_of = settings.FX_AS_OF if fx_as_of is None else fx_as_of
+        self.pool_hierarchy_path = pool_hierarchy_path or settings.pool_hierarchy_path
         self.output_path = output_path or settings.output_path
         self.audit_path = audit_path or settings.audit_path
         self.validate = validate
+        self.explain = explain
+        self.streaming = streaming
+        self.profile = profile
+        self.profile_path = profile_path or settings.profile_path
+        self.quarantine = quarantine
+        self.quarantine_path = quarantine_path or settings.quarantine_path
+        self.broadcast_max_rows = (
+            settings.BROADCAST_MAX_ROWS if broadcast_max_rows is None else broadcast_max_rows
+        )
+        self.dimension_cache = dimension_cache or DimensionCache.shared(
+            settings.dimension_cache_path, max_entries=settings.DIMENSION_CACHE_ENTRIES
+        )
+        self.redistribute_surplus = (
+            settings.REDISTRIBUTE_SURPLUS if redistribute_surplus is None else redistribute_surplus
+        )
+        self.enforce_bonus_cap = (
+            settings.BONUS_CAP_ENFORCE if enforce_bonus_cap is None else enforce_bonus_cap
+        )
+        self.bonus_cap = (
+            settings.BONUS_CAP_CHECK if bonus_cap is None else bonus_cap
+        ) or self.enforce_bonus_cap
+        self.bonus_cap_path = bonus_cap_path or settings.bonus_cap_path
     
     def run(self) -> PipelineResult:
         """
@@ -78,94 +160,804 @@ class ETLPipeline:
             PipelineResult with output paths and metrics.
         """
         start_time = time.time()
+        validation: ValidationResult | None = None
+        validation_plan: pl.LazyFrame | None = None
         validation_warnings: list[str] = []
         
         logger.info("Starting ETL Pipeline")
-        
-        # 1. Load data
-        logger.info("Loading input data...")
+        # One scan of the input shared by every plan below
         df_main = DataLoaderFactory.load(self.input_path)
-        df_employees = DataLoaderFactory.load(self.employees_path)
-        df_fx = DataLoaderFactory.load(self.fx_path)
-        df_mapping = DataLoaderFactory.load(self.mapping_path)
-        df_pool = DataLoaderFactory.load(self.pool_path)
         
-        # 2. Validate (optional)
+        # 1. Validate (optional): the full input, in one aggregation pass.
+        # Outside the profiled mode the pass is fused into the ETL collect below.
         if self.validate:
+            logger.info("Validating dimension tables...")
+            validation_warnings.extend(self._validate_dimensions())
             logger.info("Validating input data...")
-            # Collect a sample for validation
-            df_sample = df_main.head(10000).collect()
-            result = validate_remuneration_input(df_sample)
-            validation_warnings.extend(result.warnings)
+            if self.profile:
+                validation = self._validate_input(df_main)
+            else:
+                validation_plan = self._validation_plan(df_main)
+        
+        # Fuzzy concept resolution reads the distinct concept names and
+        # extends the alias table; the plans below only read that table
+        logger.info("Resolving: matching unmapped concept names...")
+        self.resolve_concepts(df_main)
+        
+        stage_metrics: list[StageMetrics] = []
+        diagnostic_plans = self._diagnostic_plans(df_main)
+        if self.profile:
+            # 2-4. Run stage by stage, recording per-stage metrics
+            diagnostics = dict(zip(
+                diagnostic_plans,
+                pl.collect_all(list(diagnostic_plans.values()), engine="streaming"),
+            ))
+            rows_processed, rows_quarantined, rows_capped, stage_metrics = self._run_profiled(
+                df_main
+            )
+        elif self.streaming:
+            # 2-4. Aggregate (with the diagnostics and validation counts), then
+            # stream the output straight to disk
+            plans = dict(diagnostic_plans)
+            if validation_plan is not None:
+                plans["validation"] = validation_plan
+            rows_processed, rows_quarantined, rows_capped, aggregates = self._run_streaming(
+                df_main, plans
+            )
+            diagnostics = {name: aggregates[name] for name in diagnostic_plans}
+            if validation_plan is not None:
+                validation = self._check_validation(
+                    summarize_remuneration_validation(aggregates["validation"])
+                )
+        else:
+            # 2. Build the lazy output, audit and quarantine plans
+            df_output, pool_calc, df_rejected, df_breaches = self.build_plan_with_quarantine(
+                df_main
+            )
+            
+            if self.explain:
+                logger.info(f"Optimized plan:\n{self.explain_plan(df_output, pool_calc)}")
             
-            if not result.is_valid:
-                for err in result.errors:
-                    logger.error(f"Validation error: {err.error}")
-                raise ValueError("Input validation failed")
+            # 3. Collect every output (and the validation counts) from one optimized plan
+            logger.info("Collecting: executing output and audit in a single plan...")
+            plans = {"output": df_output, "audit": pool_calc}
+            if df_rejected is not None:
+                plans["quarantine"] = df_rejected
+            if df_breaches is not None:
+                plans["bonus_cap"] = df_breaches
+            if validation_plan is not None:
+                plans["validation"] = validation_plan
+            plans.update(diagnostic_plans)
+            collected = dict(zip(plans, pl.collect_all(list(plans.values()))))
+            diagnostics = {name: collected[name] for name in diagnostic_plans}
+            if validation_plan is not None:
+                validation = self._check_validation(
+                    summarize_remuneration_validation(collected["validation"])
+                )
+            rows_processed = len(collected["output"])
             
-            for warning in result.warnings:
-                logger.warning(f"Validation: {warning}")
+            # 4. Export results
+            logger.info(f"Exporting: {rows_processed} rows to {self.output_path}")
+            DataExporterFactory.export(collected["output"], self.output_path)
+            DataExporterFactory.export(collected["audit"], self.audit_path)
+            rows_quarantined = self._export_quarantine(collected.get("quarantine"))
+            rows_capped = self._export_bonus_cap(collected.get("bonus_cap"))
         
-        # Join with Employees to get job_level
-        logger.info("Enriching: joining with employee master...")
-        df_main = df_main.join(
-            df_employees.select(["employee_id", "job_level"]),
-            on="employee_id",
-            how="left"
-        )
+        rows_unresolved = self._report_unresolved_currencies(diagnostics["currency"])
+        match_rate_raw, match_rate = self._report_employee_match(diagnostics["employees"])
         
-        # 3. Transform: explode concepts
-        logger.info("Transforming: exploding combined concepts...")
-        df_exploded = explode_concepts(df_main)
+        # 5. Check the output against the ProcessedRecord schema (optional)
+        if self.validate:
+            output = (
+                collected["output"] if not (self.profile or self.streaming)
+                else DataLoaderFactory.load(self.output_path)
+            )
+            validation_warnings.extend(self._validate_output(output))
         
-        # 4. Enrich: FX rates and mapping
-        logger.info("Enriching: applying FX rates and category mapping...")
-        df_enriched = enrich_with_fx(df_exploded, df_fx)
-        df_enriched = enrich_with_mapping(
-            df_enriched, 
-            df_mapping,
-            unmapped_value=settings.UNMAPPED_CATEGORY
+        elapsed = time.time() - start_time
+        logger.info(f"Pipeline completed in {elapsed:.2f} seconds")
+        
+        if self.profile:
+            write_profile_report(stage_metrics, self.profile_path, total_seconds=elapsed)
+            logger.info(f"Profile report written to {self.profile_path}")
+        
+        return PipelineResult(
+            output_path=self.output_path,
+            audit_path=self.audit_path,
+            rows_processed=rows_processed,
+            execution_time_seconds=elapsed,
+            validation_warnings=(validation.warnings if validation else []) + validation_warnings,
+            stage_metrics=stage_metrics,
+            validation_by_subsidiary=validation.by_subsidiary if validation else None,
+            quarantine_path=self.quarantine_path if self.quarantine else None,
+            rows_quarantined=rows_quarantined,
+            rows_unresolved_currency=rows_unresolved,
+            employee_match_rate_raw=match_rate_raw,
+            employee_match_rate=match_rate,
+            bonus_cap_path=self.bonus_cap_path if self.bonus_cap else None,
+            rows_over_bonus_cap=rows_capped,
         )
+    
+    def build_plan(
+        self,
+        df_main: pl.LazyFrame | None = None,
+    ) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+        """
+        Build the lazy output and audit plans without executing them.
+        
+        Args:
+            df_main: Optional input facts to plan over instead of input_path
+            
+        Returns:
+            Tuple of (output LazyFrame, funding ratio audit LazyFrame).
+        """
+        df_output, pool_calc, _, _ = self.build_plan_with_quarantine(df_main)
+        return df_output, pool_calc
+    
+    def build_enriched(
+        self,
+        df_main: pl.LazyFrame | None = None,
+    ) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+        """
+        Build the lazy plan of the clean enriched facts, before funding ratios.
+        
+        Args:
+            df_main: Optional input facts to plan over instead of input_path
+            
+        Returns:
+            Tuple of (enriched facts LazyFrame, bonus pool LazyFrame); rows
+            failing validation are left out when quarantine is enabled.
+        """
+        df_enriched, df_pool, _ = self._build_enriched(df_main)
+        return df_enriched, df_pool
+    
+    def build_plan_with_quarantine(
+        self,
+        df_main: pl.LazyFrame | None = None,
+        enums: ColumnEnums | None = None,
+    ) -> tuple[pl.LazyFrame, pl.LazyFrame, pl.LazyFrame | None, pl.LazyFrame | None]:
+        """
+        Build the lazy output, audit, quarantine and bonus-cap plans without executing them.
         
-        # 5. Calculate: funding ratios
+        Args:
+            df_main: Optional input facts to plan over instead of input_path
+            enums: Enum dtypes to use (default: column_enums of df_main), e.g.
+                to share them between runs over parts of the input
+            
+        Returns:
+            Tuple of (output LazyFrame, funding ratio audit LazyFrame, rejected
+            rows LazyFrame or None when quarantine is disabled, bonus-cap
+            breaches LazyFrame or None when the check is disabled).
+        """
+        df_enriched, df_pool, df_rejected = self._build_enriched(df_main, enums)
+        # Both the funding calculation and the output read the enriched facts;
+        # cache them so the scan, joins and explode run only once.
+        df_enriched = df_enriched.cache()
+        
+        # Calculate: funding ratios
         logger.info("Calculating: funding ratios by subsidiary...")
-        calculator = FundingRatioCalculator(df_pool, cap=settings.FUNDING_RATIO_CAP)
+        calculator = self._calculator(df_pool)
         pool_calc = calculator.calculate(df_enriched)
         
-        # 6. Apply funding ratio and select output columns
+        # Apply funding ratio and select output columns
         logger.info("Applying: funding ratios to payouts...")
         df_final = apply_funding_ratio(
             df_enriched, 
-            pool_calc,
+            calculator.ratios(pool_calc),
             default_ratio=settings.DEFAULT_FUNDING_RATIO
         )
+        df_final, df_breaches = self._bonus_cap_stage(df_final)
         df_output = select_output_columns(df_final)
         
-        # 7. Collect (execute lazy query)
-        logger.info("Collecting: executing lazy query...")
-        df_output_collected = df_output.collect()
-        pool_calc_collected = pool_calc.collect()
+        return df_output, pool_calc, df_rejected, df_breaches
+    
+    def _build_enriched(
+        self,
+        df_main: pl.LazyFrame | None = None,
+        enums: ColumnEnums | None = None,
+    ) -> tuple[pl.LazyFrame, pl.LazyFrame, pl.LazyFrame | None]:
+        """
+        Build the lazy enriched facts plan.
+        
+        Returns (enriched clean facts, bonus pool, rejected rows or None).
+        """
+        logger.info("Loading input data...")
+        if df_main is None:
+            df_main = DataLoaderFactory.load(self.input_path)
+        enums = enums or self.column_enums(df_main)
+        df_employees, df_fx, df_mapping, df_pool = self._load_dimensions(enums)
+        
+        # Currency spellings are resolved first, so only truly unknown
+        # codes fail the ISO check and the FX join sees clean keys
+        logger.info("Normalizing: resolving currency aliases to ISO codes...")
+        df_main = self._normalized(df_main)
+        
+        df_mapping = self._concept_mapping(df_mapping)
+        
+        df_rejected = None
+        if self.quarantine:
+            logger.info("Quarantining: splitting off rows that fail validation rules...")
+            df_main, df_rejected = split_quarantine(df_main)
+        
+        for _, message, stage in self._enrichment_stages(
+            df_employees, df_fx, df_mapping, enums
+        ):
+            logger.info(message)
+            df_main = stage(df_main)
+        return df_main, df_pool, df_rejected
+    
+    def _load_dimensions(self, enums: ColumnEnums | None = None) -> tuple[pl.LazyFrame, ...]:
+        """
+        Load (employees, fx rates, mapping, bonus pool) dimension tables.
+        
+        Without enums, the tables are scanned as stored. With enums, they come
+        prepared (deduplicated, sorted on their join key, low-cardinality
+        columns cast to the run's Enums) from the dimension cache.
+        """
+        if enums is None:
+            return (
+                DataLoaderFactory.load(self.employees_path),
+                DataLoaderFactory.load(self.fx_path),
+                DataLoaderFactory.load(self.mapping_path),
+                DataLoaderFactory.load(self.pool_path),
+            )
+        return (
+            self._prepared(self.employees_path, _prepare_employees, enums),
+            self._prepared(
+                self.fx_path, _prepare_fx_rates, enums, columns={"currency": "local_currency"}
+            ),
+            self._prepared(self.mapping_path, _prepare_mapping, enums),
+            self._prepared(self.pool_path, _prepare_bonus_pool, enums),
+        )
+    
+    def _prepared(
+        self,
+        path: Path,
+        prepare: Callable[[pl.LazyFrame], pl.LazyFrame],
+        enums: ColumnEnums | None = None,
+        columns: dict[str, str] | None = None,
+    ) -> pl.LazyFrame:
+        """
+        A dimension table prepared by prepare, through the dimension cache.
+        
+        With enums the prepared table is also cast to them (see
+        ColumnEnums.cast for columns), and cached per Enum categories.
+        """
+        if enums is None:
+            return self.dimension_cache.load(path, prepare, variant=prepare.__name__)
+        return self.dimension_cache.load(
+            path,
+            lambda df: enums.cast(prepare(df), columns=columns),
+            variant=f"{prepare.__name__}:{enums.digest()}",
+        )
+    
+    def column_enums(self, df_main: pl.LazyFrame | None = None) -> ColumnEnums:
+        """
+        Enum dtypes of the low-cardinality columns, from config and dimension tables.
         
-        # 8. Export results
-        logger.info(f"Exporting: {len(df_output_collected)} rows to {self.output_path}")
-        DataExporterFactory.export(df_output_collected, self.output_path)
+        With df_main, its subsidiary codes are covered too, so facts of a
+        subsidiary unknown to the dimensions keep their code.
+        """
+        _, df_fx, df_mapping, df_pool = self._load_dimensions()
+        return ColumnEnums.from_dimensions(
+            self._prepared(self.employees_path, _employee_categories),
+            df_fx,
+            DataLoaderFactory.load(self.currency_aliases_path),
+            df_mapping,
+            df_pool,
+            unmapped_value=settings.UNMAPPED_CATEGORY,
+            facts=df_main,
+        )
+    
+    def resolve_concepts(self, df_main: pl.LazyFrame | None = None) -> pl.DataFrame:
+        """
+        Fuzzy-resolve the unmatched concept names of the input into the alias table.
+        
+        An explicit step (run() calls it first): it scans the input and may
+        write the alias table, which the plans then read via the mapping.
+        
+        Args:
+            df_main: Optional input facts instead of input_path
+            
+        Returns:
+            The updated alias table.
+        """
+        if df_main is None:
+            df_main = DataLoaderFactory.load(self.input_path)
+        df_mapping = self._prepared(self.mapping_path, _prepare_mapping)
+        return ConceptResolver(df_mapping, self.concept_aliases_path).update(df_main)
+    
+    def _concept_mapping(self, df_mapping: pl.LazyFrame) -> pl.LazyFrame:
+        """Concept mapping extended with the aliases already in the alias table."""
+        return ConceptResolver(df_mapping, self.concept_aliases_path).extended_mapping()
+    
+    def _load_currency_aliases(self) -> pl.DataFrame:
+        """Load the (small) currency alias table eagerly for the replace_strict lookup."""
+        return DataLoaderFactory.load(self.currency_aliases_path).collect()
+    
+    def _normalized(self, df_main: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Input facts with currency aliases resolved.
+        
+        The stage both validation and quarantine check, so their counts agree.
+        """
+        return normalize_currency(df_main, self._load_currency_aliases())
+    
+    def _diagnostic_plans(self, df_main: pl.LazyFrame) -> dict[str, pl.LazyFrame]:
+        """
+        Lazy data-quality diagnostics over the raw input.
+        
+        "currency": row counts of currency codes with no alias;
+        "employees": employee master match rates before and after ID
+        canonicalization.
+        """
+        return {
+            "currency": count_unresolved_currencies(df_main, self._load_currency_aliases()),
+            "employees": employee_match_rates(
+                df_main, self._prepared(self.employees_path, _prepare_employees)
+            ),
+        }
+    
+    def _report_unresolved_currencies(self, counts: pl.DataFrame) -> int:
+        """Log the collected unresolved currency codes and return their row count."""
+        rows = int(counts["rows"].sum())
+        if rows:
+            codes = ", ".join(
+                f"{code!r} ({n})" for code, n in counts.head(10).iter_rows()
+            )
+            logger.warning(f"Currency: {rows} rows have unresolved currency codes: {codes}")
+        return rows
+    
+    def _report_employee_match(self, rates: pl.DataFrame) -> tuple[float | None, float | None]:
+        """Log the employee master match rates and return (before, after) canonicalization."""
+        raw, canonical = rates["match_rate_raw"].item(), rates["match_rate"].item()
+        if raw is not None:
+            logger.info(
+                f"Employees: {raw:.2%} of records match the employee master as given, "
+                f"{canonical:.2%} after ID canonicalization"
+            )
+        return raw, canonical
+    
+    def _load_fx_history(self, enums: ColumnEnums | None = None) -> pl.LazyFrame | None:
+        """The cached, date-sorted FX history, or None when there is no history table."""
+        if not self.fx_history_path.exists():
+            return None
+        history = self._prepared(
+            self.fx_history_path, prepare_fx_history, enums, columns={"currency": "local_currency"}
+        )
+        return history.set_sorted("valid_from")
+    
+    def _load_pool_hierarchy(self) -> pl.LazyFrame | None:
+        """The cached pool hierarchy, or None when there is no hierarchy table."""
+        if not self.pool_hierarchy_path.exists():
+            return None
+        return self._prepared(self.pool_hierarchy_path, _prepare_pool_hierarchy)
+    
+    def _calculator(self, df_pool: pl.LazyFrame) -> FundingRatioCalculator:
+        """Funding ratio calculator over the bonus pool (and the pool hierarchy, if any)."""
+        return FundingRatioCalculator(
+            df_pool,
+            cap=settings.FUNDING_RATIO_CAP,
+            hierarchy=self._load_pool_hierarchy(),
+            redistribute=self.redistribute_surplus,
+            weights=settings.REDISTRIBUTION_WEIGHTS,
+            receiver_cap=settings.REDISTRIBUTION_RECEIVER_CAP,
+        )
+    
+    def _bonus_cap_calculator(self) -> BonusCapCalculator:
+        """Bonus-cap calculator over the cached salaries of the employee master."""
+        return BonusCapCalculator(
+            self._prepared(self.employees_path, _prepare_employee_salaries),
+            max_ratio=settings.BONUS_CAP_RATIO,
+            ratio_overrides=settings.BONUS_CAP_RATIO_OVERRIDES,
+            mrt_only=settings.BONUS_CAP_MRT_ONLY,
+        )
+    
+    def _bonus_cap_stage(
+        self,
+        df: pl.LazyFrame,
+        caps: pl.DataFrame | None = None,
+    ) -> tuple[pl.LazyFrame, pl.LazyFrame | None]:
+        """
+        Check the bonus cap on the paid-out facts (and enforce it, if enabled).
+        
+        Returns (facts, breaches plan); both unchanged/None when the check
+        is disabled. Pass collected caps to join them instead of planning
+        the per-employee aggregation again.
+        """
+        if not self.bonus_cap:
+            return df, None
+        calculator = self._bonus_cap_calculator()
+        plan = calculator.calculate(df) if caps is None else caps.lazy()
+        if self.enforce_bonus_cap:
+            df = calculator.apply(df, plan)
+        return df, calculator.breaches(plan)
+    
+    def _fx_stage(
+        self,
+        df_fx: pl.LazyFrame | pl.DataFrame,
+        enums: ColumnEnums,
+    ) -> Callable[[pl.LazyFrame], pl.LazyFrame]:
+        """
+        The FX transform: in FX as-of mode, the FX history rate of each
+        fact's payment date; otherwise (or for undated facts) the single rate
+        per currency.
+        """
+        fx_history = None
+        if self.fx_as_of:
+            fx_history = self._load_fx_history(enums)
+            if fx_history is None:
+                raise FileNotFoundError(
+                    f"FX as-of mode needs an FX history table: {self.fx_history_path}"
+                )
+        
+        def stage(df: pl.LazyFrame) -> pl.LazyFrame:
+            if fx_history is not None and FX_DATE_COLUMN in df.collect_schema().names():
+                logger.info(f"FX: as-of rates by {FX_DATE_COLUMN} from {self.fx_history_path}")
+                return enrich_with_fx_asof(df, fx_history)
+            if fx_history is not None:
+                logger.warning(f"FX: facts have no {FX_DATE_COLUMN}; using one rate per currency")
+            else:
+                logger.info(f"FX: one rate per currency from {self.fx_path}")
+            return enrich_with_fx(df, df_fx)
+        return stage
+    
+    def _broadcast(self, dim: pl.LazyFrame) -> pl.LazyFrame | pl.DataFrame:
+        """Collect a dimension of up to broadcast_max_rows rows for a lookup; else keep it lazy."""
+        collected = broadcastable(dim, self.broadcast_max_rows)
+        return dim if collected is None else collected
+    
+    def _enrichment_stages(
+        self,
+        df_employees: pl.LazyFrame,
+        df_fx: pl.LazyFrame,
+        df_mapping: pl.LazyFrame,
+        enums: ColumnEnums,
+    ) -> list[tuple[str, str, Callable[[pl.LazyFrame], pl.LazyFrame]]]:
+        """
+        Ordered (stage name, log message, transform) steps from input to enriched facts.
+        
+        The facts switch to the Enum dtypes right after the employee join,
+        the last step that needs the subsidiary code as a string. The Enums
+        cover the facts' subsidiary codes, so a subsidiary without a pool
+        keeps its code and is paid at the default funding ratio. FX rates and
+        the mapping are broadcast as lookups when small enough; dated facts
+        use the FX history instead (see _fx_stage).
+        """
+        df_fx, df_mapping = self._broadcast(df_fx), self._broadcast(df_mapping)
+        fx_stage = self._fx_stage(df_fx, enums)
+        return [
+            (
+                "employee_join",
+                "Enriching: canonicalizing employee IDs and joining with employee master...",
+                lambda df: enums.cast(enrich_with_employees(df, df_employees)),
+            ),
+            (
+                "explode",
+                "Transforming: exploding combined concepts...",
+                explode_concepts,
+            ),
+            (
+                "fx",
+                "Enriching: applying FX rates...",
+                fx_stage,
+            ),
+            (
+                "mapping",
+                "Enriching: applying category mapping...",
+                lambda df: enrich_with_mapping(
+                    df,
+                    df_mapping,
+                    unmapped_value=settings.UNMAPPED_CATEGORY
+                ),
+            ),
+        ]
+    
+    def _run_profiled(self, df_main: pl.LazyFrame) -> tuple[int, int, int, list[StageMetrics]]:
+        """
+        Execute every logical stage as its own query and record its metrics.
+        
+        Slower than the fused plan, but attributes time, rows and memory
+        to each stage. Returns (output rows, quarantined rows, employees over
+        the bonus cap, stage metrics).
+        """
+        profiler = StageProfiler()
+        enums = self.column_enums(df_main)
+        df_employees, df_fx, df_mapping, df_pool = self._load_dimensions(enums)
+        
+        df = profiler.collect("load", df_main, rows_in=0)
+        logger.info("Profiling: resolving currency aliases to ISO codes...")
+        df = profiler.collect("currency", self._normalized(df.lazy()), rows_in=df.height)
+        df_mapping = self._concept_mapping(df_mapping)
+        df_rejected = None
+        if self.quarantine:
+            logger.info("Profiling: quarantining rows that fail validation rules...")
+            clean, rejected = split_quarantine(df.lazy())
+            df_rejected = rejected.collect()
+            df = profiler.collect("quarantine", clean, rows_in=df.height)
+        for stage, message, transform in self._enrichment_stages(
+            df_employees, df_fx, df_mapping, enums
+        ):
+            logger.info(f"Profiling: {message}")
+            df = profiler.collect(stage, transform(df.lazy()), rows_in=df.height)
+        
+        logger.info("Profiling: funding ratios by subsidiary...")
+        calculator = self._calculator(df_pool)
+        pool_calc = profiler.collect(
+            "funding_calc", calculator.calculate(df.lazy()), rows_in=df.height
+        )
+        
+        df_paid = apply_funding_ratio(
+            df.lazy(),
+            self._broadcast(calculator.ratios(pool_calc).lazy()),
+            default_ratio=settings.DEFAULT_FUNDING_RATIO
+        )
+        caps = None
+        if self.bonus_cap:
+            logger.info("Profiling: bonus cap per employee...")
+            caps = profiler.collect(
+                "bonus_cap", self._bonus_cap_calculator().calculate(df_paid), rows_in=df.height
+            )
+        df_paid, df_breaches = self._bonus_cap_stage(df_paid, caps)
+        
+        logger.info("Profiling: applying funding ratios...")
+        df_output = profiler.collect(
+            "apply", select_output_columns(df_paid), rows_in=df.height
+        )
+        
+        rows_quarantined = 0
+        rows_capped = 0
+        
+        def export() -> None:
+            nonlocal rows_quarantined, rows_capped
+            DataExporterFactory.export(df_output, self.output_path)
+            DataExporterFactory.export(pool_calc, self.audit_path)
+            rows_quarantined = self._export_quarantine(df_rejected)
+            rows_capped = self._export_bonus_cap(
+                df_breaches.collect() if df_breaches is not None else None
+            )
+        
+        profiler.time("export", export, rows=df_output.height)
+        
+        for m in profiler.metrics:
+            logger.info(
+                f"Stage {m.stage:<14} {m.seconds:8.3f}s  "
+                f"rows {m.rows_in:>10,} -> {m.rows_out:>10,}  "
+                f"RSS peak +{m.rss_growth_mb or 0:,.0f} MB "
+                f"(process {m.process_peak_rss_mb or 0:,.0f} MB)"
+            )
+        return df_output.height, rows_quarantined, rows_capped, profiler.metrics
+    
+    def _run_streaming(
+        self,
+        df_main: pl.LazyFrame,
+        plans: dict[str, pl.LazyFrame] | None = None,
+    ) -> tuple[int, int, int, dict[str, pl.DataFrame]]:
+        """
+        Execute the pipeline on the streaming engine in two passes.
+        
+        Pass 1 aggregates demand per subsidiary into the (tiny) funding ratio
+        table and collects the quarantined rows and the extra plans (small
+        aggregates over the input, such as diagnostics); pass 2 streams the
+        facts again, applies the ratios and sinks the output straight to
+        disk. With the bonus-cap check, an extra pass in between aggregates
+        the payouts per employee. Returns (output rows, quarantined rows,
+        employees over the bonus cap, collected extra plans by name).
+        """
+        plans = plans or {}
+        df_enriched, df_pool, df_rejected = self._build_enriched(df_main)
+        
+        logger.info("Streaming pass 1/2: aggregating demand by subsidiary...")
+        calculator = self._calculator(df_pool)
+        pass_plans = [calculator.calculate(df_enriched), *plans.values()]
+        if df_rejected is not None:
+            pass_plans.append(df_rejected)
+        pool_calc_collected, *collected = pl.collect_all(pass_plans, engine="streaming")
+        extra, rejected = collected[:len(plans)], collected[len(plans):]
         DataExporterFactory.export(pool_calc_collected, self.audit_path)
+        rows_quarantined = self._export_quarantine(rejected[0] if rejected else None)
         
-        elapsed = time.time() - start_time
-        logger.info(f"Pipeline completed in {elapsed:.2f} seconds")
+        df_paid = apply_funding_ratio(
+            df_enriched,
+            self._broadcast(calculator.ratios(pool_calc_collected).lazy()),
+            default_ratio=settings.DEFAULT_FUNDING_RATIO
+        )
+        caps = None
+        if self.bonus_cap:
+            logger.info("Streaming: aggregating payouts per employee for the bonus cap...")
+            caps = self._bonus_cap_calculator().calculate(df_paid).collect(engine="streaming")
+        df_paid, df_breaches = self._bonus_cap_stage(df_paid, caps)
+        rows_capped = self._export_bonus_cap(
+            df_breaches.collect() if df_breaches is not None else None
+        )
         
-        return PipelineResult(
-            output_path=self.output_path,
-            audit_path=self.audit_path,
-            rows_processed=len(df_output_collected),
-            execution_time_seconds=elapsed,
-            validation_warnings=validation_warnings,
+        df_output = select_output_columns(df_paid)
+        if self.explain:
+            logger.info(f"Streaming plan:\n{df_output.explain(engine='streaming')}")
+        
+        logger.info(f"Streaming pass 2/2: applying funding ratios to {self.output_path}...")
+        with pl.Config(streaming_chunk_size=settings.CHUNK_SIZE):
+            DataExporterFactory.sink(df_output, self.output_path)
+        
+        rows = DataLoaderFactory.load(self.output_path).select(pl.len()).collect().item()
+        return rows, rows_quarantined, rows_capped, dict(zip(plans, extra))
+    
+    def _export_quarantine(self, df_rejected: pl.DataFrame | None) -> int:
+        """Write the rejected rows (if quarantine is enabled) and return their count."""
+        if df_rejected is None:
+            return 0
+        logger.info(f"Quarantine: {df_rejected.height} rejected rows to {self.quarantine_path}")
+        DataExporterFactory.export(df_rejected, self.quarantine_path)
+        return df_rejected.height
+    
+    def _export_bonus_cap(self, df_breaches: pl.DataFrame | None) -> int:
+        """Write the bonus-cap breaches (if the check is enabled) and return their count."""
+        if df_breaches is None:
+            return 0
+        action = "capped" if self.enforce_bonus_cap else "over the cap"
+        logger.info(
+            f"Bonus cap: {df_breaches.height} employees {action}, see {self.bonus_cap_path}"
         )
+        DataExporterFactory.export(df_breaches, self.bonus_cap_path)
+        return df_breaches.height
+    
+    @staticmethod
+    def explain_plan(df_output: pl.LazyFrame, pool_calc: pl.LazyFrame) -> str:
+        """
+        Render the optimized plans of both outputs.
+        
+        The shared enriched subplan shows up as CACHE nodes with the same id.
+        """
+        return (
+            f"-- output --\n{df_output.explain()}\n"
+            f"-- audit --\n{pool_calc.explain()}"
+        )
+    
+    def _validate_input(self, df_main: pl.LazyFrame) -> ValidationResult:
+        """Validate the full (currency-normalized) input in one streaming pass."""
+        errors = missing_required_columns(df_main)
+        if errors:
+            return self._check_validation(ValidationResult(
+                is_valid=False, errors=errors, warnings=[], rows_checked=0
+            ))
+        result = validate_remuneration_input(self._normalized(df_main), engine="streaming")
+        return self._check_validation(result)
+    
+    def _validation_plan(self, df_main: pl.LazyFrame) -> pl.LazyFrame:
+        """
+        Check the input schema now and return the lazy row-level validation plan.
+        
+        Rows are checked after currency normalization, the stage quarantine
+        checks, so both report the same violations.
+        """
+        errors = missing_required_columns(df_main)
+        if errors:
+            self._check_validation(ValidationResult(
+                is_valid=False, errors=errors, warnings=[], rows_checked=0
+            ))
+        return remuneration_validation_plan(self._normalized(df_main))
+    
+    def _validate_dimensions(self) -> list[str]:
+        """Validate the dimension tables against their schemas, raising on errors."""
+        df_fx, df_aliases, df_mapping, df_pool = pl.collect_all([
+            DataLoaderFactory.load(self.fx_path),
+            DataLoaderFactory.load(self.currency_aliases_path),
+            DataLoaderFactory.load(self.mapping_path),
+            DataLoaderFactory.load(self.pool_path),
+        ])
+        results = [
+            validate_fx_rates(df_fx),
+            validate_frame(df_aliases, CurrencyAlias),
+            validate_frame(df_mapping, ConceptMapping),
+            validate_frame(df_pool, BonusPool),
+        ]
+        if self.fx_as_of and self.fx_history_path.exists():
+            results.append(validate_frame(
+                DataLoaderFactory.load(self.fx_history_path), FxHistoryRate, engine="streaming"
+            ))
+        if self.pool_hierarchy_path.exists():
+            results.append(validate_frame(
+                DataLoaderFactory.load(self.pool_hierarchy_path), PoolNode
+            ))
+        errors = [err for result in results for err in result.errors]
+        warnings = [warning for result in results for warning in result.warnings]
+        self._check_validation(ValidationResult(
+            is_valid=not errors, errors=errors, warnings=warnings,
+            rows_checked=sum(result.rows_checked for result in results),
+        ))
+        return warnings
+    
+    def _validate_output(self, df_output: pl.DataFrame | pl.LazyFrame) -> list[str]:
+        """Check the output against ProcessedRecord; violations are returned as warnings."""
+        engine = "streaming" if isinstance(df_output, pl.LazyFrame) else "auto"
+        result = validate_frame(df_output, ProcessedRecord, engine=engine)
+        warnings = [
+            f"Output {err.error} (first at row {err.row}: {err.value!r})"
+            for err in result.errors
+        ]
+        for warning in warnings:
+            logger.warning(f"Validation: {warning}")
+        return warnings
+    
+    def _check_validation(self, result: ValidationResult) -> ValidationResult:
+        """Log a validation result, raising if it has errors."""
+        if not result.is_valid:
+            for err in result.errors:
+                logger.error(f"Validation error: {err.error}")
+            raise ValueError("Input validation failed")
+        
+        for warning in result.warnings:
+            logger.warning(f"Validation: {warning}")
+        
+        if result.by_subsidiary is not None:
+            checks = [c for c in remuneration_checks() if c in result.by_subsidiary.columns]
+            affected = result.by_subsidiary.filter(pl.sum_horizontal(checks) > 0)
+            if affected.height:
+                failing = [c for c in checks if affected[c].sum() > 0]
+                with pl.Config(tbl_rows=-1, tbl_cols=-1):
+                    logger.info(
+                        "Validation issues by subsidiary:\n"
+                        f"{affected.select(['subsidiary_code', 'rows', *failing])}"
+                    )
+        
+        return result
+
+
+def _prepare_employees(employees: pl.LazyFrame) -> pl.LazyFrame:
+    """Employee master reduced to what the joins use, unique and sorted on employee_key."""
+    return prepare_dimension(
+        employee_dimension(employees).select(EMPLOYEE_KEY, "employee_id", "job_level"),
+        EMPLOYEE_KEY,
+    )
+
+
+def _prepare_employee_salaries(employees: pl.LazyFrame) -> pl.LazyFrame:
+    """Fixed pay and MRT flag per employee_key, for the bonus cap."""
+    return prepare_dimension(
+        employee_dimension(employees).select(EMPLOYEE_KEY, "base_salary_eur", "is_mrt"),
+        EMPLOYEE_KEY,
+    )
+
+
+def _employee_categories(employees: pl.LazyFrame) -> pl.LazyFrame:
+    """Distinct (subsidiary_code, job_level) pairs of the employee master, for the Enums."""
+    return employees.select("subsidiary_code", "job_level").unique(maintain_order=True)
+
+
+def _prepare_fx_rates(fx_rates: pl.LazyFrame) -> pl.LazyFrame:
+    """FX rates unique and sorted on currency."""
+    return prepare_dimension(fx_rates, "currency")
+
+
+def _prepare_mapping(mapping: pl.LazyFrame) -> pl.LazyFrame:
+    """Concept mapping unique and sorted on concept_raw."""
+    return prepare_dimension(mapping, "concept_raw")
+
+
+def _prepare_bonus_pool(pool: pl.LazyFrame) -> pl.LazyFrame:
+    """Bonus pool unique and sorted on subsidiary_code."""
+    return prepare_dimension(pool, "subsidiary_code")
+
+
+def _prepare_pool_hierarchy(hierarchy: pl.LazyFrame) -> pl.LazyFrame:
+    """Pool hierarchy with one row per (level, node)."""
+    return (
+        hierarchy
+        .select("level", "node", "parent", "pool_amount_eur")
+        .unique(subset=["level", "node"], keep="first", maintain_order=True)
+    )
 
 
-def run_pipeline(validate: bool = True) -> PipelineResult:
+def run_pipeline(
+    validate: bool = True,
+    explain: bool = False,
+    streaming: bool = False,
+    profile: bool = False,
+) -> PipelineResult:
     """Convenience function to run the default pipeline."""
-    pipeline = ETLPipeline(validate=validate)
+    pipeline = ETLPipeline(
+        validate=validate, explain=explain, streaming=streaming, profile=profile
+    )
     return pipeline.run()
 
 
@@ -0,0 +1,121 @@
+"""
+Stage-level profiling for the ETL pipeline.
+
+The fused lazy plan gives no per-stage breakdown, so in profiling mode every
+logical stage is executed as its own query on the previous stage's result.
+Each stage records wall time, Polars engine time (from ``LazyFrame.profile()``
+where the installed Polars still provides it), rows in/out and memory, so
+regressions can be pinned to a stage.
+
+Memory comes from the process high-water mark (``ru_maxrss``), which never
+goes down: ``process_peak_rss_mb`` is that mark after the stage, and
+``rss_growth_mb`` how much the stage raised it (0 for a stage that stayed
+below an earlier peak).
+"""
+import json
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class StageMetrics:
+    """Timing and volume metrics of one pipeline stage."""
+
+    stage: str
+    seconds: float
+    engine_seconds: float | None
+    rows_in: int
+    rows_out: int
+    # Process high-water mark after the stage (cumulative, not per stage)
+    process_peak_rss_mb: float | None
+    # Increase of the high-water mark during the stage
+    rss_growth_mb: float | None
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def collect_with_profile(lf: pl.LazyFrame) -> tuple[pl.DataFrame, float | None]:
+    """Collect a LazyFrame, returning the engine time from its profile when available."""
+    # LazyFrame.profile() was removed in Polars 2.0
+    if not hasattr(pl.LazyFrame, "profile"):
+        return lf.collect(), None
+    df, timings = lf.profile()
+    engine_us = timings["end"].max() - timings["start"].min() if timings.height else 0
+    return df, engine_us / 1e6
+
+
+class StageProfiler:
+    """Runs pipeline stages one by one and accumulates their metrics."""
+
+    def __init__(self):
+        self.metrics: list[StageMetrics] = []
+
+    def collect(self, stage: str, lf: pl.LazyFrame, rows_in: int) -> pl.DataFrame:
+        """Execute one stage's query and record its metrics."""
+        peak_before = peak_rss_mb()
+        start = time.perf_counter()
+        df, engine_seconds = collect_with_profile(lf)
+        self._record(stage, start, peak_before, engine_seconds, rows_in, df.height)
+        return df
+
+    def time(self, stage: str, fn: Callable[[], None], rows: int) -> None:
+        """Time a side-effecting stage (e.g. export) that does not produce a frame."""
+        peak_before = peak_rss_mb()
+        start = time.perf_counter()
+        fn()
+        self._record(stage, start, peak_before, None, rows, rows)
+
+    def _record(
+        self,
+        stage: str,
+        start: float,
+        peak_before: float | None,
+        engine_seconds: float | None,
+        rows_in: int,
+        rows_out: int,
+    ) -> None:
+        seconds = time.perf_counter() - start
+        peak = peak_rss_mb()
+        self.metrics.append(StageMetrics(
+            stage=stage,
+            seconds=seconds,
+            engine_seconds=engine_seconds,
+            rows_in=rows_in,
+            rows_out=rows_out,
+            process_peak_rss_mb=peak,
+            rss_growth_mb=None if peak is None else peak - peak_before,
+        ))
+
+
+def write_profile_report(
+    metrics: list[StageMetrics],
+    path: Path,
+    total_seconds: float,
+) -> None:
+    """Write stage metrics as a JSON report."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "polars_version": pl.__version__,
+        "total_seconds": total_seconds,
+        "stages": [asdict(m) for m in metrics],
+    }
+    path.write_text(json.dumps(report, indent=2))
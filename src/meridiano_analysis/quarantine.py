@@ -0,0 +1,65 @@
+"""
+Row-level quarantine of invalid input records.
+
+Every remuneration check from the validation module is a bit in a
+``reject_flags`` bitmask computed per row with vectorized expressions.
+Rows with no flag set continue through the ETL; rows with any flag set are
+written, with their reason codes, to the quarantine output. Both streams
+come from one cached tagging of the input, so quarantining adds no extra
+pass over the data.
+"""
+import polars as pl
+
+from .validation import remuneration_checks
+
+
+FLAGS_COLUMN = "reject_flags"
+REASONS_COLUMN = "reject_reasons"
+
+
+def rule_bits() -> dict[str, int]:
+    """Bit value of each quarantine rule, in check order (bit 0 = first check)."""
+    return {name: 1 << i for i, name in enumerate(remuneration_checks())}
+
+
+def decode_flags(flags: int) -> list[str]:
+    """Names of the rules set in a reject_flags value."""
+    return [name for name, bit in rule_bits().items() if flags & bit]
+
+
+def tag_violations(df: pl.LazyFrame) -> pl.LazyFrame:
+    """Add the reject_flags bitmask (UInt32, 0 = clean) to every row."""
+    bits = rule_bits()
+    checks = remuneration_checks(df.collect_schema().names())
+    return df.with_columns(
+        pl.sum_horizontal(
+            pl.when(mask).then(pl.lit(bits[name], dtype=pl.UInt32))
+            .otherwise(pl.lit(0, dtype=pl.UInt32))
+            for name, (mask, _) in checks.items()
+        ).alias(FLAGS_COLUMN)
+    )
+
+
+def split_quarantine(df: pl.LazyFrame) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """
+    Split input facts into clean and rejected streams from one scan.
+
+    Returns:
+        Tuple of (clean rows with the input schema, rejected rows with
+        reject_flags and comma-separated reject_reasons).
+    """
+    tagged = tag_violations(df).cache()
+    flags = pl.col(FLAGS_COLUMN)
+
+    clean = tagged.filter(flags == 0).drop(FLAGS_COLUMN)
+    rejected = tagged.filter(flags != 0).with_columns(
+        pl.concat_str(
+            [
+                pl.when((flags & bit) != 0).then(pl.lit(name))
+                for name, bit in rule_bits().items()
+            ],
+            separator=",",
+            ignore_nulls=True,
+        ).alias(REASONS_COLUMN)
+    )
+    return clean, rejected
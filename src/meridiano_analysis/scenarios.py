@@ -0,0 +1,251 @@
+"""
+Batched what-if scenarios over the funding ratios.
+
+A scenario scales bonus pools per subsidiary and FX rates per currency, e.g.
+"cut LATAM pools by 10%" or "BRL +5%". Neither changes which facts exist, so
+the enriched facts are aggregated once into the demand per subsidiary,
+currency and category (a few hundred rows) and cached on the engine. All
+scenarios are then evaluated together: the demand and the pools are crossed
+with the scenario names, the shocks joined on in long format, and one
+group_by yields the demand, funding ratio and payout of every (scenario,
+subsidiary). Payout detail per fact is only built for a scenario on request.
+
+Scenarios are given as one long frame with one row per shock:
+
+    scenario | kind | key    | factor
+    ---------+------+--------+-------
+    latam-10 | pool | BR-SAO | 0.9
+    latam-10 | pool | AR-BUE | 0.9
+    brl+5    | fx   | BRL    | 1.05
+
+Shocks of the same (scenario, kind, key) multiply. A scenario whose only row
+has factor 1.0 is the baseline.
+"""
+import logging
+
+import polars as pl
+
+from .calculators import funding_ratio
+from .config import settings
+from .pipeline import ETLPipeline
+from .transformers import apply_funding_ratio, lookup, select_output_columns
+
+
+logger = logging.getLogger(__name__)
+
+SCENARIO_KINDS = ["pool", "fx"]
+DEMAND_KEYS = ["subsidiary_code", "local_currency", "category_normalized"]
+SCENARIO_SCHEMA = {
+    "scenario": pl.String,
+    "kind": pl.String,
+    "key": pl.String,
+    "factor": pl.Float64,
+}
+
+
+class ScenarioEngine:
+    """
+    Evaluates pool/FX scenarios against demand aggregated once.
+
+    The facts stay lazy: only demand (on first use) and payout_detail
+    execute them.
+    """
+
+    def __init__(
+        self,
+        facts: pl.LazyFrame,
+        pool: pl.LazyFrame,
+        cap: float = 1.0,
+        default_ratio: float = 1.0,
+    ):
+        """
+        Initialize with the enriched facts and the bonus pool.
+
+        Args:
+            facts: Enriched facts with DEMAND_KEYS and theoretical_eur
+            pool: Bonus pool with subsidiary_code and pool_amount_eur
+            cap: Maximum funding ratio
+            default_ratio: Ratio of subsidiaries without a pool
+        """
+        self.facts = facts
+        self.pool = pool
+        self.cap = cap
+        self.default_ratio = default_ratio
+        self._demand: pl.DataFrame | None = None
+
+    @classmethod
+    def from_pipeline(cls, pipeline: ETLPipeline) -> "ScenarioEngine":
+        """
+        Engine over the clean enriched facts and bonus pool of an ETLPipeline.
+
+        Pool hierarchies and surplus redistribution are not modelled by the
+        scenarios, so pipelines using either are rejected. Concepts map
+        through the alias table as it stands (see resolve_concepts).
+        """
+        if pipeline.pool_hierarchy_path.exists() or pipeline.redistribute_surplus:
+            raise ValueError(
+                "Scenarios only model subsidiary-local funding ratios; "
+                "disable the pool hierarchy and surplus redistribution"
+            )
+        facts, pool = pipeline.build_enriched()
+        return cls(
+            facts,
+            pool,
+            cap=settings.FUNDING_RATIO_CAP,
+            default_ratio=settings.DEFAULT_FUNDING_RATIO,
+        )
+
+    @property
+    def demand(self) -> pl.DataFrame:
+        """Theoretical EUR per subsidiary, currency and category (aggregated once)."""
+        if self._demand is None:
+            self._demand = (
+                self.facts
+                .group_by(DEMAND_KEYS)
+                .agg(pl.col("theoretical_eur").sum())
+                .with_columns(pl.col("subsidiary_code", "local_currency").cast(pl.String))
+                .collect()
+            )
+            logger.info(f"Scenarios: cached demand ({self._demand.height} rows)")
+        return self._demand
+
+    def evaluate(self, scenarios: pl.DataFrame) -> pl.DataFrame:
+        """
+        Funding ratios and payouts of every scenario, in one plan.
+
+        Args:
+            scenarios: Shocks in long format (see SCENARIO_SCHEMA)
+
+        Returns:
+            DataFrame with one row per (scenario, subsidiary_code):
+            pool_amount_eur, total_needed_eur, funding_ratio and payout_eur,
+            scenarios in order of first appearance.
+        """
+        shocks = self._shocks(scenarios)
+        names = shocks.select("scenario").unique(maintain_order=True).with_row_index("_order")
+        keys = ["scenario", "subsidiary_code"]
+
+        needed = (
+            names.lazy()
+            .join(self.demand.lazy(), how="cross")
+            .join(
+                self._factors(shocks, "fx", "local_currency"),
+                on=["scenario", "local_currency"],
+                how="left",
+            )
+            .group_by("_order", *keys)
+            .agg(
+                (pl.col("theoretical_eur") * pl.col("factor").fill_null(1.0))
+                .sum()
+                .alias("total_needed_eur")
+            )
+        )
+        pools = (
+            names.lazy()
+            .join(
+                self.pool.select(pl.col("subsidiary_code").cast(pl.String), "pool_amount_eur"),
+                how="cross",
+            )
+            .join(self._factors(shocks, "pool", "subsidiary_code"), on=keys, how="left")
+            .select(
+                "_order",
+                *keys,
+                (pl.col("pool_amount_eur") * pl.col("factor").fill_null(1.0))
+                .alias("pool_amount_eur"),
+            )
+        )
+        ratio = (
+            pl.when(pl.col("pool_amount_eur").is_null())
+            .then(pl.lit(self.default_ratio, dtype=pl.Float64))
+            .otherwise(funding_ratio(
+                pl.col("pool_amount_eur"), pl.col("total_needed_eur").fill_null(0.0), self.cap
+            ))
+        )
+        return (
+            pools
+            .join(needed, on=["_order", *keys], how="full", coalesce=True)
+            .with_columns(ratio.alias("funding_ratio"))
+            .with_columns(
+                (pl.col("total_needed_eur").fill_null(0.0) * pl.col("funding_ratio"))
+                .alias("payout_eur")
+            )
+            .sort("_order", "subsidiary_code")
+            .drop("_order")
+            .collect()
+        )
+
+    @staticmethod
+    def totals(evaluated: pl.DataFrame) -> pl.DataFrame:
+        """Pool, demand and payout per scenario (from evaluate)."""
+        return evaluated.group_by("scenario", maintain_order=True).agg(
+            pl.col("pool_amount_eur", "total_needed_eur", "payout_eur").sum(),
+            (pl.col("funding_ratio") < 1.0).sum().alias("underfunded_subsidiaries"),
+        )
+
+    def payout_detail(self, scenarios: pl.DataFrame, scenario: str) -> pl.LazyFrame:
+        """
+        Per-fact output (as the pipeline writes it) under one scenario.
+
+        Runs the enriched facts again; evaluate never does.
+        """
+        shocks = self._shocks(scenarios).filter(pl.col("scenario") == scenario)
+        if shocks.is_empty():
+            raise ValueError(f"Unknown scenario: {scenario!r}")
+        ratios = self.evaluate(shocks).select("subsidiary_code", "funding_ratio")
+        fx = self._factors(shocks, "fx", "local_currency").collect()
+
+        schema = self.facts.collect_schema()
+        ratios = ratios.with_columns(
+            pl.col("subsidiary_code").cast(schema["subsidiary_code"], strict=False)
+        ).drop_nulls("subsidiary_code")
+        fx = fx.with_columns(
+            pl.col("local_currency").cast(schema["local_currency"], strict=False)
+        ).drop_nulls("local_currency")
+        fx_factor = lookup(pl.col("local_currency"), fx, "local_currency", "factor", default=1.0)
+
+        facts = self.facts.with_columns(
+            pl.col("theoretical_eur") * fx_factor,
+            pl.col("fx_rate_to_eur") * fx_factor,
+        )
+        return select_output_columns(
+            apply_funding_ratio(facts, ratios, default_ratio=self.default_ratio)
+        )
+
+    def _shocks(self, scenarios: pl.DataFrame) -> pl.DataFrame:
+        """Validated shocks, one row per (scenario, kind, key)."""
+        missing = set(SCENARIO_SCHEMA) - set(scenarios.columns)
+        if missing:
+            raise ValueError(f"Scenarios are missing columns: {sorted(missing)}")
+        shocks = scenarios.select(
+            pl.col(name).cast(dtype) for name, dtype in SCENARIO_SCHEMA.items()
+        )
+        if shocks.null_count().sum_horizontal().item():
+            raise ValueError("Scenarios must not contain nulls")
+        bad_kinds = set(shocks["kind"]) - set(SCENARIO_KINDS)
+        if bad_kinds:
+            raise ValueError(f"Unknown scenario kinds: {sorted(bad_kinds)}")
+        if (shocks["factor"] < 0).any():
+            raise ValueError("Scenario factors must be >= 0")
+
+        pools = self.pool.select(pl.col("subsidiary_code").cast(pl.String)).collect()
+        known = {
+            "pool": set(pools.to_series()),
+            "fx": set(self.demand["local_currency"].drop_nulls()),
+        }
+        for kind in SCENARIO_KINDS:
+            unknown = set(shocks.filter(pl.col("kind") == kind)["key"]) - known[kind]
+            if unknown:
+                raise ValueError(f"Unknown {kind} scenario keys: {sorted(unknown)}")
+
+        return shocks.group_by("scenario", "kind", "key", maintain_order=True).agg(
+            pl.col("factor").product()
+        )
+
+    @staticmethod
+    def _factors(shocks: pl.DataFrame, kind: str, key: str) -> pl.LazyFrame:
+        """(scenario, key, factor) of one kind of shock, with the key renamed."""
+        return (
+            shocks.lazy()
+            .filter(pl.col("kind") == kind)
+            .select("scenario", pl.col("key").alias(key), "factor")
+        )
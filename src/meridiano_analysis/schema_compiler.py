@@ -0,0 +1,228 @@
+"""
+Compile the Pydantic schemas into vectorized Polars checks.
+
+Validating row by row through Pydantic is far too slow at our volumes, so
+the models in ``schemas.py`` are compiled once into:
+
+- a Polars dtype schema (``str`` -> String, ``float`` -> Float64, ...),
+- the set of non-nullable columns (fields not typed ``Optional``),
+- one boolean violation expression per field constraint
+  (``ge``, ``gt``, ``le``, ``lt``, ``min_length``, ``max_length``, ``pattern``).
+
+Whole frames are then validated in a single ``select`` of aggregates, with
+the Pydantic models remaining the single source of truth.
+"""
+import datetime as dt
+import functools
+import types
+from dataclasses import dataclass
+from typing import List, Union, get_args, get_origin
+
+import annotated_types
+import polars as pl
+from pydantic import BaseModel
+
+from .schemas import ValidationError, ValidationResult
+
+
+PYTHON_TO_POLARS: dict[type, pl.DataType] = {
+    str: pl.String(),
+    float: pl.Float64(),
+    int: pl.Int64(),
+    bool: pl.Boolean(),
+    dt.date: pl.Date(),
+    dt.datetime: pl.Datetime(),
+}
+
+
+@dataclass(frozen=True)
+class FieldConstraint:
+    """One compiled field check: a boolean expression that is True on violating rows."""
+
+    name: str
+    column: str
+    template: str
+    violation: pl.Expr
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """Polars form of a Pydantic model: dtypes, nullability and constraints."""
+
+    model_name: str
+    schema: pl.Schema
+    nullable: dict[str, bool]
+    constraints: tuple[FieldConstraint, ...]
+
+    def field_checks(self, columns: list[str] | None = None) -> list[FieldConstraint]:
+        """
+        Null checks (one per non-nullable field) followed by the field constraints.
+
+        With ``columns``, checks on absent columns are left out.
+        """
+        nulls = [
+            FieldConstraint(
+                f"null_{col}", col, f"Column '{col}' has {{count}} null values",
+                pl.col(col).is_null(),
+            )
+            for col, nullable in self.nullable.items()
+            if not nullable
+        ]
+        return [
+            c for c in nulls + list(self.constraints)
+            if columns is None or c.column in columns
+        ]
+
+    def checks(self, columns: list[str] | None = None) -> dict[str, tuple[pl.Expr, str]]:
+        """Row-level checks as name -> (violation expression, warning template)."""
+        return {c.name: (c.violation, c.template) for c in self.field_checks(columns)}
+
+
+def polars_dtype(annotation: object) -> tuple[pl.DataType, bool]:
+    """Map a field annotation to (Polars dtype, nullable)."""
+    nullable = False
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        nullable = len(args) < len(get_args(annotation))
+        if len(args) != 1:
+            raise TypeError(f"Unsupported union annotation: {annotation}")
+        annotation = args[0]
+    if annotation not in PYTHON_TO_POLARS:
+        raise TypeError(f"No Polars dtype for annotation: {annotation}")
+    return PYTHON_TO_POLARS[annotation], nullable
+
+
+def compile_constraints(column: str, metadata: list[object]) -> list[FieldConstraint]:
+    """Translate a field's annotated-types metadata into violation expressions."""
+    col = pl.col(column)
+    length = col.str.len_chars()
+    constraints = []
+
+    def constraint(kind: str, rule: str, violation: pl.Expr) -> FieldConstraint:
+        return FieldConstraint(
+            f"{column}_{kind}", column, f"{{count}} records violate {rule}", violation
+        )
+
+    for m in metadata:
+        if isinstance(m, annotated_types.Ge):
+            constraints.append(constraint("ge", f"{column} >= {m.ge}", col < m.ge))
+        elif isinstance(m, annotated_types.Gt):
+            constraints.append(constraint("gt", f"{column} > {m.gt}", col <= m.gt))
+        elif isinstance(m, annotated_types.Le):
+            constraints.append(constraint("le", f"{column} <= {m.le}", col > m.le))
+        elif isinstance(m, annotated_types.Lt):
+            constraints.append(constraint("lt", f"{column} < {m.lt}", col >= m.lt))
+        elif isinstance(m, annotated_types.MinLen):
+            constraints.append(constraint(
+                "min_length", f"len({column}) >= {m.min_length}", length < m.min_length
+            ))
+        elif isinstance(m, annotated_types.MaxLen):
+            constraints.append(constraint(
+                "max_length", f"len({column}) <= {m.max_length}", length > m.max_length
+            ))
+        elif getattr(m, "pattern", None) is not None:
+            constraints.append(constraint(
+                "pattern", f"{column} ~ {m.pattern!r}", ~col.str.contains(m.pattern)
+            ))
+    return constraints
+
+
+@functools.cache
+def compile_model(model: type[BaseModel]) -> CompiledSchema:
+    """Compile a Pydantic model into its Polars schema and constraint expressions."""
+    schema = {}
+    nullable = {}
+    constraints: list[FieldConstraint] = []
+    for name, field in model.model_fields.items():
+        schema[name], nullable[name] = polars_dtype(field.annotation)
+        constraints.extend(compile_constraints(name, field.metadata))
+    return CompiledSchema(
+        model_name=model.__name__,
+        schema=pl.Schema(schema),
+        nullable=nullable,
+        constraints=tuple(constraints),
+    )
+
+
+def dtype_compatible(actual: pl.DataType, expected: pl.DataType) -> bool:
+    """Whether a column dtype can hold the model type (any float/int width for numbers)."""
+    if expected == pl.Float64:
+        return actual.is_numeric()
+    if expected == pl.Int64:
+        return actual.is_integer()
+    if expected == pl.String:
+        return actual in (pl.String, pl.Categorical, pl.Enum)
+    return actual.base_type() == expected.base_type()
+
+
+def schema_errors(lf: pl.LazyFrame, compiled: CompiledSchema) -> List[ValidationError]:
+    """Missing columns and incompatible dtypes against a compiled schema."""
+    actual = lf.collect_schema()
+    errors = []
+    for col, expected in compiled.schema.items():
+        if col not in actual:
+            errors.append(ValidationError(
+                row=0, column=col, value="",
+                error=f"Required column '{col}' is missing"
+            ))
+        elif not dtype_compatible(actual[col], expected):
+            errors.append(ValidationError(
+                row=0, column=col, value=str(actual[col]),
+                error=f"Column '{col}' has dtype {actual[col]}, expected {expected}"
+            ))
+    return errors
+
+
+def validate_frame(
+    df: pl.DataFrame | pl.LazyFrame,
+    model: type[BaseModel],
+    engine: str = "auto",
+) -> ValidationResult:
+    """
+    Validate a whole frame against a Pydantic model at columnar speed.
+
+    Every null check and field constraint becomes an aggregate in one
+    ``select``: the violation count plus the first offending row and value,
+    which are reported as ValidationErrors.
+
+    Args:
+        df: Frame to validate (extra columns are ignored)
+        model: Pydantic model class from ``schemas.py``
+        engine: Polars engine for the aggregation
+
+    Returns:
+        ValidationResult with one error per violated check
+    """
+    lf = df.lazy()
+    compiled = compile_model(model)
+    errors = schema_errors(lf, compiled)
+    if errors:
+        return ValidationResult(is_valid=False, errors=errors, warnings=[], rows_checked=0)
+
+    checks = compiled.field_checks()
+    index = pl.int_range(pl.len(), dtype=pl.Int64)
+    aggregates = [pl.len().alias("rows")]
+    for c in checks:
+        mask = c.violation.fill_null(False)
+        aggregates += [
+            mask.sum().alias(f"{c.name}__count"),
+            index.filter(mask).first().alias(f"{c.name}__row"),
+            pl.col(c.column).filter(mask).first().cast(pl.String).alias(f"{c.name}__value"),
+        ]
+    stats = lf.select(aggregates).collect(engine=engine).row(0, named=True)
+
+    for c in checks:
+        count = stats[f"{c.name}__count"]
+        if count:
+            errors.append(ValidationError(
+                row=stats[f"{c.name}__row"],
+                column=c.column,
+                value=stats[f"{c.name}__value"] or "",
+                error=f"{compiled.model_name}: " + c.template.format(count=count),
+            ))
+    return ValidationResult(
+        is_valid=not errors,
+        errors=errors,
+        warnings=[],
+        rows_checked=stats["rows"],
+    )
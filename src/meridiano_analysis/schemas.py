@@ -7,6 +7,9 @@ enabling runtime validation and clear documentation.
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from dataclasses import dataclass
+from datetime import date
+
+import polars as pl
 
 
 class RemunerationRecord(BaseModel):
@@ -32,6 +35,21 @@ class FxRate(BaseModel):
     fx_rate_to_eur: float = Field(gt=0)
 
 
+class FxHistoryRate(BaseModel):
+    """Schema for an FX rate valid from a given date on."""
+    
+    currency: str = Field(pattern="^[A-Z]{3}$")
+    valid_from: date
+    fx_rate_to_eur: float = Field(gt=0)
+
+
+class CurrencyAlias(BaseModel):
+    """Schema for a currency alias (normalized spelling -> ISO code)."""
+    
+    alias: str = Field(min_length=1)
+    currency: str = Field(pattern="^[A-Z]{3}$")
+
+
 class ConceptMapping(BaseModel):
     """Schema for concept-to-category mapping."""
     
@@ -46,6 +64,15 @@ class BonusPool(BaseModel):
     pool_amount_eur: float = Field(ge=0)
 
 
+class PoolNode(BaseModel):
+    """Schema for a node of the pool hierarchy (group, region, country, subsidiary)."""
+    
+    level: str
+    node: str = Field(min_length=1)
+    parent: Optional[str] = None
+    pool_amount_eur: Optional[float] = Field(default=None, ge=0)
+
+
 class ProcessedRecord(BaseModel):
     """Schema for a processed output record."""
     
@@ -73,6 +100,7 @@ class ValidationResult:
     errors: List[ValidationError]
     warnings: List[str]
     rows_checked: int
+    by_subsidiary: Optional[pl.DataFrame] = None
     
     @property
     def error_count(self) -> int:
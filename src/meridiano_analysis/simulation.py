@@ -0,0 +1,229 @@
+"""
+Monte Carlo simulation of FX risk on the funding ratios.
+
+Pools are fixed in EUR while demand is converted from local currencies, so
+FX moves shift every funding ratio. The demand is aggregated once into a
+subsidiary x currency matrix (the cached demand of a ``ScenarioEngine``).
+Each draw is a vector of log FX shocks from a multivariate normal with the
+given covariance, so the EUR demand of all draws in a batch is one matrix
+product, and the ratios and payouts follow element-wise. Draws are
+processed in batches to bound the intermediate matrices; only the per-draw
+ratios and payouts (draws x subsidiaries) are kept for the percentiles.
+
+Draws come from a seeded NumPy ``Generator`` and do not depend on the batch
+size, so a (seed, draws) pair always reproduces the same result.
+"""
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+
+from .scenarios import ScenarioEngine
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DRAWS = 10_000
+DEFAULT_SEED = 2024
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_PERCENTILES = [5.0, 50.0, 95.0]
+
+
+def covariance_from_history(
+    history: pl.LazyFrame | pl.DataFrame,
+    horizon_days: int = 1,
+) -> pl.DataFrame:
+    """
+    Covariance of log FX returns over horizon_days, from a daily FX history.
+
+    Rates are carried forward over days without a row (the history only
+    lists changes), and daily log returns are scaled by horizon_days.
+    Currencies whose rate never moves (EUR) are left out.
+
+    Returns:
+        DataFrame with a currency column and one column per currency.
+    """
+    rates = (
+        history.lazy()
+        .collect()
+        .pivot(
+            on="currency", index="valid_from", values="fx_rate_to_eur", aggregate_function="last"
+        )
+        .sort("valid_from")
+        .drop("valid_from")
+        .fill_null(strategy="forward")
+    )
+    returns = rates.select(pl.all().log().diff()).slice(1).drop_nulls()
+    returns = returns.select(name for name in returns.columns if returns[name].std() > 0)
+    matrix = np.atleast_2d(np.cov(returns.to_numpy(), rowvar=False)) * horizon_days
+    return pl.DataFrame(matrix, schema=returns.columns).insert_column(
+        0, pl.Series("currency", returns.columns)
+    )
+
+
+@dataclass
+class FxRiskResult:
+    """Percentile bands of a simulation."""
+    draws: int
+    seed: int
+    # One row per (subsidiary_code, percentile): total_needed_eur,
+    # funding_ratio and payout_eur, each the marginal percentile over draws
+    bands: pl.DataFrame
+    # One row per percentile: total_needed_eur and total_payout_eur
+    totals: pl.DataFrame
+    # Total payout of every draw
+    total_payout_eur: np.ndarray
+
+
+class FxRiskSimulator:
+    """
+    Simulates correlated FX shocks against demand aggregated once.
+    """
+
+    def __init__(
+        self,
+        demand: pl.DataFrame,
+        pool: pl.DataFrame,
+        cap: float = 1.0,
+        default_ratio: float = 1.0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Initialize with the EUR demand and the bonus pool.
+
+        Args:
+            demand: subsidiary_code, local_currency and theoretical_eur
+                (several rows per pair are summed)
+            pool: subsidiary_code and pool_amount_eur
+            cap: Maximum funding ratio
+            default_ratio: Ratio of subsidiaries without a pool
+            batch_size: Draws per matrix product
+        """
+        self.cap = cap
+        self.default_ratio = default_ratio
+        self.batch_size = batch_size
+
+        by_currency = (
+            demand
+            .with_columns(pl.col("subsidiary_code", "local_currency").cast(pl.String))
+            .group_by("subsidiary_code", "local_currency")
+            .agg(pl.col("theoretical_eur").sum())
+        )
+        pool = pool.select(pl.col("subsidiary_code").cast(pl.String), "pool_amount_eur")
+        self.subsidiaries = sorted(
+            set(by_currency["subsidiary_code"]) | set(pool["subsidiary_code"])
+        )
+        self.currencies = sorted(by_currency["local_currency"].drop_nulls().unique())
+        # Subsidiaries x currencies, in EUR at the base rates
+        self.demand = (
+            pl.DataFrame({"subsidiary_code": self.subsidiaries})
+            .join(
+                by_currency.pivot(
+                    on="local_currency", index="subsidiary_code", values="theoretical_eur"
+                ),
+                on="subsidiary_code",
+                how="left",
+            )
+            .select(pl.col(self.currencies).fill_null(0.0))
+            .to_numpy()
+        )
+        pools = dict(pool.iter_rows())
+        self.pool = np.array([pools.get(code) or 0.0 for code in self.subsidiaries])
+        self.has_pool = np.array([pools.get(code) is not None for code in self.subsidiaries])
+
+    @classmethod
+    def from_engine(cls, engine: ScenarioEngine, **kwargs) -> "FxRiskSimulator":
+        """Simulator over the cached demand and the pool of a scenario engine."""
+        return cls(
+            engine.demand,
+            engine.pool.collect(),
+            cap=engine.cap,
+            default_ratio=engine.default_ratio,
+            **kwargs,
+        )
+
+    def simulate(
+        self,
+        covariance: pl.DataFrame,
+        draws: int = DEFAULT_DRAWS,
+        seed: int = DEFAULT_SEED,
+        percentiles: list[float] | None = None,
+    ) -> FxRiskResult:
+        """
+        Draw FX shocks and report percentile bands of the ratios and payouts.
+
+        Args:
+            covariance: Covariance of log FX shocks (layout of
+                covariance_from_history); currencies missing from it keep
+                their base rate
+            draws: Number of shock vectors
+            seed: Seed of the NumPy Generator
+            percentiles: Percentiles of the bands (default 5, 50, 95)
+        """
+        percentiles = percentiles or DEFAULT_PERCENTILES
+        listed = covariance["currency"].to_list()
+        shocked = [c for c in listed if c in self.currencies]
+        index = [listed.index(c) for c in shocked]
+        root = _matrix_root(covariance.select(listed).to_numpy()[np.ix_(index, index)])
+
+        columns = [self.currencies.index(c) for c in shocked]
+        fixed = np.delete(self.demand, columns, axis=1).sum(axis=1)
+        exposed = self.demand[:, columns].T  # shocked currencies x subsidiaries
+
+        rng = np.random.default_rng(seed)
+        needed = np.empty((draws, len(self.subsidiaries)))
+        ratios = np.empty_like(needed)
+        for start in range(0, draws, self.batch_size):
+            batch = slice(start, min(start + self.batch_size, draws))
+            shocks = rng.standard_normal((batch.stop - batch.start, len(shocked))) @ root.T
+            needed[batch] = fixed + np.exp(shocks) @ exposed
+            ratios[batch] = self._ratios(needed[batch])
+        payouts = needed * ratios
+        logger.info(f"FX risk: {draws:,} draws over {len(shocked)} currencies")
+
+        q = np.array(percentiles)
+        bands = pl.concat([
+            pl.DataFrame({
+                "subsidiary_code": self.subsidiaries,
+                "percentile": np.full(len(self.subsidiaries), p),
+                "total_needed_eur": needed_q,
+                "funding_ratio": ratio_q,
+                "payout_eur": payout_q,
+            })
+            for p, needed_q, ratio_q, payout_q in zip(
+                q,
+                np.percentile(needed, q, axis=0),
+                np.percentile(ratios, q, axis=0),
+                np.percentile(payouts, q, axis=0),
+            )
+        ]).sort("subsidiary_code", "percentile")
+        total_payout = payouts.sum(axis=1)
+        totals = pl.DataFrame({
+            "percentile": q,
+            "total_needed_eur": np.percentile(needed.sum(axis=1), q),
+            "total_payout_eur": np.percentile(total_payout, q),
+        })
+        return FxRiskResult(
+            draws=draws, seed=seed, bands=bands, totals=totals, total_payout_eur=total_payout
+        )
+
+    def _ratios(self, needed: np.ndarray) -> np.ndarray:
+        """Funding ratios of a batch of demand rows (see calculators.funding_ratio)."""
+        ratios = np.divide(self.pool, needed, out=np.ones_like(needed), where=needed > 0)
+        ratios = np.minimum(ratios, self.cap)
+        ratios[:, ~self.has_pool] = self.default_ratio
+        return ratios
+
+
+def _matrix_root(covariance: np.ndarray) -> np.ndarray:
+    """L with L @ L.T == covariance (Cholesky, or eigen-decomposition when singular)."""
+    if covariance.shape[0] != covariance.shape[1] or not np.allclose(covariance, covariance.T):
+        raise ValueError("FX covariance must be a symmetric square matrix")
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        values, vectors = np.linalg.eigh(covariance)
+        if values.min() < -1e-10 * max(1.0, values.max()):
+            raise ValueError("FX covariance must be positive semi-definite")
+        return vectors * np.sqrt(values.clip(min=0.0))
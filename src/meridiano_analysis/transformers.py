@@ -7,12 +7,35 @@ Config values are passed as parameters for testability.
 import polars as pl
 
 
+# Dimension tables below this many rows can be broadcast as lookup expressions
+DEFAULT_BROADCAST_MAX_ROWS = 10_000
+# Trailing period tokens some subsidiaries append to concepts (" 2024", " Q4", " FY23")
+PERIOD_SUFFIX_PATTERN = r"(?i)\s+(?:FY\d{2}|Q[1-4]|(?:19|20)\d{2})$"
+CONCEPT_KEY = "concept_key"
+
+# Legacy employee ID formats per country (subsidiary_code prefix): regexes with
+# the 8-digit employee number as group 1, tried before the default format
+EMPLOYEE_ID_RULES = {
+    "AR": r"^ARG(\d{8})$",
+    "MX": r"^MX-EMP(\d{8})$",
+    "CN": r"^EMP(\d{8})-[A-Z]{2}$",
+}
+DEFAULT_EMPLOYEE_ID_PATTERN = r"^EMP-?(\d{8})$"
+EMPLOYEE_KEY = "employee_key"
+
+# Fact date converted at the FX rate valid on it (see enrich_with_fx_asof)
+FX_DATE_COLUMN = "payment_date"
+
+
 def explode_concepts(df: pl.LazyFrame) -> pl.LazyFrame:
     """
     Split combined remuneration concepts and distribute amounts proportionally.
     
     Input: 'BONUS_PERF + SALES_COMM' with amount 1000
     Output: Two rows, each with amount 500
+    
+    The part count is taken per record (list length before the explode), so
+    no window over the exploded frame is needed and row order is preserved.
     """
     return (
         df
@@ -21,26 +44,240 @@ def explode_concepts(df: pl.LazyFrame) -> pl.LazyFrame:
             .str.split("+")
             .alias("concepts_list")
         )
-        .explode("concepts_list")
         .with_columns(
-            pl.col("concepts_list").str.strip_chars().alias("concept_clean")
+            pl.col("concepts_list").list.len().alias("num_concepts")
         )
+        .explode("concepts_list")
         .with_columns(
-            pl.col("concepts_list").len().over(pl.col("employee_id")).alias("num_concepts")
+            pl.col("concepts_list").str.strip_chars().alias("remuneration_concept"),
+            (pl.col("local_amount") / pl.col("num_concepts")).alias("local_amount"),
+        )
+        .drop(["concepts_list", "num_concepts"])
+    )
+
+
+def employee_key(
+    column: str = "employee_id",
+    subsidiary_column: str | None = "subsidiary_code"
+) -> pl.Expr:
+    """
+    UInt32 surrogate key of an employee ID ('MX-EMP00001234' -> 1234).
+    
+    The regional rule of the row's country is tried first, then the default
+    'EMP########' format; IDs matching neither get a null key.
+    
+    Args:
+        column: Employee ID column
+        subsidiary_column: Column whose country prefix selects the regional
+            rule (None to apply the default format only)
+    """
+    emp = pl.col(column).str.strip_chars().str.to_uppercase()
+    digits = emp.str.extract(DEFAULT_EMPLOYEE_ID_PATTERN, 1)
+    if subsidiary_column is not None:
+        country = pl.col(subsidiary_column).str.split("-").list.first()
+        digits = pl.coalesce(
+            *[
+                pl.when(country == region).then(emp.str.extract(pattern, 1))
+                for region, pattern in EMPLOYEE_ID_RULES.items()
+            ],
+            digits,
         )
+    return digits.cast(pl.UInt32).alias(EMPLOYEE_KEY)
+
+
+def canonicalize_employee_ids(df: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Add the employee_key surrogate and rewrite IDs to the canonical 'EMP########'.
+    
+    IDs that no rule recognizes keep their original value and a null key.
+    """
+    key = pl.col(EMPLOYEE_KEY)
+    return (
+        df
+        .with_columns(employee_key())
         .with_columns(
-            (pl.col("local_amount") / pl.col("num_concepts")).alias("local_amount")
+            pl.when(key.is_not_null())
+            .then(pl.lit("EMP") + key.cast(pl.String).str.zfill(8))
+            .otherwise(pl.col("employee_id"))
+            .alias("employee_id")
+        )
+    )
+
+
+def employee_dimension(employees: pl.LazyFrame) -> pl.LazyFrame:
+    """Employee master keyed by employee_key (derived from employee_id if not stored)."""
+    if EMPLOYEE_KEY not in employees.collect_schema().names():
+        employees = employees.with_columns(employee_key(subsidiary_column=None))
+    return employees
+
+
+def prepare_dimension(dim: pl.LazyFrame, key: str) -> pl.LazyFrame:
+    """Dimension with null keys dropped, deduplicated (first row wins) and sorted on its key."""
+    return (
+        dim
+        .drop_nulls(key)
+        .unique(subset=key, keep="first", maintain_order=True)
+        .sort(key)
+    )
+
+
+def enrich_with_employees(
+    df: pl.LazyFrame,
+    employees: pl.LazyFrame
+) -> pl.LazyFrame:
+    """Canonicalize employee IDs and join job levels on the integer surrogate key."""
+    return canonicalize_employee_ids(df).join(
+        employee_dimension(employees).select([EMPLOYEE_KEY, "job_level"]),
+        on=EMPLOYEE_KEY,
+        how="left"
+    )
+
+
+def employee_match_rates(
+    df: pl.LazyFrame,
+    employees: pl.LazyFrame
+) -> pl.LazyFrame:
+    """
+    Share of records matching the employee master, before and after canonicalization.
+    
+    Returns a one-row frame with rows, match_rate_raw (exact employee_id
+    join) and match_rate (employee_key join).
+    """
+    dim = employee_dimension(employees)
+    return (
+        df
+        .select("employee_id", employee_key())
+        .join(
+            dim.select("employee_id", pl.lit(True).alias("raw_match")),
+            on="employee_id",
+            how="left"
+        )
+        .join(
+            dim.select(EMPLOYEE_KEY, pl.lit(True).alias("key_match")),
+            on=EMPLOYEE_KEY,
+            how="left"
+        )
+        .select(
+            pl.len().alias("rows"),
+            pl.col("raw_match").fill_null(False).mean().alias("match_rate_raw"),
+            pl.col("key_match").fill_null(False).mean().alias("match_rate"),
+        )
+    )
+
+
+def clean_currency_code(column: str = "local_currency") -> pl.Expr:
+    """Strip and upper-case a currency column (' eur' -> 'EUR')."""
+    return pl.col(column).str.strip_chars().str.to_uppercase()
+
+
+def clean_currency_aliases(aliases: pl.DataFrame) -> pl.DataFrame:
+    """
+    Clean the alias column like the currency codes and drop duplicate aliases.
+
+    Spellings that only differ in case or whitespace ("eur", " EUR") collapse
+    to one alias; the same alias mapped to different currencies is ambiguous
+    and raises ValueError.
+    """
+    aliases = aliases.select(
+        pl.col("alias").str.strip_chars().str.to_uppercase(), "currency"
+    ).unique(maintain_order=True)
+    conflicts = aliases.filter(pl.col("alias").is_duplicated())
+    if not conflicts.is_empty():
+        raise ValueError(
+            "Currency aliases map to more than one currency: "
+            f"{conflicts.group_by('alias', maintain_order=True).agg('currency').rows()}"
         )
-        .drop(["concepts_list", "num_concepts", "remuneration_concept"])
-        .rename({"concept_clean": "remuneration_concept"})
+    return aliases
+
+
+def normalize_currency(
+    df: pl.LazyFrame,
+    aliases: pl.DataFrame,
+    column: str = "local_currency"
+) -> pl.LazyFrame:
+    """
+    Resolve currency spellings and symbols to ISO codes before the FX join.
+
+    Values are cleaned, then mapped through the alias dimension in a single
+    replace_strict lookup inside the lazy plan. Codes without an alias keep
+    their cleaned value, so they still fail the ISO currency check.
+
+    Args:
+        df: Input DataFrame
+        aliases: Alias dimension with alias -> currency (small, so eager)
+        column: Currency column to normalize
+    """
+    aliases = clean_currency_aliases(aliases)
+    cleaned = clean_currency_code(column)
+    return df.with_columns(
+        cleaned.replace_strict(aliases["alias"], aliases["currency"], default=cleaned).alias(column)
+    )
+
+
+def count_unresolved_currencies(
+    df: pl.LazyFrame,
+    aliases: pl.DataFrame,
+    column: str = "local_currency"
+) -> pl.LazyFrame:
+    """Rows per cleaned currency code that has no alias, most frequent first."""
+    known = clean_currency_aliases(aliases)["alias"]
+    return (
+        df
+        .select(clean_currency_code(column).alias(column))
+        .filter(pl.col(column).is_not_null() & ~pl.col(column).is_in(known.implode()))
+        .group_by(column)
+        .agg(pl.len().alias("rows"))
+        .sort(["rows", column], descending=[True, False])
+    )
+
+
+def lookup(
+    key: pl.Expr,
+    dim: pl.DataFrame,
+    key_column: str,
+    value_column: str,
+    default: object = None,
+) -> pl.Expr:
+    """
+    Broadcast lookup of a small collected dimension as one replace_strict expression.
+    
+    Keys missing from the dimension get default (null unless given).
+    """
+    return key.replace_strict(
+        dim[key_column],
+        dim[value_column],
+        default=default,
+        return_dtype=dim.schema[value_column],
     )
 
 
+def broadcastable(
+    dim: pl.LazyFrame,
+    max_rows: int = DEFAULT_BROADCAST_MAX_ROWS
+) -> pl.DataFrame | None:
+    """Collect a dimension if it has at most max_rows rows, otherwise None (join it)."""
+    if max_rows <= 0:
+        return None
+    head = dim.head(max_rows + 1).collect()
+    return head if head.height <= max_rows else None
+
+
 def enrich_with_fx(
     df: pl.LazyFrame, 
-    fx_rates: pl.LazyFrame
+    fx_rates: pl.LazyFrame | pl.DataFrame
 ) -> pl.LazyFrame:
-    """Join with FX rates and convert local amounts to EUR."""
+    """
+    Add FX rates and convert local amounts to EUR.
+    
+    A LazyFrame of rates is joined; a collected DataFrame (see broadcastable)
+    is applied as a lookup expression in a single projection.
+    """
+    if isinstance(fx_rates, pl.DataFrame):
+        rate = lookup(pl.col("local_currency"), fx_rates, "currency", "fx_rate_to_eur")
+        return df.with_columns(
+            rate.alias("fx_rate_to_eur"),
+            (pl.col("local_amount") * rate).alias("theoretical_eur"),
+        )
     return (
         df
         .join(
@@ -55,30 +292,101 @@ def enrich_with_fx(
     )
 
 
+def enrich_with_fx_asof(
+    df: pl.LazyFrame,
+    fx_history: pl.LazyFrame,
+    date_column: str = FX_DATE_COLUMN,
+) -> pl.LazyFrame:
+    """
+    Add the FX rate valid on each row's date and convert local amounts to EUR.
+    
+    Rows are matched per currency to the latest rate with valid_from on or
+    before their date (an as-of join), so the facts come out sorted by date.
+    Rows without a date, or dated before the first rate of their currency,
+    get no rate, like unknown currencies in enrich_with_fx.
+    
+    Args:
+        df: Facts with local_currency, local_amount and date_column
+        fx_history: (currency, valid_from, fx_rate_to_eur) sorted by
+            valid_from, e.g. from fx.prepare_fx_history
+        date_column: Date the amount converts at
+    """
+    return (
+        df
+        .sort(date_column)
+        .join_asof(
+            fx_history.select("currency", "valid_from", "fx_rate_to_eur"),
+            left_on=date_column,
+            right_on="valid_from",
+            by_left="local_currency",
+            by_right="currency",
+            strategy="backward",
+            check_sortedness=False,
+        )
+        .drop("valid_from")
+        .with_columns(
+            (pl.col("local_amount") * pl.col("fx_rate_to_eur")).alias("theoretical_eur")
+        )
+    )
+
+
+def canonical_concept(column: str = "remuneration_concept") -> pl.Expr:
+    """
+    Canonical form of a concept name ('bonus-anual cash Q4' -> 'BONUS_ANUAL_CASH').
+    
+    Strips whitespace and trailing period tokens, upper-cases, and turns
+    runs of spaces and hyphens into single underscores.
+    """
+    return (
+        pl.col(column)
+        .str.strip_chars()
+        .str.replace(PERIOD_SUFFIX_PATTERN, "")
+        .str.to_uppercase()
+        .str.replace_all(r"[\s\-]+", "_")
+    )
+
+
 def enrich_with_mapping(
     df: pl.LazyFrame,
-    mapping: pl.LazyFrame,
+    mapping: pl.LazyFrame | pl.DataFrame,
     unmapped_value: str = "UNMAPPED"
 ) -> pl.LazyFrame:
     """
-    Join with concept mapping to normalize categories.
+    Add normalized categories from the concept mapping.
+    
+    Both sides are matched on their canonical concept names, so case,
+    separator and period-suffix variants match their mapping entry. A
+    collected mapping is applied as a lookup expression instead of a join.
     
     Args:
         df: Input DataFrame
-        mapping: Mapping DataFrame with concept_raw -> category_normalized
+        mapping: Mapping with concept_raw -> category_normalized
         unmapped_value: Value to use for unmapped concepts (decoupled from config)
     """
+    # Typed literal, so an Enum category column stays an Enum
+    unmapped = pl.lit(unmapped_value, dtype=mapping.collect_schema()["category_normalized"])
+    keyed = (
+        mapping
+        .lazy()
+        .with_columns(canonical_concept("concept_raw").alias(CONCEPT_KEY))
+        .drop("concept_raw")
+        .unique(subset=CONCEPT_KEY, keep="first", maintain_order=True)
+    )
+    if isinstance(mapping, pl.DataFrame):
+        return df.with_columns(
+            lookup(
+                canonical_concept(), keyed.collect(), CONCEPT_KEY, "category_normalized",
+                default=unmapped,
+            ).fill_null(unmapped).alias("category_normalized")
+        )
     return (
         df
-        .join(
-            mapping,
-            left_on="remuneration_concept",
-            right_on="concept_raw",
-            how="left"
-        )
+        .with_columns(canonical_concept().alias(CONCEPT_KEY))
+        .join(keyed, on=CONCEPT_KEY, how="left")
+        .drop(CONCEPT_KEY)
         .with_columns(
             pl.col("category_normalized")
-            .fill_null(unmapped_value)
+            .fill_null(unmapped)
             .alias("category_normalized")
         )
     )
@@ -86,17 +394,27 @@ def enrich_with_mapping(
 
 def apply_funding_ratio(
     df: pl.LazyFrame,
-    pool_calc: pl.LazyFrame,
+    pool_calc: pl.LazyFrame | pl.DataFrame,
     default_ratio: float = 1.0
 ) -> pl.LazyFrame:
     """
     Apply funding ratio to calculate final payouts.
     
+    A collected pool_calc is applied as a lookup expression instead of a join.
+    
     Args:
         df: Input DataFrame with theoretical_eur
         pool_calc: Pool calculation results with funding_ratio
         default_ratio: Default ratio for missing subsidiaries (decoupled from config)
     """
+    if isinstance(pool_calc, pl.DataFrame):
+        ratio = lookup(
+            pl.col("subsidiary_code"), pool_calc, "subsidiary_code", "funding_ratio"
+        ).fill_null(default_ratio)
+        return df.with_columns(
+            ratio.alias("funding_ratio"),
+            (pl.col("theoretical_eur") * ratio).alias("final_payout_eur"),
+        )
     return (
         df
         .join(
@@ -6,118 +6,152 @@ Validates input data against schemas and business rules.
 import polars as pl
 from typing import List
 
-from .schemas import ValidationResult, ValidationError
+from .schemas import ValidationResult, ValidationError, RemunerationRecord, FxRate
+from .schema_compiler import compile_model, schema_errors, validate_frame
 
 
-def validate_remuneration_input(df: pl.DataFrame) -> ValidationResult:
+REQUIRED_REMUNERATION_COLUMNS = [
+    "employee_id", "local_currency", "remuneration_concept",
+    "local_amount", "subsidiary_code"
+]
+
+CLAWBACK_PATTERN = "(?i)clawback|malus"
+ISO_CURRENCY_PATTERN = "^[A-Z]{3}$"
+EXTREME_AMOUNT = 1e9
+
+
+def remuneration_checks(columns: List[str] | None = None) -> dict[str, tuple[pl.Expr, str]]:
+    """
+    Row-level checks on remuneration input, in a stable order.
+    
+    The null and field-constraint checks are compiled from the
+    RemunerationRecord model; the business rules follow them.
+    
+    Args:
+        columns: Input columns; checks on model fields absent from the
+            input are left out (default: every check)
+    
+    Returns:
+        Check name -> (boolean violation expression, warning template with
+        a {count} placeholder).
+    """
+    amount = pl.col("local_amount")
+    checks = compile_model(RemunerationRecord).checks(columns)
+    checks["negative_amount"] = (
+        (amount < 0) & ~pl.col("remuneration_concept").str.contains(CLAWBACK_PATTERN),
+        "{count} records have unexpected negative amounts",
+    )
+    checks["non_iso_currency"] = (
+        ~pl.col("local_currency").str.contains(ISO_CURRENCY_PATTERN),
+        "{count} records have non-standard currency codes",
+    )
+    checks["extreme_amount"] = (
+        amount.abs() > EXTREME_AMOUNT,
+        "{count} records have extreme amounts (>1B)",
+    )
+    return checks
+
+
+def missing_required_columns(lf: pl.LazyFrame) -> List[ValidationError]:
+    """Errors for required remuneration columns absent from the schema."""
+    columns = lf.collect_schema().names()
+    return [
+        ValidationError(
+            row=0, column=col, value="",
+            error=f"Required column '{col}' is missing"
+        )
+        for col in REQUIRED_REMUNERATION_COLUMNS
+        if col not in columns
+    ]
+
+
+def remuneration_validation_plan(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Lazy per-subsidiary violation counts for every remuneration check.
+    
+    All checks compile into the aggregations of a single group-by, so the
+    whole input is validated in one pass. The plan can run on its own
+    (streaming) or be collected together with the ETL plan via collect_all.
+    """
+    checks = remuneration_checks(lf.collect_schema().names())
+    return (
+        lf
+        .group_by("subsidiary_code")
+        .agg(
+            pl.len().alias("rows"),
+            *[mask.sum().alias(name) for name, (mask, _) in checks.items()],
+        )
+        .sort("subsidiary_code", nulls_last=True)
+    )
+
+
+def summarize_remuneration_validation(counts: pl.DataFrame) -> ValidationResult:
+    """Turn collected per-subsidiary violation counts into a ValidationResult."""
+    totals = counts.drop("subsidiary_code").sum().row(0, named=True)
+    warnings = [
+        template.format(count=totals[name])
+        for name, (_, template) in remuneration_checks().items()
+        if totals.get(name)
+    ]
+    return ValidationResult(
+        is_valid=True,
+        errors=[],
+        warnings=warnings,
+        rows_checked=totals["rows"] or 0,
+        by_subsidiary=counts,
+    )
+
+
+def validate_remuneration_input(
+    df: pl.DataFrame | pl.LazyFrame,
+    engine: str = "auto",
+) -> ValidationResult:
     """
-    Validate remuneration input data.
+    Validate remuneration input data over every row.
     
     Checks:
     - Required columns exist
     - No null values in key columns
-    - Amounts are numeric
-    - Currencies are valid
+    - RemunerationRecord field constraints (currency length, bonus_target_pct range)
+    - No negative amounts other than clawbacks/malus
+    - Currencies are ISO-4217 style codes (three upper-case letters)
+    - No extreme amounts (beyond +/- 1B)
     
     Args:
-        df: Input DataFrame to validate
+        df: Input DataFrame or LazyFrame to validate
+        engine: Polars engine for the aggregation ("streaming" for large scans)
         
     Returns:
-        ValidationResult with errors and warnings
+        ValidationResult with errors, warnings and per-subsidiary counts
     """
-    errors: List[ValidationError] = []
-    warnings: List[str] = []
-    
-    required_cols = [
-        "employee_id", "local_currency", "remuneration_concept", 
-        "local_amount", "subsidiary_code"
-    ]
-    
-    # Check required columns
-    missing = [c for c in required_cols if c not in df.columns]
-    if missing:
-        for col in missing:
-            errors.append(ValidationError(
-                row=0, column=col, value="", 
-                error=f"Required column '{col}' is missing"
-            ))
+    lf = df.lazy()
+    errors = missing_required_columns(lf)
+    if errors:
         return ValidationResult(
-            is_valid=False, errors=errors, warnings=warnings, 
+            is_valid=False, errors=errors, warnings=[],
             rows_checked=0
         )
     
-    # Check null values in key columns
-    null_counts = df.select([
-        pl.col(c).null_count().alias(c) for c in required_cols
-    ]).row(0, named=True)
-    
-    for col, count in null_counts.items():
-        if count > 0:
-            warnings.append(f"Column '{col}' has {count} null values")
-    
-    # Check for negative amounts (other than clawbacks)
-    negative_amounts = df.filter(
-        (pl.col("local_amount") < 0) & 
-        (~pl.col("remuneration_concept").str.contains("(?i)clawback|malus"))
-    ).height
-    
-    if negative_amounts > 0:
-        warnings.append(f"{negative_amounts} records have unexpected negative amounts")
-    
-    # Check currency format issues
-    non_standard_currencies = df.filter(
-        pl.col("local_currency").str.len_chars() != 3
-    ).height
-    
-    if non_standard_currencies > 0:
-        warnings.append(f"{non_standard_currencies} records have non-standard currency codes")
-    
-    # Check for extreme amounts (potential data errors)
-    extreme_amounts = df.filter(
-        (pl.col("local_amount") > 1e9) | (pl.col("local_amount") < -1e9)
-    ).height
-    
-    if extreme_amounts > 0:
-        warnings.append(f"{extreme_amounts} records have extreme amounts (>1B)")
-    
-    return ValidationResult(
-        is_valid=len(errors) == 0,
-        errors=errors,
-        warnings=warnings,
-        rows_checked=len(df)
-    )
+    counts = remuneration_validation_plan(lf).collect(engine=engine)
+    return summarize_remuneration_validation(counts)
 
 
 def validate_fx_rates(df: pl.DataFrame) -> ValidationResult:
-    """Validate FX rates dimension table."""
-    errors: List[ValidationError] = []
-    warnings: List[str] = []
+    """
+    Validate FX rates dimension table.
     
-    # Check required columns
-    if "currency" not in df.columns or "fx_rate_to_eur" not in df.columns:
-        errors.append(ValidationError(
-            row=0, column="", value="",
-            error="FX rates must have 'currency' and 'fx_rate_to_eur' columns"
-        ))
+    Column types, nulls and rate bounds come from the FxRate model; the EUR
+    base rate is checked on top.
+    """
+    result = validate_frame(df, FxRate)
+    if schema_errors(df.lazy(), compile_model(FxRate)):
+        return result
     
     # Check for EUR rate = 1.0
     eur_rows = df.filter(pl.col("currency") == "EUR")
     if eur_rows.height == 0:
-        warnings.append("EUR rate not found in FX rates")
+        result.warnings.append("EUR rate not found in FX rates")
     elif eur_rows["fx_rate_to_eur"][0] != 1.0:
-        warnings.append(f"EUR rate is {eur_rows['fx_rate_to_eur'][0]}, expected 1.0")
-    
-    # Check for non-positive rates
-    bad_rates = df.filter(pl.col("fx_rate_to_eur") <= 0).height
-    if bad_rates > 0:
-        errors.append(ValidationError(
-            row=0, column="fx_rate_to_eur", value="",
-            error=f"{bad_rates} currencies have non-positive FX rates"
-        ))
+        result.warnings.append(f"EUR rate is {eur_rows['fx_rate_to_eur'][0]}, expected 1.0")
     
-    return ValidationResult(
-        is_valid=len(errors) == 0,
-        errors=errors,
-        warnings=warnings,
-        rows_checked=len(df)
-    )
+    return result
@@ -0,0 +1,88 @@
+"""
+Tests for the benchmark suite.
+"""
+import json
+
+import pytest
+
+from meridiano_analysis.bench import (
+    BENCH_SIZES,
+    BenchResult,
+    build_fixture,
+    compare_runs,
+    find_run,
+    load_history,
+    parse_size,
+    record_run,
+    run_benchmarks,
+)
+
+
+def test_parse_size_accepts_labels_and_row_counts():
+    """Size labels map to their row counts; plain integers pass through."""
+    assert parse_size("1M") == ("1m", BENCH_SIZES["1m"])
+    assert parse_size("2500") == ("2500", 2500)
+    with pytest.raises(ValueError):
+        parse_size("huge")
+
+
+def test_build_fixture_sizes_and_reuses(tmp_path):
+    """Fixtures should land close to the requested size and be reused when unchanged."""
+    fixture_dir = build_fixture(5000, tmp_path / "fixture")
+    records = json.loads((fixture_dir / "fixture.json").read_text())["records"]
+    assert abs(records - 5000) / 5000 < 0.15
+    for name in (
+        "employees.parquet", "fx_rates.parquet", "fx_history.parquet",
+        "mapping.parquet", "bonus_pool.parquet",
+    ):
+        assert (fixture_dir / "dim" / name).exists()
+
+    mtime = (fixture_dir / "fixture.json").stat().st_mtime_ns
+    build_fixture(5000, fixture_dir)
+    assert (fixture_dir / "fixture.json").stat().st_mtime_ns == mtime
+
+
+def test_run_benchmarks_times_every_component(tmp_path):
+    """Every public component should be timed once per fixture size."""
+    results = run_benchmarks(sizes=["3000"], repeats=1, bench_dir=tmp_path)
+
+    names = {r.benchmark for r in results}
+    assert {
+        "generate_vectorized", "normalize_currency", "explode_concepts",
+        "enrich_with_fx", "enrich_with_fx_broadcast", "enrich_with_fx_asof",
+        "enrich_with_mapping", "enrich_with_mapping_broadcast",
+        "funding_ratio_calculate", "funding_ratio_calculate_enum",
+        "funding_ratio_calculate_hierarchy", "funding_ratio_calculate_redistribute",
+        "apply_funding_ratio", "apply_funding_ratio_enum", "apply_funding_ratio_broadcast",
+        "scenario_evaluate", "fx_risk_simulate", "bonus_cap_enforce", "validate_remuneration_input",
+        "validate_fx_rates", "export_parquet", "export_csv", "pipeline_run",
+    } == names
+    assert all(r.min_seconds <= r.median_seconds for r in results)
+
+    with pytest.raises(ValueError):
+        run_benchmarks(sizes=["3000"], repeats=1, only=["nope"], bench_dir=tmp_path)
+
+
+def test_history_records_runs_and_flags_slowdowns(tmp_path):
+    """Recorded runs should be comparable by commit, flagging only real slowdowns."""
+    history = tmp_path / "history.json"
+    base = [
+        BenchResult("explode_concepts", "1m", 1_000_000, 1.00, 1.10, 3),
+        BenchResult("enrich_with_fx", "1m", 1_000_000, 0.50, 0.55, 3),
+        BenchResult("validate_fx_rates", "1m", 1_000_000, 0.0001, 0.0001, 3),
+    ]
+    now = [
+        BenchResult("explode_concepts", "1m", 1_000_000, 1.30, 1.40, 3),
+        BenchResult("enrich_with_fx", "1m", 1_000_000, 0.52, 0.55, 3),
+        BenchResult("validate_fx_rates", "1m", 1_000_000, 0.0003, 0.0003, 3),
+    ]
+    record_run(base, history, commit="abc1234")
+    record_run(now, history, commit="def5678")
+
+    runs = load_history(history)
+    assert [r["commit"] for r in runs] == ["abc1234", "def5678"]
+
+    comparisons = compare_runs(find_run(runs, "abc"), find_run(runs, "def"), threshold=0.10)
+    regressed = {c.benchmark for c in comparisons if c.regressed}
+    # 30% slower is flagged; 4% is within threshold; +0.2ms is below the noise floor
+    assert regressed == {"explode_concepts"}
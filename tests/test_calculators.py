@@ -2,7 +2,10 @@
 Tests for calculator classes.
 """
 import polars as pl
-from meridiano_analysis.calculators import FundingRatioCalculator
+import pytest
+from datetime import date
+
+from meridiano_analysis.calculators import BonusCapCalculator, FundingRatioCalculator
 
 
 def test_funding_ratio_underfunded(sample_pool_df):
@@ -58,3 +61,290 @@ def test_funding_ratio_custom_cap(sample_pool_df):
     ratio = es["funding_ratio"][0]
     
     assert ratio == 0.8
+
+
+def _hierarchy(region_pool: float | None) -> pl.LazyFrame:
+    """GROUP -> EUROPE -> (ES, UK) -> (ES-MAD, UK-LON)."""
+    return pl.DataFrame({
+        "level": ["group", "region", "country", "country", "subsidiary", "subsidiary"],
+        "node": ["GROUP", "EUROPE", "ES", "UK", "ES-MAD", "UK-LON"],
+        "parent": [None, "GROUP", "EUROPE", "EUROPE", "ES", "UK"],
+        "pool_amount_eur": [None, region_pool, None, None, None, None],
+    }).lazy()
+
+
+def test_funding_ratio_hierarchy_rolls_up_every_level(sample_pool_df):
+    """Demand is summed at every node of the hierarchy; one row per node."""
+    demand = pl.DataFrame({
+        "subsidiary_code": ["ES-MAD", "ES-MAD", "UK-LON"],
+        "theoretical_eur": [20000.0, 10000.0, 25000.0],
+    }).lazy()
+    
+    calculator = FundingRatioCalculator(sample_pool_df.lazy(), hierarchy=_hierarchy(None))
+    result = calculator.calculate(demand).collect()
+    
+    assert result["node"].to_list() == ["GROUP", "EUROPE", "ES", "UK", "ES-MAD", "UK-LON"]
+    assert result["subsidiary_code"].to_list() == [None, None, None, None, "ES-MAD", "UK-LON"]
+    needed = dict(zip(result["node"], result["total_needed_eur"]))
+    assert needed["GROUP"] == needed["EUROPE"] == 55000.0
+    assert needed["ES"] == needed["ES-MAD"] == 30000.0
+    assert needed["UK"] == needed["UK-LON"] == 25000.0
+    # No pools above the subsidiaries: the leaf ratios apply unchanged
+    ratios = dict(zip(result["node"], result["funding_ratio"]))
+    assert ratios["ES-MAD"] == 1.0
+    assert abs(ratios["UK-LON"] - 0.4) < 1e-9
+
+
+def test_funding_ratio_hierarchy_takes_min_along_path(sample_pool_df):
+    """An underfunded region caps the ratio of every subsidiary below it."""
+    demand = pl.DataFrame({
+        "subsidiary_code": ["ES-MAD", "UK-LON"],
+        "theoretical_eur": [30000.0, 25000.0],
+    }).lazy()
+    
+    # Region pool 27500 / demand 55000 = 0.5
+    calculator = FundingRatioCalculator(sample_pool_df.lazy(), hierarchy=_hierarchy(27500.0))
+    result = calculator.calculate(demand).collect()
+    
+    ratios = calculator.ratios(result)
+    by_sub = dict(zip(ratios["subsidiary_code"], ratios["funding_ratio"]))
+    assert by_sub == {"ES-MAD": 0.5, "UK-LON": 0.4}
+    
+    node = result.filter(pl.col("node") == "ES-MAD")
+    assert node["node_ratio"][0] == 1.0
+    assert node["funding_ratio"][0] == 0.5
+
+
+def test_funding_ratio_hierarchy_keeps_pool_subsidiaries_missing_from_it(sample_pool_df):
+    """A pool subsidiary absent from the hierarchy keeps its flat ratio, not the default."""
+    demand = pl.DataFrame({
+        "subsidiary_code": ["ES-MAD", "UK-LON"],
+        "theoretical_eur": [30000.0, 25000.0],
+    }).lazy()
+    hierarchy = _hierarchy(27500.0).filter(pl.col("node") != "UK-LON")
+    
+    calculator = FundingRatioCalculator(sample_pool_df.lazy(), hierarchy=hierarchy)
+    result = calculator.calculate(demand).collect()
+    
+    by_sub = dict(calculator.ratios(result).iter_rows())
+    # ES-MAD: region pool 27500 / region demand 30000
+    assert abs(by_sub["ES-MAD"] - 27500 / 30000) < 1e-9
+    assert abs(by_sub["UK-LON"] - 0.4) < 1e-9
+    orphan = result.filter(pl.col("node") == "UK-LON")
+    assert orphan["parent"][0] is None
+    assert orphan["total_needed_eur"][0] == 25000.0
+
+
+def test_funding_ratio_ratios_without_hierarchy(sample_pool_df):
+    """Without a hierarchy, ratios() passes the calculation through."""
+    demand = pl.DataFrame({"subsidiary_code": ["ES-MAD"], "theoretical_eur": [10000.0]}).lazy()
+    calculator = FundingRatioCalculator(sample_pool_df.lazy())
+    result = calculator.calculate(demand).collect()
+    
+    assert calculator.ratios(result) is result
+
+
+def _redistribution_demand() -> pl.LazyFrame:
+    return pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C", "D"],
+        "theoretical_eur": [100.0, 100.0, 100.0, 100.0],
+    }).lazy()
+
+
+def _water_fill(surplus, limits, wanted):
+    """Reference water-filling: raise the level until the surplus or every limit is used."""
+    active = {k for k in limits if limits[k] > 0 and wanted[k] > 0}
+    received = {k: 0.0 for k in limits}
+    while active and surplus > 1e-12:
+        level = surplus / sum(wanted[k] for k in active)
+        full = {k for k in active if limits[k] - received[k] <= level * wanted[k]}
+        if not full:
+            for k in active:
+                received[k] += level * wanted[k]
+            break
+        for k in full:
+            surplus -= limits[k] - received[k]
+            received[k] = limits[k]
+        active -= full
+    return received
+
+
+def test_redistribution_proportional_to_shortfall():
+    """The surplus goes to the underfunded subsidiaries in proportion to their shortfall."""
+    pool = pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C", "D"],
+        "pool_amount_eur": [200.0, 50.0, 10.0, 100.0],
+    }).lazy()
+    
+    result = FundingRatioCalculator(pool, redistribute=True).calculate(
+        _redistribution_demand()
+    ).collect()
+    
+    assert result["subsidiary_code"].to_list() == ["A", "B", "C", "D"]
+    moved = dict(zip(result["subsidiary_code"], result["redistributed_eur"]))
+    # Surplus 100 over shortfalls 50 and 90
+    assert moved["A"] == -100.0
+    assert abs(moved["B"] - 100 * 50 / 140) < 1e-9
+    assert abs(moved["C"] - 100 * 90 / 140) < 1e-9
+    assert moved["D"] == 0.0
+    assert abs(result["redistributed_eur"].sum()) < 1e-9
+    assert result["funding_ratio"].max() <= 1.0
+
+
+def test_redistribution_matches_reference_water_filling():
+    """Weights and the receiver cap give the same allocation as iterative water-filling."""
+    pool = pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C", "D", "E"],
+        "pool_amount_eur": [160.0, 50.0, 10.0, 70.0, 300.0],
+    }).lazy()
+    demand = pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C", "D", "E"],
+        "theoretical_eur": [100.0, 100.0, 100.0, 80.0, 300.0],
+    }).lazy()
+    weights = {"C": 3.0, "D": 0.5}
+    
+    result = FundingRatioCalculator(
+        pool, redistribute=True, weights=weights, receiver_cap=0.9
+    ).calculate(demand).collect()
+    
+    rows = {r["subsidiary_code"]: r for r in result.iter_rows(named=True)}
+    limits = {
+        k: max(0.9 * r["total_needed_eur"] - r["pool_amount_eur"], 0.0) for k, r in rows.items()
+    }
+    wanted = {k: weights.get(k, 1.0) * r["shortfall_eur"] for k, r in rows.items()}
+    expected = _water_fill(60.0, limits, wanted)
+    for code in ["B", "C", "D"]:
+        assert abs(rows[code]["redistributed_eur"] - expected[code]) < 1e-9
+    assert rows["A"]["redistributed_eur"] == -60.0
+    assert rows["D"]["funding_ratio"] <= 0.9
+
+
+def test_redistribution_skips_receivers_above_receiver_cap():
+    """Subsidiaries between receiver_cap and cap neither receive nor lower the level."""
+    pool = pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C"],
+        "pool_amount_eur": [110.0, 50.0, 90.0],
+    }).lazy()
+    demand = pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C"],
+        "theoretical_eur": [100.0, 100.0, 100.0],
+    }).lazy()
+    
+    result = FundingRatioCalculator(pool, redistribute=True, receiver_cap=0.8).calculate(
+        demand
+    ).collect()
+    
+    rows = {r["subsidiary_code"]: r for r in result.iter_rows(named=True)}
+    limits = {
+        k: max(0.8 * r["total_needed_eur"] - r["pool_amount_eur"], 0.0) for k, r in rows.items()
+    }
+    wanted = {k: r["shortfall_eur"] for k, r in rows.items()}
+    expected = _water_fill(10.0, limits, wanted)
+    assert expected == {"A": 0.0, "B": 10.0, "C": 0.0}
+    for code in ["B", "C"]:
+        assert abs(rows[code]["redistributed_eur"] - expected[code]) < 1e-9
+    assert rows["A"]["redistributed_eur"] == -10.0
+    assert abs(result["redistributed_eur"].sum()) < 1e-9
+
+
+def test_redistribution_leftover_stays_with_donors():
+    """Donors only give up what the receivers can take, in proportion to their surplus."""
+    pool = pl.DataFrame({
+        "subsidiary_code": ["A", "B", "C", "D"],
+        "pool_amount_eur": [300.0, 90.0, 100.0, 200.0],
+    }).lazy()
+    
+    result = FundingRatioCalculator(pool, redistribute=True).calculate(
+        _redistribution_demand()
+    ).collect()
+    
+    moved = dict(zip(result["subsidiary_code"], result["redistributed_eur"]))
+    assert moved["B"] == 10.0
+    assert abs(moved["A"] + 10.0 * 200 / 300) < 1e-9
+    assert abs(moved["D"] + 10.0 * 100 / 300) < 1e-9
+    assert result["funding_ratio"].to_list() == [1.0, 1.0, 1.0, 1.0]
+
+
+def test_redistribution_feeds_hierarchy(sample_pool_df):
+    """With a hierarchy, the funded leaf pools are cascaded and the audit keeps the columns."""
+    demand = pl.DataFrame({
+        "subsidiary_code": ["ES-MAD", "UK-LON"],
+        "theoretical_eur": [30000.0, 25000.0],
+    }).lazy()
+    
+    calculator = FundingRatioCalculator(
+        sample_pool_df.lazy(), hierarchy=_hierarchy(27500.0), redistribute=True
+    )
+    result = calculator.calculate(demand).collect()
+    
+    leaf = result.filter(pl.col("level") == "subsidiary")
+    moved = dict(zip(leaf["node"], leaf["redistributed_eur"]))
+    assert moved == {"ES-MAD": -15000.0, "UK-LON": 15000.0}
+    # UK-LON is fully funded locally, but the region still caps both at 0.5
+    by_sub = dict(calculator.ratios(result).iter_rows())
+    assert by_sub == {"ES-MAD": 0.5, "UK-LON": 0.5}
+    assert result.filter(pl.col("level") != "subsidiary")["redistributed_eur"].null_count() == 4
+
+
+def _salaries() -> pl.LazyFrame:
+    return pl.DataFrame({
+        "employee_key": [1, 2, 3],
+        "base_salary_eur": [100000.0, 100000.0, 50000.0],
+        "is_mrt": [True, False, True],
+    }, schema_overrides={"employee_key": pl.UInt32}).lazy()
+
+
+def _payouts() -> pl.LazyFrame:
+    return pl.DataFrame({
+        "employee_key": [1, 1, 2, 3],
+        "employee_id": ["EMP00000001", "EMP00000001", "EMP00000002", "EMP00000003"],
+        "subsidiary_code": ["ES-MAD", "ES-MAD", "ES-MAD", "UK-LON"],
+        "final_payout_eur": [90000.0, 60000.0, 150000.0, 80000.0],
+    }, schema_overrides={"employee_key": pl.UInt32}).lazy()
+
+
+def test_bonus_cap_flags_mrts_over_the_ratio():
+    """Only MRTs above max_ratio x base salary breach; overrides raise the cap per subsidiary."""
+    calculator = BonusCapCalculator(_salaries(), max_ratio=1.0, ratio_overrides={"UK-LON": 2.0})
+    caps = calculator.calculate(_payouts()).collect()
+    
+    by_key = {r["employee_key"]: r for r in caps.iter_rows(named=True)}
+    assert by_key[1]["variable_ratio"] == 1.5
+    assert by_key[1]["excess_eur"] == 50000.0
+    assert by_key[2]["excess_eur"] == 0.0  # not an MRT
+    assert by_key[3]["max_ratio"] == 2.0 and by_key[3]["excess_eur"] == 0.0
+    
+    breaches = calculator.breaches(caps.lazy()).collect()
+    assert breaches["employee_id"].to_list() == ["EMP00000001"]
+    
+    everyone = BonusCapCalculator(_salaries(), mrt_only=False).calculate(_payouts()).collect()
+    assert everyone.filter(pl.col("excess_eur") > 0)["employee_key"].sort().to_list() == [1, 2, 3]
+
+
+def test_bonus_cap_enforcement_scales_every_row_of_the_employee():
+    """The excess is removed pro rata across the employee's concept rows."""
+    calculator = BonusCapCalculator(_salaries(), max_ratio=1.0)
+    caps = calculator.calculate(_payouts())
+    
+    capped = calculator.apply(_payouts(), caps).collect()
+    
+    assert capped.columns == _payouts().collect_schema().names()
+    assert capped["final_payout_eur"].to_list() == pytest.approx(
+        [60000.0, 40000.0, 150000.0, 50000.0]
+    )
+
+
+def test_bonus_cap_is_per_payment_year():
+    """Dated facts are capped per employee and payment year."""
+    payouts = _payouts().with_columns(
+        pl.Series(
+            "payment_date",
+            [date(2023, 3, 1), date(2024, 3, 1), date(2024, 3, 1), date(2024, 3, 1)],
+        )
+    )
+    calculator = BonusCapCalculator(_salaries(), max_ratio=1.0, ratio_overrides={"UK-LON": 2.0})
+    caps = calculator.calculate(payouts).collect()
+    
+    assert caps.filter(pl.col("employee_key") == 1).height == 2
+    assert caps["excess_eur"].sum() == 0.0
+    assert calculator.apply(payouts, caps).collect().equals(payouts.collect())
@@ -0,0 +1,56 @@
+"""
+Tests for concept-name resolution.
+"""
+import polars as pl
+
+from meridiano_analysis.concepts import ConceptIndex, ConceptResolver, edit_distance
+from meridiano_analysis.transformers import enrich_with_mapping
+
+
+def test_edit_distance():
+    assert edit_distance("BONUS_ANUAL_CASH", "BONU_ANUAL_CASH") == 1
+    assert edit_distance("DIFERIDO_3Y_CASH", "DEFERIDO_5Y_CASH") == 2
+    assert edit_distance("", "ABC") == 3
+
+
+def test_concept_index_match():
+    """Typos resolve to the closest concept; distant or tied names do not."""
+    index = ConceptIndex(["BONUS_ANUAL_CASH", "DIFERIDO_3Y_CASH", "DIFERIDO_5Y_CASH"])
+
+    assert index.match("BONU_ANUAL_CASH") == ("BONUS_ANUAL_CASH", 1)
+    assert index.match("DEFERIDO_3Y_CASH") == ("DIFERIDO_3Y_CASH", 1)
+    assert index.match("DIFERIDO_4Y_CASH") is None
+    assert index.match("SALARIO_BASE") is None
+
+
+def test_concept_resolver_persists_aliases(tmp_path, sample_mapping_df):
+    """Unmatched names are fuzzy-resolved once and then served from the alias table."""
+    cache_path = tmp_path / "cache" / "concept_aliases.parquet"
+    df = pl.DataFrame({
+        "remuneration_concept": [
+            "bonus anual cash Q4", "BONU_ANUAL_CASH + LTIP-PERFORMANCE", "COMISION_VENTA", "???",
+        ],
+    }).lazy()
+
+    resolver = ConceptResolver(sample_mapping_df.lazy(), cache_path)
+    mapping = resolver.resolve(df)
+
+    aliases = pl.read_parquet(cache_path)
+    assert aliases["alias"].to_list() == ["BONU_ANUAL_CASH", "COMISION_VENTA"]
+    assert aliases["concept_raw"].to_list() == ["BONUS_ANUAL_CASH", "COMISION_VENTAS"]
+    assert resolver.unmatched(df, aliases) == ["???"]
+
+    result = enrich_with_mapping(df, mapping).collect()
+    assert dict(result.iter_rows()) == {
+        "bonus anual cash Q4": "Bonus Anual",
+        "BONU_ANUAL_CASH + LTIP-PERFORMANCE": "UNMAPPED",
+        "COMISION_VENTA": "Comisiones Comerciales",
+        "???": "UNMAPPED",
+    }
+
+    exploded = pl.DataFrame({"remuneration_concept": ["BONU_ANUAL_CASH", "LTIP-PERFORMANCE"]})
+    result = enrich_with_mapping(exploded.lazy(), resolver.resolve(df)).collect()
+    assert dict(result.iter_rows()) == {
+        "BONU_ANUAL_CASH": "Bonus Anual", "LTIP-PERFORMANCE": "LTIP Performance",
+    }
+    assert pl.read_parquet(cache_path).equals(aliases)
@@ -0,0 +1,92 @@
+"""
+Tests for the prepared dimension cache.
+"""
+import polars as pl
+import pytest
+
+from meridiano_analysis.dimension_cache import DimensionCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "dim" / "fx_rates.parquet"
+    path.parent.mkdir()
+    pl.DataFrame({
+        "currency": ["USD", "EUR", "USD"],
+        "fx_rate_to_eur": [0.9, 1.0, 0.9],
+    }).write_parquet(path)
+    return path
+
+
+class CountingPrepare:
+    """Deduplicate and sort on currency, counting the calls."""
+
+    __name__ = "prepare"
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, df: pl.LazyFrame) -> pl.LazyFrame:
+        self.calls += 1
+        return df.unique("currency").sort("currency")
+
+
+def test_cache_reuses_memory_then_disk(source, tmp_path):
+    """Prepare runs once; later loads come from memory, new instances from the IPC file."""
+    prepare = CountingPrepare()
+    cache = DimensionCache(tmp_path / "cache")
+    
+    first = cache.load(source, prepare).collect()
+    second = cache.load(source, prepare).collect()
+    assert first["currency"].to_list() == ["EUR", "USD"]
+    assert second.equals(first)
+    assert prepare.calls == 1
+    assert cache.hits == {"memory": 1, "disk": 0, "miss": 1}
+    
+    other_process = DimensionCache(tmp_path / "cache")
+    assert other_process.load(source, prepare).collect().equals(first)
+    assert prepare.calls == 1
+    assert other_process.hits["disk"] == 1
+
+
+def test_cache_invalidates_on_change_and_variant(source, tmp_path):
+    """A changed source or a different variant is prepared again."""
+    prepare = CountingPrepare()
+    cache = DimensionCache(tmp_path / "cache")
+    cache.load(source, prepare)
+    
+    cache.load(source, prepare, variant="enums:abc")
+    assert prepare.calls == 2
+    
+    pl.DataFrame({"currency": ["GBP"], "fx_rate_to_eur": [1.17]}).write_parquet(source)
+    assert cache.load(source, prepare).collect()["currency"].to_list() == ["GBP"]
+    assert prepare.calls == 3
+
+
+def test_cache_evicts_least_recently_used(source, tmp_path):
+    """Both tiers keep at most max_entries entries, dropping the least recently used."""
+    prepare = CountingPrepare()
+    cache = DimensionCache(tmp_path / "cache", max_entries=2)
+    for variant in ["a", "b", "a", "c"]:
+        cache.load(source, prepare, variant=variant)
+    
+    assert len(cache.memory) == 2
+    assert len(list((tmp_path / "cache").glob("*.arrow"))) == 2
+    calls = prepare.calls
+    cache.load(source, prepare, variant="a")
+    assert prepare.calls == calls
+    cache.load(source, prepare, variant="b")
+    assert prepare.calls == calls + 1
+
+
+def test_cache_accepts_dataset_directories(tmp_path):
+    """A dimension written as a directory of part files is keyed by all its parts."""
+    dataset = tmp_path / "employees.parquet"
+    dataset.mkdir()
+    pl.DataFrame({"currency": ["EUR"]}).write_parquet(dataset / "part-0.parquet")
+    cache = DimensionCache(tmp_path / "cache")
+    prepare = CountingPrepare()
+    
+    assert cache.load(dataset, prepare).collect().height == 1
+    pl.DataFrame({"currency": ["USD"]}).write_parquet(dataset / "part-1.parquet")
+    assert cache.load(dataset, prepare).collect().height == 2
@@ -0,0 +1,61 @@
+"""
+Tests for the low-cardinality Enum dtypes.
+"""
+import polars as pl
+import pytest
+
+from meridiano_analysis.dtypes import ColumnEnums
+
+
+@pytest.fixture
+def enums(sample_fx_rates_df, sample_mapping_df, sample_pool_df) -> ColumnEnums:
+    employees = pl.LazyFrame({
+        "employee_id": ["emp1", "emp2"],
+        "subsidiary_code": ["ES-MAD", "TEST-HQ"],
+        "job_level": ["L1_AUXILIAR", "L2_GESTOR"],
+    })
+    aliases = pl.LazyFrame({"alias": ["US$"], "currency": ["USD"]})
+    return ColumnEnums.from_dimensions(
+        employees, sample_fx_rates_df.lazy(), aliases, sample_mapping_df.lazy(),
+        sample_pool_df.lazy(), unmapped_value="UNMAPPED",
+    )
+
+
+def test_enums_cover_config_and_dimensions(enums):
+    assert "TEST-HQ" in enums.subsidiary_code.categories
+    assert "JP-TOK" in enums.subsidiary_code.categories
+    assert enums.category_normalized.categories[-1] == "UNMAPPED"
+    assert enums.job_level.categories.len() == 9
+
+
+def test_cast_present_columns(enums, sample_remuneration_df):
+    df = sample_remuneration_df.with_columns(pl.Series("local_currency", ["USD", "EUR", "ZZZ"]))
+
+    result = enums.cast(df.lazy()).collect()
+
+    assert result.schema["subsidiary_code"] == enums.subsidiary_code
+    assert result.schema["remuneration_concept"] == pl.String
+    assert result["local_currency"].to_list() == ["USD", "EUR", None]
+
+    fx = enums.cast(pl.LazyFrame({"currency": ["EUR"]}), columns={"currency": "local_currency"})
+    assert fx.collect_schema()["currency"] == enums.local_currency
+
+    with pytest.raises(pl.exceptions.InvalidOperationError):
+        enums.cast(pl.LazyFrame({"subsidiary_code": ["XX-NOPE"]})).collect()
+
+
+def test_enums_append_subsidiaries_only_in_facts(
+    sample_fx_rates_df, sample_mapping_df, sample_pool_df
+):
+    employees = pl.LazyFrame({"subsidiary_code": ["ES-MAD"], "job_level": ["L1_AUXILIAR"]})
+    aliases = pl.LazyFrame({"alias": ["US$"], "currency": ["USD"]})
+    facts = pl.LazyFrame({"subsidiary_code": ["XX-NEW", "ES-MAD"]})
+    enums = ColumnEnums.from_dimensions(
+        employees, sample_fx_rates_df.lazy(), aliases, sample_mapping_df.lazy(),
+        sample_pool_df.lazy(), unmapped_value="UNMAPPED", facts=facts,
+    )
+
+    categories = enums.subsidiary_code.categories.to_list()
+    assert categories[-1] == "XX-NEW"
+    assert categories.count("ES-MAD") == 1
+    assert enums.cast(facts).collect()["subsidiary_code"].to_list() == ["XX-NEW", "ES-MAD"]
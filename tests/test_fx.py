@@ -0,0 +1,28 @@
+"""
+Tests for the FX rate history.
+"""
+from datetime import date
+
+import polars as pl
+
+from meridiano_analysis.fx import prepare_fx_history
+
+
+def test_prepare_fx_history_sorts_and_deduplicates():
+    """The last row per day wins, repeated rates are dropped and rows are date-sorted."""
+    history = pl.LazyFrame({
+        "currency": ["ARS", "ARS", "ARS", "EUR", "EUR", "ARS"],
+        "valid_from": [
+            date(2024, 1, 3), date(2024, 1, 1), date(2024, 1, 2),
+            date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 3),
+        ],
+        "fx_rate_to_eur": [0.0011, 0.0010, 0.0010, 1.0, 1.0, 0.0009],
+    })
+    
+    prepared = prepare_fx_history(history).collect()
+    
+    assert prepared.rows() == [
+        ("ARS", date(2024, 1, 1), 0.0010),
+        ("EUR", date(2024, 1, 1), 1.0),
+        ("ARS", date(2024, 1, 3), 0.0009),
+    ]
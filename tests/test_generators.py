@@ -0,0 +1,210 @@
+"""
+Tests for the data generators.
+"""
+import numpy as np
+import polars as pl
+import pytest
+
+from meridiano_analysis.generators.garbage import (
+    CURRENCY_VARIANTS,
+    apply_garbage,
+    corrupt_amount,
+    corrupt_currency,
+)
+from meridiano_analysis.generators.config import FX_RATES, PAYMENT_PERIOD_START, SUBSIDIARIES
+from meridiano_analysis.generators.dimensions import generate_fx_history, generate_pool_hierarchy
+from meridiano_analysis.generators import (
+    generate_employees,
+    generate_remuneration,
+    generate_employees_vectorized,
+    generate_remuneration_vectorized,
+    scale_subsidiaries,
+    write_dataset,
+)
+
+
+SMALL_SUBSIDIARIES = {
+    "ES-MAD": {
+        "name": "España - Madrid (HQ)", "employees": 3000, "currency": "EUR", "garbage_rate": 0.0
+    },
+    "BR-SAO": {
+        "name": "Brasil - São Paulo", "employees": 2000, "currency": "BRL", "garbage_rate": 0.0
+    },
+}
+
+
+def test_vectorized_is_seed_reproducible():
+    """Same seed should produce identical frames."""
+    emp_a = generate_employees_vectorized(seed=7, subsidiaries=SMALL_SUBSIDIARIES)
+    emp_b = generate_employees_vectorized(seed=7, subsidiaries=SMALL_SUBSIDIARIES)
+    assert emp_a.equals(emp_b)
+
+    rem_a = generate_remuneration_vectorized(emp_a, seed=8, subsidiaries=SMALL_SUBSIDIARIES)
+    rem_b = generate_remuneration_vectorized(emp_b, seed=8, subsidiaries=SMALL_SUBSIDIARIES)
+    assert rem_a.equals(rem_b)
+
+
+def test_vectorized_matches_legacy_schema(monkeypatch):
+    """Both engines should produce the same columns and dtypes."""
+    monkeypatch.setattr(
+        "meridiano_analysis.generators.employees.SUBSIDIARIES", SMALL_SUBSIDIARIES
+    )
+    monkeypatch.setattr(
+        "meridiano_analysis.generators.remuneration.SUBSIDIARIES", SMALL_SUBSIDIARIES
+    )
+
+    legacy_emp = generate_employees()
+    legacy_rem = generate_remuneration(legacy_emp)
+    vec_emp = generate_employees_vectorized(subsidiaries=SMALL_SUBSIDIARIES)
+    vec_rem = generate_remuneration_vectorized(vec_emp, subsidiaries=SMALL_SUBSIDIARIES)
+
+    assert vec_emp.schema == legacy_emp.schema
+    assert vec_rem.schema == legacy_rem.schema
+    assert vec_emp["employee_id"].to_list() == legacy_emp["employee_id"].to_list()
+
+
+def test_vectorized_matches_legacy_distribution(monkeypatch):
+    """Level mix, concepts per employee and mean salary should agree statistically."""
+    monkeypatch.setattr(
+        "meridiano_analysis.generators.employees.SUBSIDIARIES", SMALL_SUBSIDIARIES
+    )
+    monkeypatch.setattr(
+        "meridiano_analysis.generators.remuneration.SUBSIDIARIES", SMALL_SUBSIDIARIES
+    )
+
+    legacy_emp = generate_employees()
+    legacy_rem = generate_remuneration(legacy_emp)
+    vec_emp = generate_employees_vectorized(subsidiaries=SMALL_SUBSIDIARIES)
+    vec_rem = generate_remuneration_vectorized(vec_emp, subsidiaries=SMALL_SUBSIDIARIES)
+
+    def level_shares(df: pl.DataFrame) -> dict[str, float]:
+        counts = df["job_level"].value_counts(normalize=True)
+        return dict(zip(counts["job_level"], counts["proportion"]))
+
+    legacy_shares, vec_shares = level_shares(legacy_emp), level_shares(vec_emp)
+    for level, share in legacy_shares.items():
+        assert abs(vec_shares.get(level, 0.0) - share) < 0.03
+
+    legacy_ratio = legacy_rem.height / legacy_emp.height
+    vec_ratio = vec_rem.height / vec_emp.height
+    assert abs(vec_ratio - legacy_ratio) < 0.05
+
+    legacy_mean = legacy_emp["base_salary_eur"].mean()
+    vec_mean = vec_emp["base_salary_eur"].mean()
+    assert abs(vec_mean - legacy_mean) / legacy_mean < 0.1
+
+
+def test_scale_subsidiaries_multiplies_headcounts():
+    """Scale factor should multiply every headcount and leave the config untouched."""
+    scaled = scale_subsidiaries(3, SMALL_SUBSIDIARIES)
+
+    assert scaled["ES-MAD"]["employees"] == 9000
+    assert scaled["BR-SAO"]["currency"] == "BRL"
+    assert SMALL_SUBSIDIARIES["ES-MAD"]["employees"] == 3000
+
+
+def test_write_dataset_streams_chunks(tmp_path, monkeypatch):
+    """Dataset should be written as one part file per chunk with contiguous IDs."""
+    monkeypatch.setattr("meridiano_analysis.generators.dataset.SUBSIDIARIES", SMALL_SUBSIDIARIES)
+    remuneration_dir = tmp_path / "remuneration.parquet"
+    employees_dir = tmp_path / "employees.parquet"
+
+    summary = write_dataset(remuneration_dir, employees_dir, scale=2, chunk_size=2500)
+
+    # ES-MAD: 6000 -> 3 chunks, BR-SAO: 4000 -> 2 chunks
+    assert summary.parts == 5
+    assert summary.employees == 10000
+    assert len(list(remuneration_dir.glob("*.parquet"))) == 5
+
+    employees = pl.read_parquet(employees_dir)
+    assert employees.height == 10000
+    assert employees["employee_id"].n_unique() == 10000
+    assert employees["employee_id"].max() == "EMP00009999"
+    assert pl.read_parquet(remuneration_dir).height == summary.records
+
+
+def test_write_dataset_identical_for_any_worker_count(tmp_path, monkeypatch):
+    """Process-pool generation should produce exactly the in-process output."""
+    monkeypatch.setattr("meridiano_analysis.generators.dataset.SUBSIDIARIES", SMALL_SUBSIDIARIES)
+
+    serial_dir = tmp_path / "serial"
+    parallel_dir = tmp_path / "parallel"
+    write_dataset(serial_dir / "rem", serial_dir / "emp", chunk_size=1500, workers=1)
+    write_dataset(parallel_dir / "rem", parallel_dir / "emp", chunk_size=1500, workers=2)
+
+    for name in ("rem", "emp"):
+        serial = sorted(p.name for p in (serial_dir / name).iterdir())
+        assert serial == sorted(p.name for p in (parallel_dir / name).iterdir())
+        assert pl.read_parquet(serial_dir / name).equals(pl.read_parquet(parallel_dir / name))
+
+
+def test_corrupt_currency_uses_known_variants():
+    """Currencies should map to one of their variants; unknown codes stay untouched."""
+    rng = np.random.default_rng(0)
+    currency = pl.Series("local_currency", ["EUR"] * 500 + ["JPY"] * 10)
+
+    result = corrupt_currency(currency, rng)
+
+    assert set(result[:500].to_list()) <= set(CURRENCY_VARIANTS["EUR"])
+    assert result[:500].n_unique() > 1
+    assert result[500:].to_list() == ["JPY"] * 10
+
+
+def test_corrupt_amount_rate():
+    """Unchanged share should match the scalar version's corruption probabilities."""
+    rng = np.random.default_rng(0)
+    amount = np.full(20_000, 1234.56)
+
+    result = corrupt_amount(amount, rng)
+
+    unchanged = np.mean(result == amount)
+    # 0.7 untouched + 0.3 * (identity + 90% of negate + 95% of x12) / 6 = 0.8425
+    assert abs(unchanged - 0.8425) < 0.015
+
+
+def test_apply_garbage_only_touches_flagged_rows():
+    """Rows that are not flagged as garbage must be left intact."""
+    rng = np.random.default_rng(0)
+    df = pl.DataFrame({
+        "employee_id": [f"EMP{i:08d}" for i in range(100)],
+        "subsidiary_code": ["AR-BUE"] * 100,
+        "local_currency": ["EUR"] * 100,
+        "remuneration_concept": ["BONUS_ANUAL_CASH"] * 100,
+        "local_amount": [1000.0] * 100,
+    })
+    is_garbage = np.arange(100) % 10 == 0
+
+    result = apply_garbage(df, is_garbage, rng)
+
+    assert result.filter(~pl.Series(is_garbage)).equals(df.filter(~pl.Series(is_garbage)))
+    assert not result.filter(pl.Series(is_garbage)).equals(df.filter(pl.Series(is_garbage)))
+
+
+def test_generate_fx_history_daily_random_walk():
+    """One rate per currency and day, starting at the static rate; EUR stays at 1."""
+    history = generate_fx_history(days=400)
+
+    assert history.height == 400 * len(FX_RATES)
+    assert history.select(pl.struct("currency", "valid_from").is_unique().all()).item()
+    first = history.filter(pl.col("valid_from") == PAYMENT_PERIOD_START)
+    assert dict(first.select("currency", "fx_rate_to_eur").iter_rows()) == pytest.approx(FX_RATES)
+    assert history.filter(pl.col("currency") == "EUR")["fx_rate_to_eur"].unique().to_list() == [1.0]
+    ars = history.filter(pl.col("currency") == "ARS")["fx_rate_to_eur"]
+    assert ars.n_unique() == 400 and ars[-1] < ars[0]
+
+
+def test_generate_pool_hierarchy_links_every_subsidiary_to_the_group():
+    """Every subsidiary has a country, region and group above it; only the leaves lack pools."""
+    hierarchy = generate_pool_hierarchy()
+    parent = dict(hierarchy.select("node", "parent").iter_rows())
+    level = dict(hierarchy.select("node", "level").iter_rows())
+
+    leaves = hierarchy.filter(pl.col("level") == "subsidiary")
+    assert sorted(leaves["node"]) == sorted(SUBSIDIARIES)
+    assert leaves["pool_amount_eur"].null_count() == leaves.height
+    assert hierarchy.filter(pl.col("level") != "subsidiary")["pool_amount_eur"].null_count() == 0
+    for code in SUBSIDIARIES:
+        path = [code]
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        assert [level[node] for node in path] == ["subsidiary", "country", "region", "group"]
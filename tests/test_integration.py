@@ -1,12 +1,32 @@
+import json
+import shutil
+
 import pytest
 import polars as pl
+from polars.testing import assert_frame_equal
 from pathlib import Path
 from unittest.mock import patch
 
 from meridiano_analysis.generators.remuneration import generate_remuneration
 from meridiano_analysis.generators.employees import generate_employees
-from meridiano_analysis.generators.dimensions import generate_fx_rates, generate_mapping, generate_bonus_pool
+from meridiano_analysis.generators.vectorized import (
+    generate_employees_vectorized,
+    generate_remuneration_vectorized,
+)
+from meridiano_analysis.generators.dimensions import (
+    generate_fx_rates,
+    generate_fx_history,
+    generate_currency_aliases,
+    generate_mapping,
+    generate_bonus_pool,
+    generate_pool_hierarchy,
+)
+from meridiano_analysis.config import settings
+from meridiano_analysis.dimension_cache import DimensionCache
 from meridiano_analysis.pipeline import ETLPipeline
+from meridiano_analysis.incremental import IncrementalPipeline, partition_dir, partition_input
+from meridiano_analysis.scenarios import ScenarioEngine
+from meridiano_analysis.simulation import FxRiskSimulator, covariance_from_history
 from meridiano_analysis.exporters import DataExporterFactory
 
 @pytest.fixture
@@ -50,6 +70,9 @@ def test_pipeline_end_to_end(temp_data_dir):
         
         fx_rates = generate_fx_rates()
         pl.DataFrame(fx_rates).write_parquet(temp_data_dir / "dim" / "fx_rates.parquet")
+        generate_currency_aliases().write_parquet(
+            temp_data_dir / "dim" / "currency_aliases.parquet"
+        )
         
         mapping = generate_mapping()
         # Ensure our generated concepts are mapped or unmapped gracefully
@@ -62,10 +85,16 @@ def test_pipeline_end_to_end(temp_data_dir):
         pipeline = ETLPipeline(
             input_path=temp_data_dir / "input" / "remuneration.parquet",
             fx_path=temp_data_dir / "dim" / "fx_rates.parquet",
+            currency_aliases_path=temp_data_dir / "dim" / "currency_aliases.parquet",
             mapping_path=temp_data_dir / "dim" / "mapping.parquet",
             pool_path=temp_data_dir / "dim" / "bonus_pool.parquet",
             output_path=temp_data_dir / "output" / "processed.parquet",
             audit_path=temp_data_dir / "audit" / "audit.parquet",
+            quarantine_path=temp_data_dir / "output" / "quarantine.parquet",
+            concept_aliases_path=temp_data_dir / "output" / "concept_aliases.parquet",
+            fx_history_path=temp_data_dir / "dim" / "fx_history.parquet",
+            pool_hierarchy_path=temp_data_dir / "dim" / "pool_hierarchy.parquet",
+            dimension_cache=DimensionCache(temp_data_dir / "cache" / "dimensions"),
             validate=False 
         )
         
@@ -89,3 +118,640 @@ def test_pipeline_end_to_end(temp_data_dir):
         
         # Verify job_level is populated (not null)
         assert df_output.filter(pl.col("job_level").is_null()).height == 0
+        
+        # Low-cardinality columns are written as Enums
+        for col in ["subsidiary_code", "job_level", "category_normalized"]:
+            assert isinstance(df_output.schema[col], pl.Enum)
+
+
+@pytest.fixture
+def generated_data_dir(temp_data_dir):
+    """Temporary data directory populated with a small generated dataset."""
+    subsidiaries = {
+        "ES-MAD": {"name": "Test HQ", "employees": 200, "currency": "EUR", "garbage_rate": 0.0},
+        "UK-LON": {"name": "Test UK", "employees": 100, "currency": "GBP", "garbage_rate": 0.0},
+    }
+    employees_df = generate_employees_vectorized(subsidiaries=subsidiaries)
+    employees_df.write_parquet(temp_data_dir / "dim" / "employees.parquet")
+    generate_remuneration_vectorized(employees_df, subsidiaries=subsidiaries).write_parquet(
+        temp_data_dir / "input" / "remuneration.parquet"
+    )
+    generate_fx_rates().write_parquet(temp_data_dir / "dim" / "fx_rates.parquet")
+    generate_currency_aliases().write_parquet(temp_data_dir / "dim" / "currency_aliases.parquet")
+    generate_mapping().write_parquet(temp_data_dir / "dim" / "mapping.parquet")
+    generate_bonus_pool().write_parquet(temp_data_dir / "dim" / "bonus_pool.parquet")
+    return temp_data_dir
+
+
+def make_pipeline(data_dir: Path, **kwargs) -> ETLPipeline:
+    """Pipeline wired to a temporary data directory."""
+    kwargs.setdefault("dimension_cache", DimensionCache.shared(data_dir / "cache" / "dimensions"))
+    kwargs.setdefault("profile_path", data_dir / "output" / "pipeline_profile.json")
+    kwargs.setdefault("bonus_cap_path", data_dir / "output" / "bonus_cap_breaches.parquet")
+    pipeline = ETLPipeline(
+        input_path=data_dir / "input" / "remuneration.parquet",
+        fx_path=data_dir / "dim" / "fx_rates.parquet",
+        currency_aliases_path=data_dir / "dim" / "currency_aliases.parquet",
+        mapping_path=data_dir / "dim" / "mapping.parquet",
+        pool_path=data_dir / "dim" / "bonus_pool.parquet",
+        output_path=data_dir / "output" / "processed.parquet",
+        audit_path=data_dir / "audit" / "audit.parquet",
+        quarantine_path=data_dir / "output" / "quarantine.parquet",
+        concept_aliases_path=data_dir / "output" / "concept_aliases.parquet",
+        fx_history_path=data_dir / "dim" / "fx_history.parquet",
+        pool_hierarchy_path=data_dir / "dim" / "pool_hierarchy.parquet",
+        **kwargs,
+    )
+    pipeline.employees_path = data_dir / "dim" / "employees.parquet"
+    return pipeline
+
+
+def test_pipeline_shares_enriched_subplan(generated_data_dir):
+    """Output and audit should read the enriched facts from one cached subplan."""
+    pipeline = make_pipeline(generated_data_dir, validate=False)
+    df_output, pool_calc = pipeline.build_plan()
+
+    plan = pipeline.explain_plan(df_output, pool_calc)
+    assert "CACHE" in plan
+
+    output, audit = pl.collect_all([df_output, pool_calc])
+    separate_output = df_output.collect()
+    assert output.equals(separate_output)
+    assert audit.sort("subsidiary_code").equals(pool_calc.collect().sort("subsidiary_code"))
+
+
+def test_pipeline_resolves_concepts_only_when_run(generated_data_dir):
+    """Building plans has no side effects; run() resolves typos into the alias table."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    pl.read_parquet(path).with_columns(
+        pl.when(pl.int_range(pl.len()) < 3)
+        .then(pl.lit("BONU_ANUAL_CASH"))
+        .otherwise(pl.col("remuneration_concept"))
+        .alias("remuneration_concept")
+    ).write_parquet(path)
+    pipeline = make_pipeline(generated_data_dir, validate=False)
+
+    pipeline.build_plan()
+    assert not pipeline.concept_aliases_path.exists()
+
+    result = pipeline.run()
+    aliases = pl.read_parquet(pipeline.concept_aliases_path)
+    assert aliases["alias"].to_list() == ["BONU_ANUAL_CASH"]
+    output = pl.read_parquet(result.output_path)
+    typos = output.filter(pl.col("remuneration_concept") == "BONU_ANUAL_CASH")
+    assert typos.height == 3
+    assert (typos["category_normalized"] == "Bonus Anual").all()
+
+
+def test_pipeline_explain_runs(generated_data_dir):
+    """Explain mode should not change the pipeline results."""
+    result = make_pipeline(generated_data_dir, validate=False, explain=True).run()
+
+    assert result.rows_processed == pl.read_parquet(result.output_path).height
+    assert pl.read_parquet(result.audit_path).height == 20
+
+
+def test_pipeline_streaming_matches_in_memory(generated_data_dir):
+    """Streaming mode should sink the same output and audit as the in-memory run."""
+    in_memory = make_pipeline(generated_data_dir, validate=False).run()
+    expected_output = pl.read_parquet(in_memory.output_path)
+    expected_audit = pl.read_parquet(in_memory.audit_path)
+
+    streaming = make_pipeline(generated_data_dir, validate=False, streaming=True).run()
+
+    assert streaming.rows_processed == expected_output.height
+    assert_frame_equal(
+        pl.read_parquet(streaming.output_path), expected_output, check_row_order=False
+    )
+    assert_frame_equal(
+        pl.read_parquet(streaming.audit_path), expected_audit, check_row_order=False
+    )
+
+
+def test_pipeline_streaming_csv_output(generated_data_dir):
+    """Streaming mode should also sink CSV outputs."""
+    pipeline = make_pipeline(generated_data_dir, validate=False, streaming=True)
+    pipeline.output_path = generated_data_dir / "output" / "processed.csv"
+
+    result = pipeline.run()
+
+    assert pl.read_csv(result.output_path).height == result.rows_processed
+
+
+def test_pipeline_broadcast_matches_joins(generated_data_dir):
+    """Broadcast lookups of the small dimensions give the same output as joins."""
+    joined = make_pipeline(generated_data_dir, validate=False, broadcast_max_rows=0).run()
+    expected = pl.read_parquet(joined.output_path)
+
+    pipeline = make_pipeline(generated_data_dir, validate=False)
+    df_output, _ = pipeline.build_plan()
+    fx_join = 'RIGHT PLAN ON: [col("currency")]'
+    assert fx_join not in df_output.explain()
+    joined_plan, _ = make_pipeline(generated_data_dir, broadcast_max_rows=0).build_plan()
+    assert fx_join in joined_plan.explain()
+
+    result = pipeline.run()
+    assert_frame_equal(pl.read_parquet(result.output_path), expected, check_row_order=False)
+
+
+def test_pipeline_converts_at_payment_date_rates(generated_data_dir):
+    """In FX as-of mode, each record converts at the rate valid on its payment date."""
+    history = generate_fx_history()
+    history.write_parquet(generated_data_dir / "dim" / "fx_history.parquet")
+    
+    # The history alone does not switch modes
+    plain, _ = make_pipeline(generated_data_dir, validate=False).build_plan()
+    assert "ASOF JOIN" not in plain.explain()
+    
+    pipeline = make_pipeline(generated_data_dir, validate=False, fx_as_of=True)
+    df_output, _ = pipeline.build_plan()
+    assert "ASOF JOIN" in df_output.explain()
+    
+    result = pipeline.run()
+    output = pl.read_parquet(result.output_path)
+    assert output.height == result.rows_processed
+    
+    # Re-derive the EUR amounts per employee from the raw facts and the daily rates
+    expected = (
+        pl.read_parquet(generated_data_dir / "input" / "remuneration.parquet")
+        .join(
+            history.rename({"currency": "local_currency", "valid_from": "payment_date"}),
+            on=["local_currency", "payment_date"],
+        )
+        .group_by("employee_id")
+        .agg((pl.col("local_amount") * pl.col("fx_rate_to_eur")).sum().alias("expected"))
+    )
+    checked = (
+        output.group_by("employee_id").agg(pl.col("theoretical_eur").sum())
+        .join(expected, on="employee_id")
+    )
+    assert checked.height == expected.height
+    assert (checked["theoretical_eur"] - checked["expected"]).abs().max() < 1e-6
+    assert list(pipeline.dimension_cache.cache_dir.glob("fx_history-*.arrow"))
+    
+    streaming = make_pipeline(
+        generated_data_dir, validate=False, streaming=True, fx_as_of=True
+    ).run()
+    assert_frame_equal(
+        pl.read_parquet(streaming.output_path), output, check_row_order=False
+    )
+    
+    (generated_data_dir / "dim" / "fx_history.parquet").unlink()
+    with pytest.raises(FileNotFoundError, match="FX as-of"):
+        make_pipeline(generated_data_dir, validate=False, fx_as_of=True).build_plan()
+
+
+def test_pipeline_reuses_prepared_dimensions(generated_data_dir):
+    """A second run (same process or a fresh cache on the same directory) prepares nothing."""
+    first = make_pipeline(generated_data_dir, validate=False)
+    expected = pl.read_parquet(first.run().output_path)
+    cache = first.dimension_cache
+    prepared = cache.hits["miss"]
+    assert prepared > 0
+    
+    make_pipeline(generated_data_dir, validate=False).run()
+    assert cache.hits["miss"] == prepared
+    assert cache.hits["memory"] > 0
+    
+    fresh = DimensionCache(cache.cache_dir)
+    result = make_pipeline(generated_data_dir, validate=False, dimension_cache=fresh).run()
+    assert fresh.hits["miss"] == 0 and fresh.hits["disk"] > 0
+    assert_frame_equal(pl.read_parquet(result.output_path), expected, check_row_order=False)
+
+
+def test_pipeline_cascades_pool_hierarchy(generated_data_dir):
+    """With a pool hierarchy, the audit has one row per node and facts get the path minimum."""
+    hierarchy = generate_pool_hierarchy()
+    hierarchy.write_parquet(generated_data_dir / "dim" / "pool_hierarchy.parquet")
+
+    result = make_pipeline(generated_data_dir, validate=True).run()
+    audit = pl.read_parquet(result.audit_path)
+    output = pl.read_parquet(result.output_path)
+
+    assert audit.height == hierarchy.height
+    assert_frame_equal(
+        audit.select("level", "node"), hierarchy.select("level", "node"), check_row_order=False
+    )
+    group = audit.filter(pl.col("level") == "group")
+    assert group["total_needed_eur"][0] == pytest.approx(output["theoretical_eur"].sum())
+
+    leaf = dict(
+        audit.filter(pl.col("level") == "subsidiary").select("node", "funding_ratio").iter_rows()
+    )
+    applied = output.select(pl.col("subsidiary_code").cast(pl.String), "funding_ratio").unique()
+    assert all(ratio == pytest.approx(leaf[code]) for code, ratio in applied.iter_rows())
+    assert (audit["funding_ratio"] <= audit["node_ratio"] + 1e-12).all()
+    # The leaf rows keep the flat audit's subsidiary_code for the dashboard
+    assert audit.filter(pl.col("subsidiary_code").is_not_null())["node"].to_list() == list(leaf)
+
+    with pytest.raises(ValueError, match="hierarchy"):
+        make_incremental(generated_data_dir).run()
+
+
+def test_pipeline_redistributes_surplus(generated_data_dir):
+    """Redistribution moves pool between subsidiaries without creating or losing any."""
+    pool_path = generated_data_dir / "dim" / "bonus_pool.parquet"
+    pl.read_parquet(pool_path).with_columns(
+        pl.when(pl.col("subsidiary_code") == "UK-LON")
+        .then(pl.col("pool_amount_eur") * 0.001)
+        .otherwise(pl.col("pool_amount_eur"))
+        .alias("pool_amount_eur")
+    ).write_parquet(pool_path)
+    base = make_pipeline(generated_data_dir, validate=False).run()
+    base_audit = pl.read_parquet(base.audit_path)
+    base_paid = pl.read_parquet(base.output_path)["final_payout_eur"].sum()
+
+    result = make_pipeline(generated_data_dir, validate=False, redistribute_surplus=True).run()
+    audit = pl.read_parquet(result.audit_path)
+    output = pl.read_parquet(result.output_path)
+
+    redistribution_columns = {
+        "surplus_eur", "shortfall_eur", "redistributed_eur", "funded_pool_eur"
+    }
+    assert redistribution_columns <= set(audit.columns)
+    assert audit["redistributed_eur"].max() > 0
+    assert audit["redistributed_eur"].sum() == pytest.approx(0.0, abs=1e-6)
+    assert audit["funded_pool_eur"].sum() == pytest.approx(audit["pool_amount_eur"].sum())
+    ratios = dict(zip(base_audit["subsidiary_code"], base_audit["funding_ratio"]))
+    assert all(
+        r >= ratios[code] - 1e-12
+        for code, r in audit.select("subsidiary_code", "funding_ratio").iter_rows()
+    )
+    assert output["final_payout_eur"].sum() >= base_paid
+
+    with pytest.raises(ValueError, match="redistribution"):
+        incremental = make_incremental(generated_data_dir)
+        incremental.pipeline.redistribute_surplus = True
+        incremental.run()
+
+
+def test_scenarios_baseline_matches_pipeline(generated_data_dir):
+    """The baseline scenario reproduces the run; detail is only built on request."""
+    result = make_pipeline(generated_data_dir, validate=False).run()
+    audit = pl.read_parquet(result.audit_path)
+    output = pl.read_parquet(result.output_path)
+
+    engine = ScenarioEngine.from_pipeline(make_pipeline(generated_data_dir, validate=False))
+    scenarios = pl.DataFrame({
+        "scenario": ["base"] + [f"uk-{i}" for i in range(1000)],
+        "kind": ["pool"] * 1001,
+        "key": ["UK-LON"] * 1001,
+        "factor": [1.0] + [0.5 + i / 1000 for i in range(1000)],
+    })
+    evaluated = engine.evaluate(scenarios)
+    totals = ScenarioEngine.totals(evaluated)
+
+    assert totals.height == 1001
+    base = evaluated.filter(pl.col("scenario") == "base").join(
+        audit.select(pl.col("subsidiary_code").cast(pl.String), "funding_ratio"),
+        on="subsidiary_code",
+    )
+    assert (base["funding_ratio"] - base["funding_ratio_right"]).abs().max() < 1e-12
+    assert totals["payout_eur"][0] == pytest.approx(output["final_payout_eur"].sum())
+
+    detail = engine.payout_detail(scenarios, "base").collect()
+    assert_frame_equal(detail, output, check_row_order=False)
+
+    generate_pool_hierarchy().write_parquet(generated_data_dir / "dim" / "pool_hierarchy.parquet")
+    with pytest.raises(ValueError, match="hierarchy"):
+        ScenarioEngine.from_pipeline(make_pipeline(generated_data_dir, validate=False))
+
+
+def test_fx_risk_simulation_over_pipeline_demand(generated_data_dir):
+    """The simulation brackets the run's total payout, from one aggregation of the facts."""
+    output = pl.read_parquet(make_pipeline(generated_data_dir, validate=False).run().output_path)
+    engine = ScenarioEngine.from_pipeline(make_pipeline(generated_data_dir, validate=False))
+    covariance = covariance_from_history(generate_fx_history(), horizon_days=90)
+
+    result = FxRiskSimulator.from_engine(engine).simulate(covariance, draws=2000)
+
+    assert set(covariance["currency"]) >= {"GBP"}
+    low, mid, high = result.totals["total_payout_eur"].to_list()
+    assert low <= output["final_payout_eur"].sum() * 1.0001
+    assert low < high
+    assert set(result.bands["subsidiary_code"]) >= {"ES-MAD", "UK-LON"}
+
+
+def test_pipeline_enforces_bonus_cap(generated_data_dir):
+    """Every mode removes exactly the reported excess, and agrees on the capped output."""
+    plain = pl.read_parquet(make_pipeline(generated_data_dir, validate=False).run().output_path)
+
+    with patch.object(settings, "BONUS_CAP_RATIO", 0.2):
+        checked = make_pipeline(generated_data_dir, validate=False, bonus_cap=True).run()
+        breaches = pl.read_parquet(checked.bonus_cap_path)
+        assert checked.rows_over_bonus_cap == breaches.height > 0
+        assert breaches["is_mrt"].all()
+        assert (breaches["variable_ratio"] > 0.2).all()
+        assert_frame_equal(pl.read_parquet(checked.output_path), plain, check_row_order=False)
+
+        capped = {}
+        for mode in ["fused", "streaming", "profile"]:
+            result = make_pipeline(
+                generated_data_dir,
+                validate=True,
+                enforce_bonus_cap=True,
+                streaming=mode == "streaming",
+                profile=mode == "profile",
+            ).run()
+            capped[mode] = pl.read_parquet(result.output_path)
+            assert result.rows_over_bonus_cap == breaches.height
+
+    output = capped["fused"]
+    assert output.height == plain.height
+    assert output["final_payout_eur"].sum() == pytest.approx(
+        plain["final_payout_eur"].sum() - breaches["excess_eur"].sum()
+    )
+    for mode in ["streaming", "profile"]:
+        assert_frame_equal(capped[mode], output, check_row_order=False)
+
+
+def test_pipeline_profile_reports_every_stage(generated_data_dir):
+    """Profile mode should match the fused run and write per-stage metrics."""
+    expected = pl.read_parquet(make_pipeline(generated_data_dir, validate=False).run().output_path)
+
+    profile_path = generated_data_dir / "output" / "profile.json"
+    result = make_pipeline(
+        generated_data_dir, validate=False, profile=True, profile_path=profile_path
+    ).run()
+
+    stages = [m.stage for m in result.stage_metrics]
+    assert stages == [
+        "load", "currency", "quarantine", "employee_join", "explode", "fx", "mapping",
+        "funding_calc", "apply", "export",
+    ]
+    by_stage = {m.stage: m for m in result.stage_metrics}
+    assert by_stage["explode"].rows_out >= by_stage["explode"].rows_in
+    assert by_stage["funding_calc"].rows_out == 20
+    assert result.rows_processed == expected.height
+    assert_frame_equal(pl.read_parquet(result.output_path), expected, check_row_order=False)
+
+    report = json.loads(profile_path.read_text())
+    assert [s["stage"] for s in report["stages"]] == stages
+    peaks = [m.process_peak_rss_mb for m in result.stage_metrics]
+    if peaks[0] is not None:
+        assert peaks == sorted(peaks)
+        assert all(m.rss_growth_mb >= 0 for m in result.stage_metrics)
+        assert sum(m.rss_growth_mb for m in result.stage_metrics) <= peaks[-1]
+
+
+def test_pipeline_validates_full_input(generated_data_dir):
+    """Fused and streaming validation should both see issues anywhere in the input."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    df = pl.read_parquet(path)
+    # Corrupt only the last rows, well past any head sample, with a code no
+    # currency alias resolves
+    df = df.with_columns(
+        pl.when(pl.int_range(pl.len()) >= pl.len() - 5)
+        .then(pl.lit("us1"))
+        .otherwise(pl.col("local_currency"))
+        .alias("local_currency")
+    )
+    df.write_parquet(path)
+    last_sub = df["subsidiary_code"][-1]
+
+    fused = make_pipeline(generated_data_dir).run()
+    streaming = make_pipeline(generated_data_dir, streaming=True).run()
+
+    assert "5 records have non-standard currency codes" in fused.validation_warnings
+    assert fused.validation_warnings == streaming.validation_warnings
+    counts = fused.validation_by_subsidiary.filter(pl.col("subsidiary_code") == last_sub)
+    assert counts["non_iso_currency"].item() == 5
+
+
+def test_pipeline_validation_rejects_missing_columns(generated_data_dir):
+    """A missing required column should fail before anything is exported."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    pl.read_parquet(path).drop("local_currency").write_parquet(path)
+
+    pipeline = make_pipeline(generated_data_dir)
+    with pytest.raises(ValueError, match="validation failed"):
+        pipeline.run()
+    assert not pipeline.output_path.exists()
+
+
+def test_pipeline_quarantines_invalid_rows(generated_data_dir):
+    """Invalid rows go to the quarantine file instead of the processed output."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    df = pl.read_parquet(path).with_columns(
+        pl.when(pl.int_range(pl.len()) < 3)
+        .then(pl.lit(5e9))
+        .otherwise(pl.col("local_amount"))
+        .alias("local_amount")
+    )
+    df.write_parquet(path)
+    bad_ids = df["employee_id"][:3].to_list()
+
+    result = make_pipeline(generated_data_dir, validate=False).run()
+    streaming = make_pipeline(generated_data_dir, validate=False, streaming=True).run()
+
+    quarantine = pl.read_parquet(result.quarantine_path)
+    assert result.rows_quarantined == streaming.rows_quarantined == quarantine.height >= 3
+    assert set(bad_ids) <= set(quarantine["employee_id"])
+    assert quarantine.filter(pl.col("employee_id").is_in(bad_ids))[
+        "reject_reasons"
+    ].str.contains("extreme_amount").all()
+    assert pl.read_parquet(result.output_path)["theoretical_eur"].abs().max() < 1e9
+
+    unquarantined = make_pipeline(generated_data_dir, validate=False, quarantine=False).run()
+    assert unquarantined.rows_quarantined == 0
+    assert unquarantined.rows_processed > result.rows_processed
+
+
+def test_pipeline_normalizes_currency_aliases(generated_data_dir):
+    """Currency spellings resolve before the FX join; unknown codes are counted."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    df = pl.read_parquet(path).with_columns(
+        pl.when(pl.col("local_currency") == "GBP").then(pl.lit(" £"))
+        .when(pl.int_range(pl.len()) < 4).then(pl.lit("Euro"))
+        .when(pl.int_range(pl.len()) < 6).then(pl.lit("zz$"))
+        .otherwise(pl.col("local_currency"))
+        .alias("local_currency")
+    )
+    df.write_parquet(path)
+
+    result = make_pipeline(generated_data_dir, validate=False).run()
+    streaming = make_pipeline(generated_data_dir, validate=False, streaming=True).run()
+
+    output = pl.read_parquet(result.output_path)
+    assert output["theoretical_eur"].null_count() == 0
+    assert output.filter(pl.col("subsidiary_code") == "UK-LON").height > 0
+    assert result.rows_unresolved_currency == streaming.rows_unresolved_currency == 2
+    quarantine = pl.read_parquet(result.quarantine_path)
+    assert quarantine.filter(pl.col("local_currency") == "ZZ$").height == 2
+
+    # Validation checks the same normalized currencies quarantine does
+    validated = make_pipeline(generated_data_dir, streaming=True).run()
+    non_iso = quarantine.filter(pl.col("reject_reasons").str.contains("non_iso_currency"))
+    assert validated.validation_by_subsidiary["non_iso_currency"].sum() == non_iso.height
+
+
+def test_pipeline_pays_unknown_subsidiaries_at_default_ratio(generated_data_dir):
+    """A subsidiary missing from config and dimensions keeps its code and the default ratio."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    df = pl.read_parquet(path).with_columns(
+        pl.when(pl.int_range(pl.len()) < 5)
+        .then(pl.lit("XX-NEW"))
+        .otherwise(pl.col("subsidiary_code"))
+        .alias("subsidiary_code")
+    )
+    df.write_parquet(path)
+
+    result = make_pipeline(generated_data_dir, validate=False, quarantine=False).run()
+    streaming = make_pipeline(
+        generated_data_dir, validate=False, quarantine=False, streaming=True
+    ).run()
+
+    output = pl.read_parquet(result.output_path)
+    assert result.rows_processed == streaming.rows_processed == output.height
+    assert output["subsidiary_code"].null_count() == 0
+    unknown = output.filter(pl.col("subsidiary_code") == "XX-NEW")
+    assert unknown.height >= 5
+    assert (unknown["funding_ratio"] == settings.DEFAULT_FUNDING_RATIO).all()
+    assert_frame_equal(
+        pl.read_parquet(streaming.output_path), output, check_row_order=False
+    )
+
+
+def test_pipeline_canonicalizes_employee_ids(generated_data_dir):
+    """Garbled legacy employee IDs still get their job level from the master."""
+    path = generated_data_dir / "input" / "remuneration.parquet"
+    df = pl.read_parquet(path).with_columns(
+        pl.when(pl.int_range(pl.len()) % 3 == 0)
+        .then(pl.lit("MX-") + pl.col("employee_id"))
+        .otherwise(pl.col("employee_id"))
+        .alias("employee_id"),
+        pl.when(pl.int_range(pl.len()) % 3 == 0)
+        .then(pl.lit("MX-MEX"))
+        .otherwise(pl.col("subsidiary_code"))
+        .alias("subsidiary_code"),
+    )
+    df.write_parquet(path)
+
+    result = make_pipeline(generated_data_dir, validate=False).run()
+
+    output = pl.read_parquet(result.output_path)
+    assert output["job_level"].null_count() == 0
+    assert output["employee_id"].str.contains(r"^EMP\d{8}$").all()
+    assert result.employee_match_rate == 1.0
+    assert result.employee_match_rate_raw < 0.7
+
+
+def test_pipeline_rejects_invalid_dimensions(generated_data_dir):
+    """Dimension tables are checked against their Pydantic schemas."""
+    path = generated_data_dir / "dim" / "bonus_pool.parquet"
+    pool = pl.read_parquet(path)
+    pool.with_columns(pl.col("pool_amount_eur") * -1).write_parquet(path)
+
+    with pytest.raises(ValueError, match="validation failed"):
+        make_pipeline(generated_data_dir).run()
+
+
+def make_incremental(data_dir: Path) -> IncrementalPipeline:
+    """Incremental pipeline over a partitioned copy of the generated input."""
+    partition_input(
+        data_dir / "input" / "remuneration.parquet",
+        data_dir / "input" / "by_subsidiary",
+    )
+    return IncrementalPipeline(
+        pipeline=make_pipeline(data_dir, validate=False),
+        input_dir=data_dir / "input" / "by_subsidiary",
+        output_dir=data_dir / "output" / "by_subsidiary",
+        audit_dir=data_dir / "output" / "audit_by_subsidiary",
+        quarantine_dir=data_dir / "output" / "quarantine_by_subsidiary",
+        manifest_path=data_dir / "output" / "manifest.json",
+    )
+
+
+def test_incremental_matches_full_run_and_reuses(generated_data_dir):
+    """First run processes every partition, the next run reuses them all."""
+    full = pl.read_parquet(make_pipeline(generated_data_dir, validate=False).run().output_path)
+    incremental = make_incremental(generated_data_dir)
+
+    first = incremental.run()
+    assert sorted(first.partitions_processed) == ["ES-MAD", "UK-LON"]
+    assert_frame_equal(
+        pl.read_parquet(first.output_path), full, check_row_order=False, check_column_order=False
+    )
+
+    # The partitions are merged into the pipeline's output for the dashboard
+    assert_frame_equal(
+        pl.read_parquet(incremental.pipeline.output_path),
+        pl.read_parquet(first.output_path),
+        check_row_order=False,
+    )
+
+    second = incremental.run()
+    assert second.partitions_processed == []
+    assert sorted(second.partitions_reused) == ["ES-MAD", "UK-LON"]
+    assert second.rows_processed == 0
+
+    with patch.object(settings, "FUNDING_RATIO_CAP", 0.9):
+        third = incremental.run()
+    assert sorted(third.partitions_processed) == ["ES-MAD", "UK-LON"]
+
+
+def test_incremental_rejects_rows_outside_their_partition(generated_data_dir):
+    """Rows whose subsidiary_code does not match their partition fail the run loudly."""
+    incremental = make_incremental(generated_data_dir)
+    part = incremental.input_dir / "subsidiary_code=UK-LON" / "part-00000.parquet"
+    pl.read_parquet(part).with_columns(pl.lit("ES-MAD").alias("subsidiary_code")).write_parquet(
+        part
+    )
+
+    with pytest.raises(ValueError, match="must match the partition directory"):
+        incremental.run()
+
+
+def test_incremental_reprocesses_only_changed_partition(generated_data_dir):
+    """A resubmitted subsidiary is re-run on its own and gets fresh demand figures."""
+    incremental = make_incremental(generated_data_dir)
+    incremental.run()
+    audit_before = pl.read_parquet(incremental.pipeline.audit_path)
+
+    part = incremental.input_dir / "subsidiary_code=UK-LON" / "part-00000.parquet"
+    pl.read_parquet(part).with_columns(pl.col("local_amount") * 2).write_parquet(part)
+
+    result = incremental.run()
+    assert result.partitions_processed == ["UK-LON"]
+    assert result.partitions_reused == ["ES-MAD"]
+
+    audit_after = pl.read_parquet(result.audit_path)
+
+    def needed(df: pl.DataFrame, code: str) -> float:
+        return df.filter(pl.col("subsidiary_code") == code)["total_needed_eur"][0]
+
+    assert needed(audit_after, "ES-MAD") == needed(audit_before, "ES-MAD")
+    assert abs(needed(audit_after, "UK-LON") - 2 * needed(audit_before, "UK-LON")) < 1e-3
+
+
+def test_incremental_new_subsidiary_rebuilds_with_shared_enums(generated_data_dir):
+    """A partition of an unknown subsidiary keeps its code; every partition shares the Enums."""
+    incremental = make_incremental(generated_data_dir)
+    incremental.run()
+
+    source = incremental.input_dir / "subsidiary_code=UK-LON" / "part-00000.parquet"
+    target = partition_dir(incremental.input_dir, "XX-NEW")
+    target.mkdir()
+    pl.read_parquet(source).with_columns(pl.lit("XX-NEW").alias("subsidiary_code")).write_parquet(
+        target / "part-00000.parquet"
+    )
+
+    result = incremental.run()
+    assert sorted(result.partitions_processed) == ["ES-MAD", "UK-LON", "XX-NEW"]
+    output = pl.read_parquet(result.output_path)
+    new = output.filter(pl.col("subsidiary_code") == "XX-NEW")
+    assert new.height > 0
+    assert (new["funding_ratio"] == settings.DEFAULT_FUNDING_RATIO).all()
+
+
+def test_incremental_drops_removed_partition(generated_data_dir):
+    """Deleting an input partition should delete its output partition."""
+    incremental = make_incremental(generated_data_dir)
+    incremental.run()
+
+    shutil.rmtree(incremental.input_dir / "subsidiary_code=UK-LON")
+    result = incremental.run()
+
+    assert result.partitions_removed == ["UK-LON"]
+    assert not (incremental.output_dir / "subsidiary_code=UK-LON").exists()
+    assert pl.read_parquet(result.audit_path)["subsidiary_code"].to_list() == ["ES-MAD"]
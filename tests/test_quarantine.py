@@ -0,0 +1,49 @@
+"""
+Tests for the row-level quarantine.
+"""
+import polars as pl
+
+from meridiano_analysis.quarantine import (
+    FLAGS_COLUMN,
+    REASONS_COLUMN,
+    decode_flags,
+    rule_bits,
+    split_quarantine,
+)
+
+
+def test_split_quarantine_tags_and_splits(sample_remuneration_df):
+    """Clean rows keep the input schema; rejected rows carry flags and reasons."""
+    df = sample_remuneration_df.with_columns(
+        pl.Series("local_currency", ["USD", "eur", "GBP"]),
+        pl.Series("local_amount", [10000.0, -20000.0, 2e9]),
+    )
+    
+    clean, rejected = pl.collect_all(split_quarantine(df.lazy()))
+    
+    assert clean.columns == df.columns
+    assert clean["employee_id"].to_list() == ["emp1"]
+    
+    bits = rule_bits()
+    flags = dict(zip(rejected["employee_id"], rejected[FLAGS_COLUMN]))
+    assert flags["emp2"] == bits["negative_amount"] | bits["non_iso_currency"]
+    assert flags["emp3"] == bits["extreme_amount"]
+    reasons = dict(zip(rejected["employee_id"], rejected[REASONS_COLUMN]))
+    assert reasons["emp2"] == "negative_amount,non_iso_currency"
+    assert decode_flags(flags["emp2"]) == ["negative_amount", "non_iso_currency"]
+
+
+def test_split_quarantine_keeps_clawbacks_and_flags_nulls():
+    """Negative clawbacks are valid; null keys are rejected."""
+    df = pl.LazyFrame({
+        "employee_id": ["emp1", None],
+        "local_currency": ["EUR", "EUR"],
+        "remuneration_concept": ["CLAWBACK_BONUS", "BONUS"],
+        "local_amount": [-500.0, 100.0],
+        "subsidiary_code": ["ES-MAD", "ES-MAD"],
+    })
+    
+    clean, rejected = pl.collect_all(split_quarantine(df))
+    
+    assert clean.height == 1
+    assert rejected[REASONS_COLUMN].to_list() == ["null_employee_id"]
@@ -0,0 +1,102 @@
+"""
+Tests for the what-if scenario engine.
+"""
+import polars as pl
+import pytest
+
+from meridiano_analysis.scenarios import ScenarioEngine
+
+
+@pytest.fixture
+def engine(sample_pool_df) -> ScenarioEngine:
+    """Engine over a few enriched facts: ES-MAD in EUR, UK-LON in GBP."""
+    facts = pl.DataFrame({
+        "employee_id": ["E1", "E1", "E2", "E3"],
+        "subsidiary_code": ["ES-MAD", "ES-MAD", "UK-LON", "UK-LON"],
+        "job_level": ["L1", "L1", "L2", "L2"],
+        "remuneration_concept": ["BONUS", "LTIP", "BONUS", "BONUS"],
+        "category_normalized": ["Bonus", "LTIP", "Bonus", "Bonus"],
+        "local_currency": ["EUR", "EUR", "GBP", "GBP"],
+        "fx_rate_to_eur": [1.0, 1.0, 1.2, 1.2],
+        "theoretical_eur": [30000.0, 10000.0, 12000.0, 8000.0],
+    }).lazy()
+    return ScenarioEngine(facts, sample_pool_df.lazy())
+
+
+def shocks(*rows: tuple[str, str, str, float]) -> pl.DataFrame:
+    """Scenario frame from (scenario, kind, key, factor) rows."""
+    return pl.DataFrame(rows, schema=["scenario", "kind", "key", "factor"], orient="row")
+
+
+def test_evaluate_all_scenarios_in_one_frame(engine):
+    """Pool and FX shocks apply per scenario; unshocked keys keep factor 1."""
+    result = engine.evaluate(shocks(
+        ("base", "pool", "ES-MAD", 1.0),
+        ("uk-pool-x2", "pool", "UK-LON", 2.0),
+        ("gbp+25", "fx", "GBP", 1.25),
+    ))
+    
+    assert result["scenario"].to_list() == ["base"] * 2 + ["uk-pool-x2"] * 2 + ["gbp+25"] * 2
+    uk = {
+        r["scenario"]: r
+        for r in result.filter(pl.col("subsidiary_code") == "UK-LON").iter_rows(named=True)
+    }
+    assert uk["base"]["funding_ratio"] == 0.5
+    assert uk["uk-pool-x2"]["funding_ratio"] == 1.0
+    assert uk["gbp+25"]["total_needed_eur"] == 25000.0
+    assert uk["gbp+25"]["funding_ratio"] == 0.4
+    assert uk["gbp+25"]["payout_eur"] == 10000.0
+    
+    totals = ScenarioEngine.totals(result)
+    assert totals["payout_eur"].to_list() == [50000.0, 60000.0, 50000.0]
+    assert totals["underfunded_subsidiaries"].to_list() == [1, 0, 1]
+
+
+def test_evaluate_reuses_cached_demand(engine):
+    """Demand is aggregated once per engine, whatever the number of evaluations."""
+    demand = engine.demand
+    engine.evaluate(shocks(("a", "pool", "ES-MAD", 0.5)))
+    engine.evaluate(shocks(("b", "fx", "GBP", 0.9)))
+    
+    assert engine.demand is demand
+    assert demand.height == 3
+
+
+def test_shocks_of_same_key_multiply(engine):
+    """Repeated shocks of one key compound."""
+    result = engine.evaluate(shocks(
+        ("cut", "pool", "ES-MAD", 0.5),
+        ("cut", "pool", "ES-MAD", 0.5),
+    ))
+    
+    es = result.filter(pl.col("subsidiary_code") == "ES-MAD")
+    assert es["pool_amount_eur"][0] == 12500.0
+
+
+def test_evaluate_rejects_invalid_shocks(engine):
+    """Unknown kinds, unknown keys and negative factors are errors, not no-ops."""
+    with pytest.raises(ValueError, match="kinds"):
+        engine.evaluate(shocks(("x", "tax", "ES-MAD", 1.0)))
+    with pytest.raises(ValueError, match="pool scenario keys"):
+        engine.evaluate(shocks(("x", "pool", "XX-NOP", 1.0)))
+    with pytest.raises(ValueError, match="fx scenario keys"):
+        engine.evaluate(shocks(("x", "fx", "BRl", 1.0)))
+    with pytest.raises(ValueError, match=">= 0"):
+        engine.evaluate(shocks(("x", "fx", "GBP", -1.0)))
+
+
+def test_payout_detail_matches_totals(engine):
+    """Per-fact payouts of a scenario add up to its evaluated payout."""
+    scenarios = shocks(("gbp+25", "fx", "GBP", 1.25), ("es-cut", "pool", "ES-MAD", 0.5))
+    totals = ScenarioEngine.totals(engine.evaluate(scenarios))
+    
+    detail = engine.payout_detail(scenarios, "gbp+25").collect()
+    
+    assert detail.height == 4
+    uk = detail.filter(pl.col("subsidiary_code") == "UK-LON")
+    assert uk["theoretical_eur"].to_list() == [15000.0, 10000.0]
+    assert detail["final_payout_eur"].sum() == pytest.approx(
+        totals.filter(pl.col("scenario") == "gbp+25")["payout_eur"][0]
+    )
+    with pytest.raises(ValueError, match="Unknown scenario"):
+        engine.payout_detail(scenarios, "nope")
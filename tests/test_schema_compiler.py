@@ -0,0 +1,90 @@
+"""
+Tests for the Pydantic schema compiler.
+"""
+from typing import Optional
+
+import polars as pl
+import pytest
+from pydantic import BaseModel, Field
+
+from meridiano_analysis.schema_compiler import compile_model, polars_dtype, validate_frame
+from meridiano_analysis.schemas import BonusPool, FxRate, ProcessedRecord
+
+
+def test_compile_model_schema_and_checks():
+    """Dtypes, nullability and constraints are read from the model fields."""
+    compiled = compile_model(FxRate)
+    
+    assert compiled.schema == pl.Schema({"currency": pl.String, "fx_rate_to_eur": pl.Float64})
+    assert list(compiled.checks()) == [
+        "null_currency", "null_fx_rate_to_eur",
+        "currency_min_length", "currency_max_length", "fx_rate_to_eur_gt",
+    ]
+
+
+def test_polars_dtype_handles_optional():
+    """Optional fields map to their inner dtype and are nullable."""
+    assert polars_dtype(Optional[float]) == (pl.Float64(), True)
+    assert polars_dtype(int | None) == (pl.Int64(), True)
+    assert polars_dtype(str) == (pl.String(), False)
+    with pytest.raises(TypeError):
+        polars_dtype(list)
+
+
+def test_compiled_checks_match_pydantic():
+    """Vectorized checks flag exactly the rows Pydantic rejects."""
+    class Record(BaseModel):
+        code: str = Field(min_length=2, max_length=3, pattern="^[A-Z]+$")
+        ratio: float = Field(ge=0, lt=1)
+        note: Optional[str] = None
+    
+    rows = [
+        {"code": "AB", "ratio": 0.5, "note": None},
+        {"code": "A", "ratio": 0.5, "note": "x"},
+        {"code": "ABCD", "ratio": 0.0, "note": None},
+        {"code": "ab", "ratio": 0.5, "note": None},
+        {"code": "ABC", "ratio": 1.0, "note": None},
+        {"code": "XY", "ratio": -0.1, "note": None},
+    ]
+    df = pl.DataFrame(rows)
+    
+    violations = df.select(
+        pl.any_horizontal(mask for mask, _ in compile_model(Record).checks().values())
+    ).to_series().to_list()
+    
+    def pydantic_rejects(row: dict) -> bool:
+        try:
+            Record(**row)
+            return False
+        except ValueError:
+            return True
+    
+    assert violations == [pydantic_rejects(row) for row in rows]
+
+
+def test_validate_frame_reports_first_offending_row():
+    """Each violated check becomes an error with its count, first row and value."""
+    df = pl.DataFrame({
+        "subsidiary_code": ["ES-MAD", "UK-LON", None],
+        "pool_amount_eur": [100.0, -5.0, 10.0],
+    })
+    
+    result = validate_frame(df, BonusPool)
+    
+    assert not result.is_valid
+    errors = {err.column: err for err in result.errors}
+    assert errors["pool_amount_eur"].row == 1
+    assert errors["pool_amount_eur"].value == "-5.0"
+    assert "1 records violate pool_amount_eur >= 0" in errors["pool_amount_eur"].error
+    assert errors["subsidiary_code"].row == 2
+
+
+def test_validate_frame_schema_errors():
+    """Missing columns and incompatible dtypes fail before any row check."""
+    df = pl.DataFrame({"employee_id": ["e1"], "funding_ratio": ["high"]})
+    
+    result = validate_frame(df.lazy(), ProcessedRecord)
+    
+    messages = [err.error for err in result.errors]
+    assert "Required column 'theoretical_eur' is missing" in messages
+    assert "Column 'funding_ratio' has dtype String, expected Float64" in messages
@@ -0,0 +1,98 @@
+"""
+Tests for the FX-risk Monte Carlo simulation.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+
+from meridiano_analysis.simulation import FxRiskSimulator, covariance_from_history
+
+
+@pytest.fixture
+def simulator(sample_pool_df) -> FxRiskSimulator:
+    """ES-MAD demand in EUR and USD, UK-LON in GBP; UK-LON is underfunded."""
+    demand = pl.DataFrame({
+        "subsidiary_code": ["ES-MAD", "ES-MAD", "UK-LON"],
+        "local_currency": ["EUR", "USD", "GBP"],
+        "theoretical_eur": [30000.0, 10000.0, 20000.0],
+    })
+    return FxRiskSimulator(demand, sample_pool_df, batch_size=300)
+
+
+def covariance(gbp: float, usd: float, corr: float = 0.0) -> pl.DataFrame:
+    """Covariance of GBP and USD log shocks from their variances and correlation."""
+    cross = corr * np.sqrt(gbp * usd)
+    return pl.DataFrame({"currency": ["GBP", "USD"], "GBP": [gbp, cross], "USD": [cross, usd]})
+
+
+def test_simulate_without_volatility_is_the_base_case(simulator):
+    """With zero covariance every draw reproduces the base funding ratios."""
+    result = simulator.simulate(covariance(0.0, 0.0), draws=50)
+    
+    ratios = result.bands.group_by("subsidiary_code").agg(pl.col("funding_ratio").unique())
+    assert dict(ratios.iter_rows()) == {"ES-MAD": [1.0], "UK-LON": [0.5]}
+    assert result.totals["total_payout_eur"].to_list() == [50000.0] * 3
+
+
+def test_simulate_is_reproducible_across_batch_sizes(simulator, sample_pool_df):
+    """The seed alone fixes the draws; batching does not change them."""
+    cov = covariance(0.01, 0.02, corr=0.6)
+    result = simulator.simulate(cov, draws=1000, seed=7)
+    again = FxRiskSimulator(
+        pl.DataFrame({
+            "subsidiary_code": ["ES-MAD", "ES-MAD", "UK-LON"],
+            "local_currency": ["EUR", "USD", "GBP"],
+            "theoretical_eur": [30000.0, 10000.0, 20000.0],
+        }),
+        sample_pool_df,
+        batch_size=1000,
+    ).simulate(cov, draws=1000, seed=7)
+    
+    np.testing.assert_array_equal(result.total_payout_eur, again.total_payout_eur)
+    assert not np.array_equal(
+        result.total_payout_eur, simulator.simulate(cov, draws=1000, seed=8).total_payout_eur
+    )
+
+
+def test_simulate_bands_follow_the_shocks(simulator):
+    """GBP volatility spreads UK-LON's ratio; the bands are ordered and capped."""
+    result = simulator.simulate(covariance(0.04, 0.0), draws=10_000, percentiles=[5, 50, 95])
+    
+    uk = result.bands.filter(pl.col("subsidiary_code") == "UK-LON")
+    p5, p50, p95 = uk["funding_ratio"].to_list()
+    assert p5 < p50 < p95
+    # Demand moves as exp(N(0, 0.2^2)), so the median ratio stays near 0.5
+    assert p50 == pytest.approx(0.5, rel=0.02)
+    assert p95 == pytest.approx(0.5 * np.exp(1.645 * 0.2), rel=0.05)
+    es = result.bands.filter(pl.col("subsidiary_code") == "ES-MAD")
+    assert es["funding_ratio"].to_list() == [1.0, 1.0, 1.0]
+    assert (result.bands["funding_ratio"] <= 1.0).all()
+
+
+def test_simulate_rejects_invalid_covariance(simulator):
+    """Asymmetric or indefinite covariances are errors."""
+    with pytest.raises(ValueError, match="symmetric"):
+        simulator.simulate(
+            pl.DataFrame({"currency": ["GBP", "USD"], "GBP": [0.01, 0.0], "USD": [0.005, 0.01]}),
+            draws=10,
+        )
+    with pytest.raises(ValueError, match="semi-definite"):
+        simulator.simulate(covariance(0.01, 0.01, corr=2.0), draws=10)
+
+
+def test_covariance_from_history_scales_daily_returns():
+    """Forward-filled daily log returns, scaled to the horizon; flat currencies dropped."""
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(5)]
+    history = pl.DataFrame({
+        "currency": ["EUR"] * 5 + ["GBP"] * 4,
+        "valid_from": days + [days[0], days[1], days[3], days[4]],
+        "fx_rate_to_eur": [1.0] * 5 + [1.0, 1.1, 1.0, 1.1],
+    })
+    
+    cov = covariance_from_history(history, horizon_days=10)
+    
+    returns = np.diff(np.log([1.0, 1.1, 1.1, 1.0, 1.1]))
+    assert cov.columns == ["currency", "GBP"]
+    assert cov["GBP"][0] == pytest.approx(np.var(returns, ddof=1) * 10)
@@ -1,8 +1,25 @@
 """
 Tests for transformer functions.
 """
+from datetime import date
+
 import polars as pl
-from meridiano_analysis.transformers import explode_concepts, enrich_with_fx, enrich_with_mapping
+import pytest
+from polars.testing import assert_frame_equal
+
+from meridiano_analysis.transformers import (
+    apply_funding_ratio,
+    explode_concepts,
+    enrich_with_fx,
+    enrich_with_fx_asof,
+    enrich_with_mapping,
+    normalize_currency,
+    count_unresolved_currencies,
+    canonicalize_employee_ids,
+    enrich_with_employees,
+    employee_match_rates,
+)
+from meridiano_analysis.generators.dimensions import generate_currency_aliases
 
 
 def test_explode_concepts_single(sample_remuneration_df):
@@ -25,6 +42,26 @@ def test_explode_concepts_combined(sample_remuneration_df):
     assert set(result["remuneration_concept"].to_list()) == {"BONUS_ANUAL_CASH", "LTIP_PERFORMANCE"}
 
 
+def test_explode_concepts_per_record_split():
+    """Each record should be split by its own part count, not the employee's total."""
+    df = pl.DataFrame({
+        "employee_id": ["emp1", "emp1", "emp1", "emp2"],
+        "remuneration_concept": ["A + B", "C + D + E", "F", "G + H"],
+        "local_amount": [100.0, 300.0, 50.0, 10.0],
+    }).lazy()
+    
+    result = explode_concepts(df).collect()
+    
+    assert result["remuneration_concept"].to_list() == ["A", "B", "C", "D", "E", "F", "G", "H"]
+    assert result["local_amount"].to_list() == [50.0, 50.0, 100.0, 100.0, 100.0, 50.0, 5.0, 5.0]
+    assert result["employee_id"].to_list() == ["emp1"] * 6 + ["emp2"] * 2
+    assert result.schema == {
+        "employee_id": pl.String,
+        "remuneration_concept": pl.String,
+        "local_amount": pl.Float64,
+    }
+
+
 def test_enrich_with_fx(sample_remuneration_df, sample_fx_rates_df):
     """FX enrichment should calculate EUR amounts correctly."""
     df = sample_remuneration_df.filter(pl.col("employee_id") == "emp1").lazy()
@@ -36,6 +73,29 @@ def test_enrich_with_fx(sample_remuneration_df, sample_fx_rates_df):
     assert abs(result["theoretical_eur"][0] - 9200.0) < 0.01
 
 
+def test_enrich_with_fx_asof_uses_rate_valid_on_date():
+    """Each row converts at the latest rate of its currency on or before its date."""
+    df = pl.LazyFrame({
+        "employee_id": ["emp1", "emp2", "emp3", "emp4"],
+        "local_currency": ["ARS", "ARS", "EUR", "ARS"],
+        "local_amount": [1000.0, 1000.0, 50.0, 1000.0],
+        "payment_date": [
+            date(2024, 2, 15), date(2024, 1, 10), date(2024, 3, 1), date(2023, 12, 31)
+        ],
+    })
+    fx_history = pl.LazyFrame({
+        "currency": ["ARS", "EUR", "ARS"],
+        "valid_from": [date(2024, 1, 1), date(2024, 1, 1), date(2024, 2, 1)],
+        "fx_rate_to_eur": [0.0010, 1.0, 0.0008],
+    })
+    
+    result = enrich_with_fx_asof(df, fx_history).collect()
+    eur = dict(zip(result["employee_id"], result["theoretical_eur"]))
+    
+    assert eur == {"emp1": 0.8, "emp2": 1.0, "emp3": 50.0, "emp4": None}
+    assert "valid_from" not in result.columns
+
+
 def test_enrich_with_mapping(sample_remuneration_df, sample_mapping_df):
     """Mapping enrichment should normalize categories."""
     df = sample_remuneration_df.filter(pl.col("employee_id") == "emp1").lazy()
@@ -57,3 +117,103 @@ def test_enrich_with_mapping_unmapped(sample_remuneration_df, sample_mapping_df)
     result = enrich_with_mapping(df, mapping, unmapped_value="NO_MATCH").collect()
     
     assert result["category_normalized"][0] == "NO_MATCH"
+
+
+def test_normalize_currency_resolves_aliases(sample_fx_rates_df):
+    """Spellings and symbols should resolve to ISO codes that join to an FX rate."""
+    df = pl.DataFrame({
+        "local_currency": [" eur", "Euro", "€", "US$", "Dollar", "£", "usd ", "XXX", None],
+        "local_amount": [1.0] * 9,
+    }).lazy()
+    
+    result = normalize_currency(df, generate_currency_aliases()).collect()
+    
+    assert result["local_currency"].to_list() == [
+        "EUR", "EUR", "EUR", "USD", "USD", "GBP", "USD", "XXX", None
+    ]
+    enriched = enrich_with_fx(result.lazy(), sample_fx_rates_df.lazy()).collect()
+    assert enriched["theoretical_eur"].null_count() == 2
+
+
+def test_normalize_currency_deduplicates_aliases():
+    """Aliases that only differ in case collapse; conflicting ones raise."""
+    df = pl.DataFrame({"local_currency": ["eur", "Euro"]}).lazy()
+    aliases = pl.DataFrame({
+        "alias": ["eur", "EUR ", "euro"],
+        "currency": ["EUR", "EUR", "EUR"],
+    })
+    
+    result = normalize_currency(df, aliases).collect()
+    
+    assert result["local_currency"].to_list() == ["EUR", "EUR"]
+    conflicting = pl.concat([aliases, pl.DataFrame({"alias": ["Euro"], "currency": ["USD"]})])
+    with pytest.raises(ValueError, match="more than one currency"):
+        normalize_currency(df, conflicting)
+
+
+def test_count_unresolved_currencies():
+    """Codes without an alias are counted per cleaned value, most frequent first."""
+    df = pl.DataFrame({"local_currency": ["EUR", "xxx", " XXX", "Yen", "R$", None]}).lazy()
+    
+    result = count_unresolved_currencies(df, generate_currency_aliases()).collect()
+    
+    assert result.rows(named=False) == [("XXX", 2), ("YEN", 1)]
+
+
+def test_canonicalize_employee_ids():
+    """Regional legacy formats resolve to 'EMP########' and a UInt32 key."""
+    df = pl.DataFrame({
+        "employee_id": ["EMP00000042", "ARG00001234", "MX-EMP00001234", "EMP00001234-XQ", "?"],
+        "subsidiary_code": ["ES-MAD", "AR-BUE", "MX-MEX", "CN-SHA", "ES-MAD"],
+    }).lazy()
+    
+    result = canonicalize_employee_ids(df).collect()
+    
+    assert result["employee_id"].to_list() == [
+        "EMP00000042", "EMP00001234", "EMP00001234", "EMP00001234", "?"
+    ]
+    assert result["employee_key"].to_list() == [42, 1234, 1234, 1234, None]
+    assert result.schema["employee_key"] == pl.UInt32
+
+
+def test_enrich_with_employees_joins_legacy_ids():
+    """Legacy IDs should find their job level through the integer key."""
+    employees = pl.DataFrame({
+        "employee_id": ["EMP00000001", "EMP00000002"],
+        "job_level": ["L1_AUXILIAR", "L2_GESTOR"],
+    }).lazy()
+    df = pl.DataFrame({
+        "employee_id": ["EMP00000001", "ARG00000002", "EMP00000009"],
+        "subsidiary_code": ["ES-MAD", "AR-BUE", "ES-MAD"],
+    }).lazy()
+    
+    result = enrich_with_employees(df, employees).collect().sort("employee_id")
+    
+    assert result["job_level"].to_list() == ["L1_AUXILIAR", "L2_GESTOR", None]
+    rates = employee_match_rates(df, employees).collect().row(0, named=True)
+    assert rates == {"rows": 3, "match_rate_raw": 1 / 3, "match_rate": 2 / 3}
+
+
+def test_broadcast_lookups_match_joins(
+    sample_remuneration_df, sample_fx_rates_df, sample_mapping_df
+):
+    """Collected dimensions are applied as lookups with the same results as the joins."""
+    df = pl.concat([
+        sample_remuneration_df,
+        pl.DataFrame({
+            "employee_id": ["emp4"], "local_currency": ["XXX"], "remuneration_concept": ["??"],
+            "local_amount": [1.0], "bonus_target_pct": [0.1], "subsidiary_code": ["PT-LIS"],
+        }),
+    ]).lazy()
+    pool_calc = pl.DataFrame({"subsidiary_code": ["ES-MAD", "UK-LON"], "funding_ratio": [0.5, 0.8]})
+    
+    def enrich(fx, mapping, pool):
+        enriched = enrich_with_mapping(enrich_with_fx(df, fx), mapping)
+        return apply_funding_ratio(enriched, pool).collect()
+    
+    joined = enrich(sample_fx_rates_df.lazy(), sample_mapping_df.lazy(), pool_calc.lazy())
+    broadcast = enrich(sample_fx_rates_df, sample_mapping_df, pool_calc)
+    
+    assert_frame_equal(broadcast, joined, check_row_order=False)
+    assert broadcast["funding_ratio"].to_list() == [0.5, 0.5, 0.8, 1.0]
+    assert broadcast["category_normalized"][-1] == "UNMAPPED"
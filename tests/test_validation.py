@@ -56,3 +56,45 @@ def test_validate_fx_rates_negative():
     result = validate_fx_rates(df)
     
     assert not result.is_valid
+
+
+def test_validate_covers_every_row_with_subsidiary_breakdown():
+    """Issues beyond the first rows are counted, and attributed to their subsidiary."""
+    n = 20_000
+    df = pl.DataFrame({
+        "employee_id": [f"EMP{i:08d}" for i in range(n)],
+        "local_currency": ["EUR"] * (n - 3) + ["eur", "€", "BRL"],
+        "remuneration_concept": ["BONUS"] * (n - 2) + ["CLAWBACK_BONUS", "BONUS"],
+        "local_amount": [1000.0] * (n - 3) + [2e9, -500.0, -500.0],
+        "subsidiary_code": ["ES-MAD"] * (n - 3) + ["AR-BUE"] * 3,
+    })
+    
+    result = validate_remuneration_input(df.lazy())
+    
+    assert result.is_valid
+    assert result.rows_checked == n
+    assert result.warnings == [
+        "1 records have unexpected negative amounts",
+        "2 records have non-standard currency codes",
+        "1 records have extreme amounts (>1B)",
+    ]
+    by_sub = {row["subsidiary_code"]: row for row in result.by_subsidiary.iter_rows(named=True)}
+    assert by_sub["AR-BUE"]["non_iso_currency"] == 2
+    assert by_sub["ES-MAD"]["non_iso_currency"] == 0
+    assert by_sub["ES-MAD"]["rows"] == n - 3
+
+
+def test_validate_counts_nulls_per_column():
+    """Null key values are reported per column."""
+    df = pl.DataFrame({
+        "employee_id": ["emp1", None],
+        "local_currency": ["EUR", "EUR"],
+        "remuneration_concept": ["BONUS", "BONUS"],
+        "local_amount": [1000.0, None],
+        "subsidiary_code": ["ES-MAD", "ES-MAD"],
+    })
+    
+    result = validate_remuneration_input(df, engine="streaming")
+    
+    assert "Column 'employee_id' has 1 null values" in result.warnings
+    assert "Column 'local_amount' has 1 null values" in result.warnings